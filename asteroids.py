@@ -0,0 +1,127 @@
+"""
+Selectable sets of extra bodies: main-belt asteroids and centaurs (seas_*.se1),
+the fictitious/Uranian bodies in seorbel.txt, lunar points, planetary moons
+(ephe/sat) and numbered asteroids whose se*.se1 files have been added to ephe/.
+Each set is a {name: Swiss Ephemeris id} dict that extends PLANETS and can be
+passed as `bodies` to compute_chart, the chart cache or the batch executor.
+"""
+
+import os
+import re
+
+import swisseph as swe
+
+import chart_engine
+
+MAIN_ASTEROIDS = {
+    'Ceres': swe.CERES,
+    'Pallas': swe.PALLAS,
+    'Juno': swe.JUNO,
+    'Vesta': swe.VESTA,
+    'Pholus': swe.PHOLUS,
+}
+
+LUNAR_POINTS = {
+    'Mean Node': swe.MEAN_NODE,
+    'Lilith': swe.MEAN_APOG,
+}
+
+ASTEROID_GLYPHS = {
+    'Ceres': '⚳', 'Pallas': '⚴', 'Juno': '⚵', 'Vesta': '⚶', 'Lilith': '⚸',
+}
+
+ORBEL_FILE = 'seorbel.txt'
+PLANET_MOON_LIST = os.path.join('sat', 'plmolist.txt')
+ASTEROID_NAMES_FILE = 'astlistn.md'
+
+# "  (3192) A'Hearn                       A'Hearn"
+ASTEROID_NAME_RE = re.compile(r'^\s*\((\d+)\)\s+(.+?)\s{2,}')
+
+
+def fictitious_bodies(path=None):
+    # One body per element line, numbered from FICT_OFFSET in file order
+    path = path or os.path.join(chart_engine.EPHE_PATH, ORBEL_FILE)
+    bodies = {}
+    index = 0
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = line.split(',')
+            if len(fields) < 9:
+                continue
+            name = fields[8].split('#')[0].strip()
+            if name and name not in bodies:
+                bodies[name] = swe.FICT_OFFSET + index
+            index += 1
+    return bodies
+
+
+def uranian_bodies():
+    # The eight Hamburg School points are the first eight seorbel entries
+    return dict(list(fictitious_bodies().items())[:8])
+
+
+def planetary_moons(manager=None):
+    # Only moons whose sepm file is present; body ids are PLMOON_OFFSET based
+    manager = manager or chart_engine.ephe
+    available = {f.body for f in manager.files if f.kind == 'planet_moon'}
+    names = {}
+    path = os.path.join(chart_engine.EPHE_PATH, PLANET_MOON_LIST)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                parts = line.split(None, 1)
+                if len(parts) == 2 and parts[0].isdigit():
+                    names[int(parts[0])] = parts[1].strip().split('/')[0]
+    return {names.get(body, f"Moon {body}"): body for body in sorted(available) if body % 100 != 99}
+
+
+def asteroid_names(path=None):
+    path = path or os.path.join(chart_engine.EPHE_PATH, ASTEROID_NAMES_FILE)
+    names = {}
+    if not os.path.exists(path):
+        return names
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = ASTEROID_NAME_RE.match(line)
+            if match:
+                names[int(match.group(1))] = match.group(2).strip()
+    return names
+
+
+def numbered_asteroids(numbers=None, manager=None):
+    # Numbered asteroids with a file in ephe/ (all of them if numbers is None)
+    manager = manager or chart_engine.ephe
+    available = {f.body - swe.AST_OFFSET for f in manager.files if f.kind == 'numbered_asteroid'}
+    wanted = available if numbers is None else [n for n in numbers if n in available]
+    names = asteroid_names() if wanted else {}
+    return {names.get(n, f"({n})"): swe.AST_OFFSET + n for n in sorted(wanted)}
+
+
+def body_sets():
+    # The choices offered in the GUI, in display order
+    sets = {
+        'None': {},
+        'Main asteroids': dict(MAIN_ASTEROIDS),
+        'Uranian points': uranian_bodies(),
+        'Lunar points': dict(LUNAR_POINTS),
+        'Planetary moons': planetary_moons(),
+        'Numbered asteroids': numbered_asteroids(),
+    }
+    sets['All available'] = {k: v for s in list(sets.values()) for k, v in s.items()}
+    return {name: bodies for name, bodies in sets.items() if bodies or name == 'None'}
+
+
+def with_extra_bodies(extra):
+    bodies = dict(chart_engine.PLANETS)
+    for name, body in extra.items():
+        bodies.setdefault(name, body)
+    return bodies
+
+
+def glyph_for(name):
+    if name in chart_engine.PLANET_GLYPHS:
+        return chart_engine.PLANET_GLYPHS[name]
+    return ASTEROID_GLYPHS.get(name, name[:3])
@@ -0,0 +1,216 @@
+"""
+Process-pool batch computation of charts.
+Swiss Ephemeris keeps global state (ephemeris path, topocentric position,
+open files), so charts cannot be computed in parallel threads. Each worker
+process initializes swisseph once, receives (start, stop) row ranges and
+writes longitudes, speeds, cusps, angles and per-body Moshier fallback flags
+straight into shared memory, so nothing but the row range is pickled per
+chunk.
+"""
+
+import math
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+
+# Per-worker state set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(ephe_path, bodies, house_system, flags):
+    swe.set_ephe_path(ephe_path)
+    _worker['body_ids'] = list(bodies.values())
+    _worker['house_system'] = house_system
+    _worker['flags'] = flags
+
+
+def _attach(in_name, out_name, n_rows, n_cols):
+    # Attach the shared blocks of a batch once per worker and reuse them for
+    # every later chunk of the same batch
+    key = (in_name, out_name)
+    if _worker.get('key') != key:
+        _detach()
+        in_shm = shared_memory.SharedMemory(name=in_name)
+        out_shm = shared_memory.SharedMemory(name=out_name)
+        _worker['key'] = key
+        _worker['shm'] = (in_shm, out_shm)
+        _worker['arrays'] = (np.ndarray((n_rows, 3), dtype=np.float64, buffer=in_shm.buf),
+                             np.ndarray((n_rows, n_cols), dtype=np.float64, buffer=out_shm.buf))
+    return _worker['arrays']
+
+
+def _detach():
+    # Views must go before the blocks can be closed
+    _worker.pop('arrays', None)
+    for shm in _worker.pop('shm', ()):
+        shm.close()
+    _worker.pop('key', None)
+
+
+def _compute_rows(inputs, out, start, stop, body_ids, house_system, flags):
+    n_bodies = len(body_ids)
+    topo = flags & swe.FLG_TOPOCTR
+    fallbacks = 0
+    for row in range(start, stop):
+        jd, lat, lon = inputs[row]
+        values = out[row]
+        values[2 * n_bodies + 14:] = 0.0
+        if topo:
+            swe.set_topo(lon, lat, 0)
+        for b, body_id in enumerate(body_ids):
+            try:
+                pos, ret = swe.calc_ut(jd, body_id, flags)
+            except swe.Error:
+                # e.g. Chiron outside 650-4650 AD
+                values[b] = values[n_bodies + b] = math.nan
+                continue
+            values[b] = pos[0]
+            values[n_bodies + b] = pos[3]
+            if flags & swe.FLG_SWIEPH and ret & swe.FLG_MOSEPH:
+                values[2 * n_bodies + 14 + b] = 1.0
+                fallbacks += 1
+        cusps, ascmc = swe.houses(jd, lat, lon, house_system)
+        values[2 * n_bodies:2 * n_bodies + 12] = cusps[:12]
+        values[2 * n_bodies + 12] = ascmc[0]
+        values[2 * n_bodies + 13] = ascmc[1]
+    return fallbacks
+
+
+def _run_chunk(task):
+    in_name, out_name, n_rows, n_cols, start, stop = task
+    inputs, out = _attach(in_name, out_name, n_rows, n_cols)
+    return _compute_rows(inputs, out, start, stop, _worker['body_ids'], _worker['house_system'], _worker['flags'])
+
+
+class BatchExecutor:
+    def __init__(self, processes=None, bodies=None, house_system=chart_engine.HOUSE_SYSTEM,
+                 flags=chart_engine.EPHE_FLAGS, chunk_size=2048):
+        self.processes = processes or os.cpu_count() or 1
+        self.bodies = dict(chart_engine.PLANETS if bodies is None else bodies)
+        self.house_system = house_system
+        self.flags = flags
+        self.chunk_size = chunk_size
+        self.fallbacks = 0
+        self._pool = None
+
+    @property
+    def n_cols(self):
+        # lon per body, speed per body, 12 cusps, ASC, MC, fallback flag per body
+        return 3 * len(self.bodies) + 14
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(
+                self.processes, initializer=_init_worker,
+                initargs=(chart_engine.EPHE_PATH, self.bodies, self.house_system, self.flags))
+        return self._pool
+
+    def compute(self, jds, lats, lons):
+        jds = np.asarray(jds, dtype=np.float64)
+        n = len(jds)
+        lats = np.broadcast_to(np.asarray(lats, dtype=np.float64), (n,))
+        lons = np.broadcast_to(np.asarray(lons, dtype=np.float64), (n,))
+        n_cols = self.n_cols
+
+        # Small batches are not worth the process round trip
+        if self.processes == 1 or n <= self.chunk_size:
+            inputs = np.column_stack([jds, lats, lons])
+            out = np.empty((n, n_cols))
+            self.fallbacks += _compute_rows(inputs, out, 0, n, list(self.bodies.values()),
+                                            self.house_system, self.flags)
+            return BatchResult(self.bodies, jds, lats, lons, out)
+
+        in_shm = shared_memory.SharedMemory(create=True, size=n * 3 * 8)
+        out_shm = shared_memory.SharedMemory(create=True, size=n * n_cols * 8)
+        try:
+            values = self._compute_shared(in_shm, out_shm, jds, lats, lons)
+        finally:
+            in_shm.close()
+            in_shm.unlink()
+            out_shm.close()
+            out_shm.unlink()
+        return BatchResult(self.bodies, jds, lats, lons, values)
+
+    def _compute_shared(self, in_shm, out_shm, jds, lats, lons):
+        n = len(jds)
+        n_cols = self.n_cols
+        inputs = np.ndarray((n, 3), dtype=np.float64, buffer=in_shm.buf)
+        inputs[:, 0] = jds
+        inputs[:, 1] = lats
+        inputs[:, 2] = lons
+        out = np.ndarray((n, n_cols), dtype=np.float64, buffer=out_shm.buf)
+
+        tasks = [(in_shm.name, out_shm.name, n, n_cols, start, min(start + self.chunk_size, n))
+                 for start in range(0, n, self.chunk_size)]
+        self.fallbacks += sum(self._get_pool().imap_unordered(_run_chunk, tasks))
+        # Copy out so the shared blocks can be released right away
+        return out.copy()
+
+
+class BatchResult:
+    def __init__(self, bodies, jds, lats, lons, values):
+        # values: the BatchExecutor columns; results built without the
+        # fallback flag columns do not know which bodies fell back
+        n_bodies = len(bodies)
+        self.bodies = list(bodies)
+        self.jds = jds
+        self.lats = np.array(lats)
+        self.lons = np.array(lons)
+        self.longitudes = values[:, :n_bodies]
+        self.speeds = values[:, n_bodies:2 * n_bodies]
+        self.cusps = values[:, 2 * n_bodies:2 * n_bodies + 12]
+        self.ascendants = values[:, 2 * n_bodies + 12]
+        self.midheavens = values[:, 2 * n_bodies + 13]
+        if values.shape[1] > 2 * n_bodies + 14:
+            self.fallbacks = values[:, 2 * n_bodies + 14:3 * n_bodies + 14] != 0
+        else:
+            self.fallbacks = None
+
+    def __len__(self):
+        return len(self.jds)
+
+    @property
+    def retrogrades(self):
+        return self.speeds < 0
+
+    def chart(self, i):
+        # One row in the same dict shape as chart_engine.compute_chart
+        longitudes = {name: (None if math.isnan(v) else float(v)) for name, v in zip(self.bodies, self.longitudes[i])}
+        speeds = {name: float(v) for name, v in zip(self.bodies, self.speeds[i])}
+        chart = {
+            'jd': float(self.jds[i]),
+            'lat': float(self.lats[i]),
+            'lon': float(self.lons[i]),
+            'longitudes': longitudes,
+            'speeds': speeds,
+            'retrogrades': {name: v < 0 for name, v in speeds.items()},
+            'house_cusps': tuple(float(c) for c in self.cusps[i]),
+            'ascendant': float(self.ascendants[i]),
+            'midheaven': float(self.midheavens[i]),
+            'aspects': chart_engine.compute_aspects(longitudes),
+        }
+        if self.fallbacks is not None:
+            chart['fallbacks'] = [name for name, fell_back in zip(self.bodies, self.fallbacks[i]) if fell_back]
+        return chart
+
+
+def compute_batch(jds, lats, lons, processes=None, **kwargs):
+    with BatchExecutor(processes, **kwargs) as executor:
+        return executor.compute(jds, lats, lons)
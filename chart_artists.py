@@ -0,0 +1,114 @@
+"""
+Batched artists for the chart renderer.
+Matplotlib's cost grows with the number of artists, not the number of
+vertices. So the wheel is drawn as one LineCollection holding every
+circle, cusp and aspect line, plus one PathCollection holding every glyph
+and label as a pre-built outline path. Glyph paths are built from the font
+once and cached; each label is then just an offset and a colour in the
+collection.
+"""
+
+import functools
+
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.colors import to_rgba
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D, IdentityTransform
+
+FONT_FAMILY = 'DejaVu Sans'
+
+
+@functools.lru_cache(maxsize=2048)
+def text_path(text, fontsize, weight='normal', ha='center', va='center'):
+    # Outline of `text` in points, anchored like Text(ha=..., va=...)
+    path = TextPath((0, 0), text, size=fontsize, prop=FontProperties(family=FONT_FAMILY, weight=weight))
+    # TrueType outlines have on-curve points at their extremes, so the box of
+    # the vertices is the exact extent without solving for Bezier extrema
+    points = path.vertices[path.codes != Path.CLOSEPOLY]
+    if not len(points):
+        return path
+    (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+    x = {'left': x0, 'center': (x0 + x1) / 2, 'right': x1}[ha]
+    y = {'bottom': y0, 'center': (y0 + y1) / 2, 'top': y1}[va]
+    return path.transformed(Affine2D().translate(-x, -y))
+
+
+@functools.lru_cache(maxsize=64)
+def arrow_head_path(size, angle):
+    # Triangle pointing along `angle` (degrees, screen space), tip at the origin
+    tri = Path([(0, 0), (-size, size / 2), (-size, -size / 2), (0, 0)],
+               [Path.MOVETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY])
+    return tri.transformed(Affine2D().rotate_deg(angle))
+
+
+class LineBatch:
+    # Segments of any length, each with its own colour and width
+    def __init__(self):
+        self.segments = []
+        self.colors = []
+        self.widths = []
+
+    def __len__(self):
+        return len(self.segments)
+
+    def add(self, xs, ys, color='black', linewidth=1.0, alpha=None):
+        self.segments.append(np.column_stack([xs, ys]))
+        self.colors.append(to_rgba(color, alpha))
+        self.widths.append(linewidth)
+
+    def add_circle(self, radius, color='black', linewidth=1.0, steps=361):
+        # In polar data coordinates a circle is a constant-radius polyline
+        theta = np.linspace(0, 2 * np.pi, steps)
+        self.add(theta, np.full(steps, radius), color, linewidth)
+
+    def draw(self, ax, zorder=2):
+        if not self.segments:
+            return None
+        lines = LineCollection(self.segments, colors=self.colors, linewidths=self.widths, zorder=zorder)
+        ax.add_collection(lines, autolim=False)
+        return lines
+
+    def update(self, lines):
+        # Replace the contents of a LineCollection made by draw()
+        lines.set_segments(self.segments)
+        lines.set_color(self.colors)
+        lines.set_linewidth(self.widths)
+
+
+class GlyphBatch:
+    # Text and markers as outline paths, each placed at a data position
+    def __init__(self):
+        self.paths = []
+        self.offsets = []
+        self.colors = []
+
+    def __len__(self):
+        return len(self.paths)
+
+    def add_text(self, x, y, text, fontsize, color='black', weight='normal', ha='center', va='center'):
+        self.add_path(x, y, text_path(text, fontsize, weight, ha, va), color)
+
+    def add_path(self, x, y, path, color='black'):
+        self.paths.append(path)
+        self.offsets.append((x, y))
+        self.colors.append(to_rgba(color))
+
+    def draw(self, ax, zorder=3):
+        if not self.paths:
+            return None
+        # sizes=1 makes one path unit one point, as for scatter markers
+        glyphs = PathCollection(self.paths, sizes=[1.0], offsets=self.offsets, offset_transform=ax.transData,
+                                facecolors=self.colors, edgecolors='none', linewidths=0, zorder=zorder)
+        glyphs.set_transform(IdentityTransform())
+        glyphs.set_clip_on(False)
+        ax.add_collection(glyphs, autolim=False)
+        return glyphs
+
+    def update(self, glyphs):
+        # Replace the contents of a PathCollection made by draw()
+        glyphs.set_paths(self.paths)
+        glyphs.set_offsets(self.offsets)
+        glyphs.set_facecolor(self.colors)
@@ -0,0 +1,148 @@
+"""
+Content-addressed cache for computed charts.
+A chart is keyed on everything that determines it: UT Julian day, latitude,
+longitude, house system, ephemeris flags, body set and a fingerprint of the
+ephemeris files. Hits come from an in-memory LRU; an optional directory of
+pickles keeps results between runs. Changing anything under ephe/ changes the
+fingerprint, which drops the memory cache and orphans stale disk entries.
+"""
+
+import collections
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+import chart_engine
+
+
+def ephemeris_fingerprint(ephe_path):
+    # Names, sizes and mtimes are enough to notice replaced or added files
+    digest = hashlib.sha1()
+    for dirpath, dirnames, filenames in os.walk(ephe_path):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            st = os.stat(path)
+            rel = os.path.relpath(path, ephe_path)
+            digest.update(f"{rel}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+class ChartCache:
+    def __init__(self, maxsize=256, disk_dir=None, ephe_path=None, recheck_interval=5.0):
+        self.maxsize = maxsize
+        self.disk_dir = disk_dir
+        self.ephe_path = ephe_path or chart_engine.EPHE_PATH
+        # Walking ephe/ costs a few ms, so the fingerprint is re-checked at
+        # most once per interval instead of on every lookup
+        self.recheck_interval = recheck_interval
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._ephe_version = None
+        self._checked_at = 0.0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @property
+    def ephe_version(self):
+        now = time.monotonic()
+        if self._ephe_version is None or now - self._checked_at > self.recheck_interval:
+            version = ephemeris_fingerprint(self.ephe_path)
+            with self._lock:
+                if version != self._ephe_version:
+                    self._entries.clear()
+                    self._ephe_version = version
+                self._checked_at = now
+        return self._ephe_version
+
+    def make_key(self, jd, lat, lon, house_system=chart_engine.HOUSE_SYSTEM, flags=chart_engine.EPHE_FLAGS, bodies=None):
+        bodies = chart_engine.PLANETS if bodies is None else bodies
+        return (
+            round(jd, 9), round(lat, 6), round(lon, 6),
+            bytes(house_system), int(flags),
+            tuple(sorted(bodies.items())),
+            self.ephe_version,
+        )
+
+    def get_chart(self, jd, lat, lon, house_system=chart_engine.HOUSE_SYSTEM, flags=chart_engine.EPHE_FLAGS, bodies=None):
+        key = self.make_key(jd, lat, lon, house_system, flags, bodies)
+        with self._lock:
+            chart = self._entries.get(key)
+            if chart is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return chart
+
+        chart = self._load(key)
+        if chart is None:
+            self.misses += 1
+            chart = chart_engine.compute_chart(jd, lat, lon, house_system, flags, bodies)
+            self._store(key, chart)
+        else:
+            self.hits += 1
+
+        with self._lock:
+            # A chart computed against files that changed meanwhile is not kept
+            if key[-1] == self._ephe_version:
+                self._entries[key] = chart
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return chart
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._ephe_version = None
+
+    def prune_disk(self):
+        # Remove disk entries written against a different ephemeris version
+        if not self.disk_dir:
+            return 0
+        version = self.ephe_version
+        removed = 0
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.pickle'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                with open(path, 'rb') as f:
+                    key, _ = pickle.load(f)
+            except Exception:
+                key = None
+            if key is None or key[-1] != version:
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def _disk_path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.disk_dir, digest + '.pickle')
+
+    def _load(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'rb') as f:
+                stored_key, chart = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        return chart if stored_key == key else None
+
+    def _store(self, key, chart):
+        if not self.disk_dir:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((key, chart), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,239 @@
+"""
+Chart computation core for the natal chart app.
+Only Swiss Ephemeris calls live here (no Tk, no geocoding), so the GUI, the
+cache and batch tools can all share it without opening a window.
+"""
+
+import datetime
+import os
+import numpy as np
+import pytz
+import swisseph as swe
+
+from ephemeris import EphemerisManager
+
+# Set path to Swiss Ephemeris files (resolved next to this file, not the CWD)
+ephe = EphemerisManager()
+ephe.activate()
+EPHE_PATH = ephe.path
+
+# Generated indexes, catalogs and libraries live outside the ephe/ tree
+DATA_DIR = os.environ.get('ASTROCHART_DATA_DIR', os.path.join(os.path.expanduser('~'), '.astrochart'))
+
+HOUSE_SYSTEM = b'P'  # 'P' for Placidus
+EPHE_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+PLANETS = {
+    'Sun': swe.SUN,
+    'Moon': swe.MOON,
+    'Mercury': swe.MERCURY,
+    'Venus': swe.VENUS,
+    'Mars': swe.MARS,
+    'Jupiter': swe.JUPITER,
+    'Saturn': swe.SATURN,
+    'Uranus': swe.URANUS,
+    'Neptune': swe.NEPTUNE,
+    'Pluto': swe.PLUTO,
+    'True Node': swe.TRUE_NODE,
+    'Chiron': swe.CHIRON,
+}
+
+PLANET_COLORS = {
+    'Sun': 'gold',
+    'Moon': 'silver',
+    'Mercury': 'grey',
+    'Venus': 'pink',
+    'Mars': 'red',
+    'Jupiter': 'orange',
+    'Saturn': 'brown',
+    'Uranus': 'cyan',
+    'Neptune': 'blue',
+    'Pluto': 'darkred',
+    'True Node': 'black',
+    'Chiron': 'green',
+}
+
+PLANET_GLYPHS = {
+    'Sun': '☉', 'Moon': '☽', 'Mercury': '☿', 'Venus': '♀', 'Mars': '♂',
+    'Jupiter': '♃', 'Saturn': '♄', 'Uranus': '♅', 'Neptune': '♆',
+    'Pluto': '♇', 'True Node': '☊', 'Chiron': '⚷'
+}
+
+SIGNS = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo', 'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
+
+MAJOR_ASPECTS = {
+    'Conjunction': (0, 6),
+    'Sextile': (60, 4),
+    'Square': (90, 7),
+    'Trine': (120, 6),
+    'Opposition': (180, 8),
+}
+
+# Asteroids and other minor bodies get tight orbs so large sets stay readable
+MINOR_ASPECTS = {
+    'Conjunction': (0, 2),
+    'Sextile': (60, 1),
+    'Square': (90, 1.5),
+    'Trine': (120, 1.5),
+    'Opposition': (180, 2),
+}
+
+
+def local_to_julian_day(date_str, time_str, timezone):
+    dt = datetime.datetime.strptime(date_str + " " + time_str, "%Y-%m-%d %H:%M")
+    local_dt = timezone.localize(dt)
+    utc_dt = local_dt.astimezone(pytz.UTC)
+
+    utc_hour = utc_dt.hour + utc_dt.minute / 60.0 + utc_dt.second / 3600.0
+    jd = swe.julday(utc_dt.year, utc_dt.month, utc_dt.day, utc_hour)
+    return local_dt, jd
+
+
+def compute_chart(jd, lat, lon, house_system=HOUSE_SYSTEM, flags=EPHE_FLAGS, bodies=None):
+    # Everything derived from (jd, lat, lon) for one chart, as a plain dict
+    bodies = PLANETS if bodies is None else bodies
+
+    longitudes = {}
+    speeds = {}
+    retrogrades = {}
+    fallbacks = []
+
+    swe.set_topo(lat, lon, 0)
+    for name, planet_id in bodies.items():
+        if name not in PLANETS:
+            # Minor bodies may lack a file for this date; leave them out
+            try:
+                pos, ret = swe.calc_ut(jd, planet_id, flags)
+            except swe.Error:
+                longitudes[name] = speeds[name] = retrogrades[name] = None
+                continue
+        else:
+            pos, ret = swe.calc_ut(jd, planet_id, flags)
+        longitudes[name] = pos[0]
+        speeds[name] = pos[3]
+        retrogrades[name] = pos[3] < 0
+        if not ephe.check_result(jd, name, ret, flags):
+            fallbacks.append(name)
+
+    house_cusps, ascmc = swe.houses(jd, lat, lon, house_system)
+
+    return {
+        'jd': jd,
+        'lat': lat,
+        'lon': lon,
+        'longitudes': longitudes,
+        'speeds': speeds,
+        'retrogrades': retrogrades,
+        'house_cusps': tuple(house_cusps),
+        'ascendant': ascmc[0],
+        'midheaven': ascmc[1],
+        'aspects': chart_aspects(longitudes),
+        'fallbacks': fallbacks,
+    }
+
+
+def chart_aspects(longitudes):
+    # Major aspects between the planets plus tight-orb aspects of any extra bodies
+    aspects = compute_aspects({k: v for k, v in longitudes.items() if k in PLANETS})
+    if len(longitudes) > len(PLANETS):
+        aspects = sorted(aspects + compute_minor_aspects(longitudes), key=lambda x: x[3])
+    return aspects
+
+
+def pair_aspects(p1, p2):
+    # The (name, angle, orb) aspects checked for a pair, in the order tried
+    if 'Chiron' in (p1, p2):
+        return []
+    if p1 not in PLANETS or p2 not in PLANETS:
+        return [(name, angle, orb) for name, (angle, orb) in MINOR_ASPECTS.items()]
+    rules = []
+    for aspect_name, (angle, orb) in MAJOR_ASPECTS.items():
+        if ('Mars' in (p1, p2) or 'Jupiter' in (p1, p2) or 'Saturn' in (p1, p2) or
+            'Uranus' in (p1, p2) or 'Neptune' in (p1, p2) or 'Pluto' in (p1, p2)) and aspect_name == 'Conjunction':
+            orb = 5
+        if ('Mercury' in (p1, p2) and 'Uranus' in (p1, p2)) and aspect_name == 'Sextile':
+            continue
+        if ('True Node' in (p1, p2) and ('Mercury' in (p1, p2) or 'Venus' in (p1, p2) or 'Sun' in (p1, p2))) and aspect_name in ['Square']:
+            continue
+        rules.append((aspect_name, angle, orb))
+    return rules
+
+
+def compute_aspects(longitudes):
+    aspects = []
+
+    filtered_longitudes = {k: v for k, v in longitudes.items() if v is not None}
+    planet_names = list(filtered_longitudes.keys())
+    for i in range(len(planet_names)):
+        for j in range(i + 1, len(planet_names)):
+            p1, p2 = planet_names[i], planet_names[j]
+            lon1, lon2 = filtered_longitudes[p1], filtered_longitudes[p2]
+            diff = min((lon1 - lon2) % 360, (lon2 - lon1) % 360)
+            for aspect_name, angle, orb in pair_aspects(p1, p2):
+                if abs(diff - angle) <= orb:
+                    aspects.append((p1, p2, aspect_name, diff))
+                    break
+
+    aspects.sort(key=lambda x: x[3])
+    return aspects
+
+
+def compute_minor_aspects(longitudes, orbs=MINOR_ASPECTS):
+    # Aspects involving at least one body outside PLANETS, for all pairs at
+    # once: an (n_minor, n_all) separation matrix tested against each aspect
+    names = [k for k, v in longitudes.items() if v is not None and k != 'Chiron']
+    is_minor = np.array([k not in PLANETS for k in names], dtype=bool)
+    minor = np.nonzero(is_minor)[0]
+    if not len(minor):
+        return []
+    lons = np.array([longitudes[k] for k in names])
+    diff = np.abs(lons[minor][:, None] - lons[None, :]) % 360
+    diff = np.minimum(diff, 360 - diff)
+
+    # Each minor body pairs with every main planet and with later minor bodies
+    pair_ok = ~is_minor[None, :] | (np.arange(len(names))[None, :] > minor[:, None])
+    found = np.full(diff.shape, -1, dtype=np.int8)
+    aspect_names = list(orbs)
+    for code in range(len(aspect_names) - 1, -1, -1):
+        # Later aspects are written first so the earliest match wins, as in compute_aspects
+        angle, orb = orbs[aspect_names[code]]
+        found[pair_ok & (np.abs(diff - angle) <= orb)] = code
+
+    rows, cols = np.nonzero(found >= 0)
+    return [(names[minor[r]], names[c], aspect_names[found[r, c]], float(diff[r, c])) for r, c in zip(rows, cols)]
+
+
+def houses_of(longitudes, house_cusps):
+    # Vectorized house numbers (1-12) for an array of longitudes, matching get_sign_and_house
+    cusps = np.asarray(house_cusps, dtype=float) % 360
+    offsets = (cusps - cusps[0]) % 360
+    rel = (np.asarray(longitudes, dtype=float) - cusps[0]) % 360
+    return np.searchsorted(offsets, rel, side='right')
+
+
+def signs_of(longitudes):
+    return (np.asarray(longitudes, dtype=float) % 360 // 30).astype(int)
+
+
+def get_sign_and_house(longitude, house_cusps):
+    if longitude is None:
+        return None, None
+
+    sign_idx = int(longitude // 30)
+    sign = SIGNS[sign_idx]
+
+    lon = longitude % 360
+    house = 1
+    for i in range(len(house_cusps)):
+        cusp = house_cusps[i] % 360
+        next_cusp = house_cusps[(i + 1) % 12] % 360
+        if next_cusp < cusp:  # Crossing 0°
+            if lon >= cusp or lon < next_cusp:
+                house = (i + 1) % 12 if i + 1 != 12 else 12
+                break
+        else:
+            if cusp <= lon < next_cusp:
+                house = (i + 1) % 12 if i + 1 != 12 else 12
+                break
+
+    return sign, house
@@ -0,0 +1,151 @@
+"""
+Chart workspace and library.
+The workspace is a small LRU of the charts viewed in this session. Each
+entry holds the computed chart, its star contacts and the inputs it came
+from, so switching back to one needs no geocoding or ephemeris work. The
+library is an SQLite file holding every chart ever generated. It is
+indexed by name, date and place, and stores the computed chart itself, so
+reopening from the library does not recompute anything either.
+"""
+
+import collections
+import os
+import pickle
+import sqlite3
+import time
+
+import chart_engine
+
+LIBRARY_FILE = 'library.sqlite3'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS charts (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    place TEXT NOT NULL,
+    country TEXT NOT NULL,
+    body_set TEXT NOT NULL,
+    lat REAL,
+    lon REAL,
+    jd REAL,
+    saved REAL,
+    data BLOB,
+    UNIQUE (name, date, time, place, country, body_set)
+);
+CREATE INDEX IF NOT EXISTS charts_name ON charts (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS charts_date ON charts (date);
+CREATE INDEX IF NOT EXISTS charts_place ON charts (place COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS charts_saved ON charts (saved);
+"""
+
+INPUT_FIELDS = ('name', 'date', 'time', 'place', 'country', 'body_set')
+
+# A prefix search is one index range per column: text <= value < text + PREFIX_END,
+# compared with each index's collation so the charts_name, charts_place and
+# charts_date indexes serve it instead of a scan of the table
+PREFIX_END = '\U0010ffff'
+SEARCH_COLUMNS = "SELECT id, name, date, time, place, body_set, saved FROM charts "
+SEARCH_SQL = (
+    SEARCH_COLUMNS + "WHERE name >= ? COLLATE NOCASE AND name < ? COLLATE NOCASE "
+    "UNION " + SEARCH_COLUMNS + "WHERE place >= ? COLLATE NOCASE AND place < ? COLLATE NOCASE "
+    "UNION " + SEARCH_COLUMNS + "WHERE date >= ? AND date < ? "
+    "ORDER BY saved DESC LIMIT ?"
+)
+RECENT_SQL = SEARCH_COLUMNS + "ORDER BY saved DESC LIMIT ?"
+
+
+def entry_label(entry):
+    inputs = entry['inputs']
+    label = f"{inputs['name'] or inputs['place']} - {inputs['date']} {inputs['time']}, {inputs['place']}"
+    if inputs.get('body_set', 'None') != 'None':
+        label += f" [{inputs['body_set']}]"
+    return label
+
+
+def entry_key(inputs):
+    return tuple(inputs[field] for field in INPUT_FIELDS)
+
+
+class Workspace:
+    # Most recently viewed charts first; the least recent is dropped past maxsize
+    def __init__(self, maxsize=20):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entry):
+        key = entry_key(entry['inputs'])
+        self._entries[key] = entry
+        self._entries.move_to_end(key, last=False)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=True)
+        return entry
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key, last=False)
+        return entry
+
+    def entries(self):
+        return list(self._entries.values())
+
+
+class ChartLibrary:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(chart_engine.DATA_DIR, LIBRARY_FILE)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def save(self, entry):
+        # Insert or refresh a chart; returns its id
+        inputs = entry['inputs']
+        chart = entry['chart']
+        data = pickle.dumps({'chart': chart, 'star_contacts': entry.get('star_contacts')},
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO charts (name, date, time, place, country, body_set, lat, lon, jd, saved, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (name, date, time, place, country, body_set) DO UPDATE SET "
+                "lat = excluded.lat, lon = excluded.lon, jd = excluded.jd, saved = excluded.saved, data = excluded.data",
+                entry_key(inputs) + (chart['lat'], chart['lon'], chart['jd'], time.time(), data))
+            row = self._conn.execute(
+                "SELECT id FROM charts WHERE name = ? AND date = ? AND time = ? AND place = ? AND country = ? AND body_set = ?",
+                entry_key(inputs)).fetchone()
+        return row[0]
+
+    def search(self, text='', limit=50):
+        # (id, label) pairs of charts whose name or place starts with text
+        # (ignoring case), or whose date does; most recently saved first
+        prefix = text.strip()
+        if prefix:
+            rows = self._conn.execute(SEARCH_SQL, (prefix, prefix + PREFIX_END) * 3 + (limit,)).fetchall()
+        else:
+            rows = self._conn.execute(RECENT_SQL, (limit,)).fetchall()
+        return [(row[0], entry_label({'inputs': dict(zip(('name', 'date', 'time', 'place', 'body_set'), row[1:6]))}))
+                for row in rows]
+
+    def get(self, chart_id):
+        # The stored entry (inputs, chart, star contacts) without recomputing
+        row = self._conn.execute(
+            "SELECT name, date, time, place, country, body_set, data FROM charts WHERE id = ?",
+            (chart_id,)).fetchone()
+        if row is None:
+            return None
+        data = pickle.loads(row[-1])
+        return {'inputs': dict(zip(INPUT_FIELDS, row[:-1])), 'chart': data['chart'],
+                'star_contacts': data['star_contacts']}
+
+    def delete(self, chart_id):
+        with self._conn:
+            self._conn.execute("DELETE FROM charts WHERE id = ?", (chart_id,))
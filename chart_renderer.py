@@ -0,0 +1,271 @@
+"""
+Chart figure renderer.
+A ChartRenderer owns every artist on its figure: the wheel's line and
+glyph collections, the aspect grid's collections and caption, and the
+legend. It creates each one once and then updates it in place, so
+rendering any number of charts leaves the figure with the same artists
+and memory use stays flat over a long session. It needs only a
+matplotlib Figure, so it works on a Tk canvas or off screen with Agg.
+"""
+
+import os
+
+import numpy as np
+
+from chart_artists import LineBatch, GlyphBatch, arrow_head_path
+from chart_engine import PLANETS, MAJOR_ASPECTS
+from glyph_layout import chart_layout
+
+# Limits that keep large asteroid sets readable and fast to draw
+MAX_ASPECT_GRID_BODIES = 16
+MAX_ASPECT_TABLE_ROWS = 12
+MAX_MINOR_ASPECT_LINES = 30
+
+ZODIAC_SIGNS = [
+    ('♈', 'Aries'), ('♉', 'Taurus'), ('♊', 'Gemini'), ('♋', 'Cancer'),
+    ('♌', 'Leo'), ('♍', 'Virgo'), ('♎', 'Libra'), ('♏', 'Scorpio'),
+    ('♐', 'Sagittarius'), ('♑', 'Capricorn'), ('♒', 'Aquarius'), ('♓', 'Pisces')
+]
+
+ASPECT_COLORS = {
+    'Conjunction': 'red',
+    'Sextile': 'green',
+    'Square': 'red',
+    'Trine': 'blue',
+    'Opposition': 'red'
+}
+
+ASPECT_SYMBOLS = {
+    'Conjunction': ('red', 'C'),
+    'Sextile': ('green', 'S'),
+    'Square': ('red', 'Q'),
+    'Trine': ('blue', 'T'),
+    'Opposition': ('red', 'O')
+}
+
+ASPECT_LEGEND = ['C = Conjunction', 'S = Sextile', 'Q = Square', 'T = Trine', 'O = Opposition']
+
+
+def wheel_batches(ax, longitudes, house_cusps, ascendant, midheaven, aspects, planet_glyphs):
+    # Correct orientation: Ascendant at 9 o'clock
+    theta_offset = np.radians(180 - ascendant)  # Rotate so AC lands at 9 o'clock
+    ax.set_theta_offset(theta_offset)
+
+    # Every line goes into one LineCollection and every glyph or label into
+    # one PathCollection per axes
+    lines = LineBatch()
+    glyphs = GlyphBatch()
+
+    for r in [0.4, 0.7, 1.0]:
+        lines.add_circle(r, color='lightgrey', linewidth=0.5)
+    lines.add_circle(1.05, color='lightblue', linewidth=2)
+
+    # Zodiac signs and degree labels
+    theta_ticks = np.linspace(0, 2 * np.pi, 12, endpoint=False)
+    for i in range(12):
+        theta = theta_ticks[i]
+        glyphs.add_text(theta, 1.2, ZODIAC_SIGNS[i][0], 16, color='orange')
+        glyphs.add_text(theta, 0.97, f"{i * 30}°", 6)
+
+    # House cusps
+    for i, cusp in enumerate(house_cusps):
+        theta = np.radians(cusp)
+        lines.add([theta, theta], [0.4, 1.0], linewidth=0.7)
+        degree = int(cusp % 30)
+        minutes = int((cusp % 1) * 60)
+        glyphs.add_text(theta, 0.88, f"{degree}° {minutes}'", 8)
+        house_number = (i + 1) % 12 if (i + 1) % 12 != 0 else 12
+        glyphs.add_text(theta, 0.25, str(house_number), 10)
+
+    # Ascendant (at 9 o'clock after the offset) and Midheaven, with an arrow head
+    # pointing out of the wheel
+    for label, angle in (('AC', ascendant), ('MC', midheaven)):
+        theta = np.radians(angle)
+        lines.add([theta, theta], [0.85, 1.05], color='blue', linewidth=2)
+        screen_angle = round(np.degrees(theta + theta_offset) % 360, 2)
+        glyphs.add_path(theta, 1.06, arrow_head_path(8, screen_angle), color='blue')
+        glyphs.add_text(theta, 1.13, label, 8, color='blue')
+
+    # Planets, spread so no two glyphs overlap; extra bodies get smaller glyphs
+    fontsizes = {planet: 20 if planet in PLANETS else 11 for planet in longitudes}
+    planet_positions = chart_layout(longitudes, planet_glyphs, fontsizes, ax)
+    planet_radii = {planet: radius for planet, (_, radius, _) in planet_positions.items()}
+
+    for planet, (lon, radius, scale) in planet_positions.items():
+        glyphs.add_text(np.radians(lon), radius, planet_glyphs[planet], round(fontsizes[planet] * scale, 1), weight='bold')
+
+    # Aspects: every line between main planets, only the tightest ones for extra bodies
+    minor_lines = 0
+    for p1, p2, aspect_name, _ in aspects:
+        lon1 = longitudes[p1]
+        lon2 = longitudes[p2]
+        if lon1 is None or lon2 is None:
+            continue
+        if p1 not in PLANETS or p2 not in PLANETS:
+            if minor_lines >= MAX_MINOR_ASPECT_LINES:
+                continue
+            minor_lines += 1
+        theta1 = np.radians(lon1)
+        theta2 = np.radians(lon2)
+        radius1 = planet_radii.get(p1, 0.75)
+        radius2 = planet_radii.get(p2, 0.75)
+        lines.add([theta1, theta2], [radius1, radius2], color=ASPECT_COLORS.get(aspect_name, 'black'), alpha=0.5)
+
+    return lines, glyphs
+
+
+def aspect_grid_batches(longitudes, aspects, planet_glyphs):
+    # Grid lines, glyphs and size of the aspect grid, or None when there are
+    # too many bodies for a grid
+    planet_list = [p for p, lon in longitudes.items() if lon is not None and p in planet_glyphs]
+    if len(planet_list) > MAX_ASPECT_GRID_BODIES:
+        return None
+
+    n = len(planet_list)
+    lines = LineBatch()
+    glyphs = GlyphBatch()
+    for i in range(n + 1):
+        lines.add([i, i], [0, n], linewidth=0.5)
+        lines.add([0, n], [i, i], linewidth=0.5)
+
+    for i, planet in enumerate(planet_list):
+        glyphs.add_text(i + 0.5, n + 0.2, planet_glyphs[planet], 10)
+        glyphs.add_text(-0.5, n - 0.5 - i, planet_glyphs[planet], 10)
+
+    index = {planet: i for i, planet in enumerate(planet_list)}
+    for p1, p2, aspect_name, _ in aspects:
+        if p1 not in index or p2 not in index:
+            continue
+        idx1 = index[p1]
+        idx2 = index[p2]
+        x, y = min(idx1, idx2), n - 1 - max(idx1, idx2)
+        color, symbol = ASPECT_SYMBOLS.get(aspect_name, ('black', ''))
+        if symbol:
+            glyphs.add_text(x + 0.5, y + 0.5, symbol, 10, color=color)
+    return lines, glyphs, n
+
+
+def aspect_table(aspects, planet_glyphs):
+    # The tightest aspects as text, for charts with too many bodies for a grid
+    tightest = sorted(aspects, key=lambda a: abs(a[3] - MAJOR_ASPECTS[a[2]][0]))[:MAX_ASPECT_TABLE_ROWS]
+    rows = [f"{planet_glyphs.get(p1, p1)} {ASPECT_SYMBOLS[name][1]} {planet_glyphs.get(p2, p2)}  {abs(diff - MAJOR_ASPECTS[name][0]):.1f}°"
+            for p1, p2, name, diff in tightest]
+    return f"Tightest aspects ({len(aspects)} total)\n" + '\n'.join(rows)
+
+
+def legend_text(planet_glyphs):
+    planet_legend = [f"{glyph} = {planet}" for planet, glyph in planet_glyphs.items()]
+    sign_legend = [f"{symbol} = {name}" for symbol, name in ZODIAC_SIGNS]
+    return '\n'.join(planet_legend + [''] + sign_legend)
+
+
+class ChartRenderer:
+    def __init__(self, fig):
+        self.fig = fig
+        self.ax = fig.add_subplot(111, polar=True)
+        self.ax_aspect = fig.add_axes([0.75, 0.70, 0.22, 0.22])
+
+        ax = self.ax
+        ax.set_facecolor('white')
+        ax.set_theta_direction(1)  # Counter-clockwise
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.grid(False)  # Disables grid lines
+        ax.spines['polar'].set_visible(False)  # Removes circle around chart
+        ax.set_ylim(0, 1.1)
+        self.ax_aspect.set_xticks([])
+        self.ax_aspect.set_yticks([])
+        self.ax_aspect.set_facecolor('white')
+
+        # Collections are made on first use, then only updated
+        self.wheel_lines = None
+        self.wheel_glyphs = None
+        self.grid_lines = None
+        self.grid_glyphs = None
+        self.grid_text = self.ax_aspect.text(0, 0, '', ha='left', va='top', fontfamily='DejaVu Sans', color='black')
+        self.legend = fig.text(0.01, 1, '', ha='left', va='top', fontsize=8, fontfamily='DejaVu Sans', color='black')
+
+    def artists(self):
+        # Everything this renderer owns
+        return [a for a in (self.wheel_lines, self.wheel_glyphs, self.grid_lines, self.grid_glyphs,
+                            self.grid_text, self.legend) if a is not None]
+
+    def _put(self, name, batch, ax):
+        # Draw a batch into the collection held in attribute `name`
+        artist = getattr(self, name)
+        if not len(batch):
+            if artist is not None:
+                artist.set_visible(False)
+            return artist
+        if artist is None:
+            artist = batch.draw(ax)
+            setattr(self, name, artist)
+        else:
+            batch.update(artist)
+            artist.set_visible(True)
+        return artist
+
+    def draw_wheel(self, longitudes, house_cusps, ascendant, midheaven, aspects, planet_glyphs):
+        # The wheel: circles, signs, cusps, angles, planet glyphs and aspect lines.
+        # Returns its two collections.
+        lines, glyphs = wheel_batches(self.ax, longitudes, house_cusps, ascendant, midheaven, aspects, planet_glyphs)
+        return self._put('wheel_lines', lines, self.ax), self._put('wheel_glyphs', glyphs, self.ax)
+
+    def draw_aspect_grid(self, longitudes, aspects, planet_glyphs):
+        # Aspect grid, or a table of the tightest aspects when there are too many bodies for a grid
+        grid = aspect_grid_batches(longitudes, aspects, planet_glyphs)
+        if grid is not None:
+            lines, glyphs, n = grid
+            self.ax_aspect.set_xlim(0, n)
+            self.ax_aspect.set_ylim(0, n)
+            # Legend for the aspect symbols below the grid
+            self.grid_text.set_position((n / 2, -n / 6))
+            self.grid_text.set_fontsize(10)
+            self.grid_text.set_text('\n'.join(ASPECT_LEGEND))
+        else:
+            lines, glyphs = LineBatch(), GlyphBatch()
+            self.ax_aspect.set_xlim(0, 1)
+            self.ax_aspect.set_ylim(0, 1)
+            self.grid_text.set_position((0.02, 0.98))
+            self.grid_text.set_fontsize(7)
+            self.grid_text.set_text(aspect_table(aspects, planet_glyphs))
+        self._put('grid_lines', lines, self.ax_aspect)
+        self._put('grid_glyphs', glyphs, self.ax_aspect)
+        self.ax_aspect.set_visible(True)
+
+    def draw_legend(self, planet_glyphs):
+        # Legend for planets and signs in the figure (upper-left corner)
+        self.legend.set_text(legend_text(planet_glyphs))
+
+    def render(self, longitudes, house_cusps, ascendant, midheaven, aspects, planet_glyphs):
+        self.draw_wheel(longitudes, house_cusps, ascendant, midheaven, aspects, planet_glyphs)
+        self.draw_aspect_grid(longitudes, aspects, planet_glyphs)
+        self.draw_legend(planet_glyphs)
+
+    def clear(self):
+        for artist in self.artists():
+            artist.set_visible(False)
+        self.legend.set_text('')
+        self.grid_text.set_text('')
+        self.legend.set_visible(True)
+        self.grid_text.set_visible(True)
+
+
+def figure_artist_count(fig):
+    # Every artist reachable from the figure, for spotting leaks
+    return sum(1 for _ in fig.findobj())
+
+
+def rss_kb():
+    # Resident set size of this process, or None where it cannot be read
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss // 1024
+
@@ -0,0 +1,369 @@
+"""
+Indexed store of computed charts for placement and aspect queries.
+Charts come in from the batch executor chunk by chunk. Each body's sign
+and house are kept as int8 code columns. Every sign, house, retrograde
+and aspect-pair condition also gets a bitmap over all charts. A bitmap
+stays a sorted list of chart rows while it is sparse (fewer than one
+chart in 32) and becomes packed 64-bit words once it is denser, whichever
+is smaller. A query such as "Moon in Scorpio and Moon in house 8 and Sun
+square Saturn" is then a few word-wise ANDs, ORs and NOTs over those
+bitmaps, with no chart recomputed.
+"""
+
+import re
+
+import numpy as np
+
+import chart_engine
+from batch import BatchExecutor
+from export import ASPECT_NAMES, batch_aspects, batch_houses
+
+STORE_VERSION = 1
+
+ASPECT_WORDS = {
+    'conjunct': 'Conjunction', 'conjunction': 'Conjunction', 'conjuncts': 'Conjunction',
+    'sextile': 'Sextile', 'sextiles': 'Sextile',
+    'square': 'Square', 'squares': 'Square',
+    'trine': 'Trine', 'trines': 'Trine',
+    'opposite': 'Opposition', 'opposition': 'Opposition', 'opposes': 'Opposition',
+}
+
+
+def pack_mask(mask):
+    # Boolean array to little-endian 64-bit words along its last axis, bit k
+    # of the result = mask[..., k]
+    mask = np.asarray(mask, dtype=bool)
+    n = mask.shape[-1]
+    padded = np.zeros(mask.shape[:-1] + (-(-n // 64) * 64,), dtype=bool)
+    padded[..., :n] = mask
+    return np.packbits(padded, axis=-1, bitorder='little').view('<u8')
+
+
+def popcount(words):
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+class Bitmap:
+    # A set of chart rows in [0, n): sorted uint32 ids when sparse, packed
+    # words when dense
+    __slots__ = ('n', 'ids', 'words')
+
+    def __init__(self, n, ids=None, words=None):
+        self.n = n
+        self.ids = ids
+        self.words = words
+
+    @classmethod
+    def from_mask(cls, mask):
+        count = int(np.count_nonzero(mask))
+        if count * 32 < len(mask):
+            return cls(len(mask), ids=np.flatnonzero(mask).astype(np.uint32))
+        return cls(len(mask), words=pack_mask(mask))
+
+    @classmethod
+    def from_ids(cls, ids, n):
+        ids = np.asarray(ids, dtype=np.uint32)
+        if len(ids) * 32 < n:
+            return cls(n, ids=np.sort(ids))
+        mask = np.zeros(n, dtype=bool)
+        mask[ids] = True
+        return cls(n, words=pack_mask(mask))
+
+    @classmethod
+    def full(cls, n):
+        return ~cls(n, ids=np.empty(0, dtype=np.uint32))
+
+    @property
+    def dense(self):
+        return self.words is not None
+
+    def to_words(self):
+        if self.words is not None:
+            return self.words
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self.ids] = True
+        return pack_mask(mask)
+
+    def _contains(self, ids):
+        # Which of the given ids are set in this (dense) bitmap
+        ids = ids.astype(np.uint64)
+        return (self.words[ids >> np.uint64(6)] >> (ids & np.uint64(63))) & np.uint64(1) == 1
+
+    def __and__(self, other):
+        if self.dense and other.dense:
+            return Bitmap(self.n, words=self.words & other.words)
+        if not self.dense and not other.dense:
+            return Bitmap(self.n, ids=np.intersect1d(self.ids, other.ids, assume_unique=True))
+        sparse, dense = (self, other) if other.dense else (other, self)
+        return Bitmap(self.n, ids=sparse.ids[dense._contains(sparse.ids)])
+
+    def __or__(self, other):
+        if not self.dense and not other.dense:
+            return Bitmap(self.n, ids=np.union1d(self.ids, other.ids))
+        return Bitmap(self.n, words=self.to_words() | other.to_words())
+
+    def __invert__(self):
+        words = ~self.to_words()
+        tail = self.n % 64
+        if tail:
+            words[-1] &= np.uint64((1 << tail) - 1)
+        return Bitmap(self.n, words=words)
+
+    def __len__(self):
+        return popcount(self.words) if self.dense else len(self.ids)
+
+    def rows(self):
+        if not self.dense:
+            return self.ids.astype(np.int64)
+        bits = np.unpackbits(self.words.view(np.uint8), bitorder='little')[:self.n]
+        return np.flatnonzero(bits)
+
+    def nbytes(self):
+        return (self.words if self.dense else self.ids).nbytes
+
+
+class ChartStore:
+    def __init__(self, bodies, jds, lats, lons, signs, houses, bitmaps):
+        self.bodies = list(bodies)
+        self.jds = jds
+        self.lats = lats
+        self.lons = lons
+        self.signs = signs    # (n, bodies) int8, -1 where the body is missing
+        self.houses = houses  # (n, bodies) int8, 1-12
+        self.bitmaps = bitmaps
+        self._body_index = {name.lower(): i for i, name in enumerate(self.bodies)}
+
+    def __len__(self):
+        return len(self.jds)
+
+    def _bitmap(self, key):
+        bitmap = self.bitmaps.get(key)
+        return bitmap if bitmap is not None else Bitmap(len(self), ids=np.empty(0, dtype=np.uint32))
+
+    def body_index(self, body):
+        try:
+            return self._body_index[body.lower()]
+        except KeyError:
+            raise ValueError(f"Unknown body: {body}") from None
+
+    def sign(self, body, sign):
+        k = [s.lower() for s in chart_engine.SIGNS].index(sign.lower()) if isinstance(sign, str) else sign
+        return self._bitmap(('sign', self.body_index(body), k))
+
+    def house(self, body, house):
+        return self._bitmap(('house', self.body_index(body), int(house)))
+
+    def retrograde(self, body):
+        return self._bitmap(('retrograde', self.body_index(body), 0))
+
+    def aspect(self, body1, aspect, body2):
+        i, j = sorted((self.body_index(body1), self.body_index(body2)))
+        name = ASPECT_WORDS.get(aspect.lower(), aspect.title())
+        if name not in ASPECT_NAMES:
+            raise ValueError(f"Unknown aspect: {aspect}")
+        return self._bitmap(('aspect', i * len(self.bodies) + j, ASPECT_NAMES.index(name)))
+
+    def query(self, text):
+        return QueryParser(self, text).parse()
+
+    def charts(self, bitmap):
+        # Chart rows, times and places matching a query
+        rows = bitmap.rows()
+        return {'row': rows, 'jd': self.jds[rows], 'lat': self.lats[rows], 'lon': self.lons[rows]}
+
+    def nbytes(self):
+        return sum(b.nbytes() for b in self.bitmaps.values())
+
+    def save(self, path):
+        arrays = {'version': STORE_VERSION, 'bodies': np.array(self.bodies), 'jds': self.jds,
+                  'lats': self.lats, 'lons': self.lons, 'signs': self.signs, 'houses': self.houses}
+        for (kind, a, b), bitmap in self.bitmaps.items():
+            prefix = 'w' if bitmap.dense else 'i'
+            arrays[f"{prefix}:{kind}:{a}:{b}"] = bitmap.words if bitmap.dense else bitmap.ids
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data['version']) != STORE_VERSION:
+                raise ValueError(f"{path} is a version {int(data['version'])} chart store; expected {STORE_VERSION}")
+            n = len(data['jds'])
+            bitmaps = {}
+            for name in data.files:
+                if ':' not in name:
+                    continue
+                prefix, kind, a, b = name.split(':')
+                array = data[name]
+                bitmaps[(kind, int(a), int(b))] = Bitmap(n, words=array) if prefix == 'w' else Bitmap(n, ids=array)
+            return cls([str(b) for b in data['bodies']], data['jds'], data['lats'], data['lons'],
+                       data['signs'], data['houses'], bitmaps)
+
+
+class StoreBuilder:
+    # Collects BatchResults chunk by chunk; finish() builds the bitmaps
+    def __init__(self):
+        self.bodies = None
+        self.n = 0
+        self._columns = {'jds': [], 'lats': [], 'lons': [], 'signs': [], 'houses': [], 'retrogrades': []}
+        self._aspect_rows = {}
+
+    def add_batch(self, result):
+        if self.bodies is None:
+            self.bodies = list(result.bodies)
+        elif list(result.bodies) != self.bodies:
+            raise ValueError("All batches in a chart store must have the same bodies")
+        lons = result.longitudes
+        missing = np.isnan(lons)
+        self._columns['jds'].append(np.asarray(result.jds, dtype=np.float64))
+        self._columns['lats'].append(result.lats.astype(np.float64))
+        self._columns['lons'].append(result.lons.astype(np.float64))
+        self._columns['signs'].append(np.where(missing, -1, np.nan_to_num(lons) % 360 // 30).astype(np.int8))
+        self._columns['houses'].append(np.where(missing, -1, batch_houses(np.nan_to_num(lons), result.cusps)).astype(np.int8))
+        self._columns['retrogrades'].append(result.speeds < 0)
+
+        # Aspect hits grouped by (pair, aspect) as global chart rows
+        rows, body1, body2, codes, _ = batch_aspects(lons, self.bodies)
+        keys = (body1.astype(np.int64) * len(self.bodies) + body2) * len(ASPECT_NAMES) + codes
+        order = np.argsort(keys, kind='stable')
+        keys, rows = keys[order], rows[order] + self.n
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, dtype=np.int64)
+        for start, stop in zip(starts, np.r_[starts[1:], len(keys)]):
+            self._aspect_rows.setdefault(int(keys[start]), []).append(rows[start:stop].astype(np.uint32))
+        self.n += len(result)
+
+    def finish(self):
+        columns = {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in self._columns.items()}
+        n = self.n
+        bitmaps = {}
+        signs, houses, retrogrades = columns['signs'], columns['houses'], columns['retrogrades']
+        for b in range(len(self.bodies or ())):
+            for k in range(12):
+                mask = signs[:, b] == k
+                if mask.any():
+                    bitmaps[('sign', b, k)] = Bitmap.from_mask(mask)
+                mask = houses[:, b] == k + 1
+                if mask.any():
+                    bitmaps[('house', b, k + 1)] = Bitmap.from_mask(mask)
+            mask = retrogrades[:, b] & (signs[:, b] >= 0)
+            if mask.any():
+                bitmaps[('retrograde', b, 0)] = Bitmap.from_mask(mask)
+        for key, parts in self._aspect_rows.items():
+            pair, code = divmod(key, len(ASPECT_NAMES))
+            bitmaps[('aspect', pair, code)] = Bitmap.from_ids(np.concatenate(parts), n)
+        return ChartStore(self.bodies or [], columns['jds'], columns['lats'], columns['lons'],
+                          signs, houses, bitmaps)
+
+
+def build_store(jds, lats, lons, chunk_size=100000, executor=None, **kwargs):
+    # Compute charts chunk_size at a time and index them; lats/lons may be scalars
+    jds = np.asarray(jds, dtype=np.float64)
+    n = len(jds)
+    lats = np.broadcast_to(np.asarray(lats, dtype=np.float64), (n,))
+    lons = np.broadcast_to(np.asarray(lons, dtype=np.float64), (n,))
+    own_executor = executor is None
+    executor = executor or BatchExecutor(**kwargs)
+    builder = StoreBuilder()
+    try:
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            builder.add_batch(executor.compute(jds[start:stop], lats[start:stop], lons[start:stop]))
+    finally:
+        if own_executor:
+            executor.close()
+    return builder.finish()
+
+
+TOKEN_RE = re.compile(r"\(|\)|[^\s(),]+")
+ORDINAL_RE = re.compile(r"^(\d+)(st|nd|rd|th)?$")
+
+
+class QueryParser:
+    # expr   := term ('or' term)*
+    # term   := factor ('and' factor)*
+    # factor := 'not' factor | '(' expr ')' | clause
+    # clause := BODY 'in' SIGN | BODY 'in' ['house'] N ['house'] | BODY 'retrograde'
+    #         | BODY ASPECT BODY
+    def __init__(self, store, text):
+        self.store = store
+        self.tokens = TOKEN_RE.findall(text.lower())
+        self.pos = 0
+        self.body_names = sorted(store.bodies, key=lambda b: -len(b.split()))
+        self.sign_names = [s.lower() for s in chart_engine.SIGNS]
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        token = self.peek()
+        if token is None or (expected is not None and token != expected):
+            raise ValueError(f"Expected {expected or 'more'} at {' '.join(self.tokens[self.pos:]) or 'end of query'}")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            return Bitmap.full(len(self.store))
+        result = self.expr()
+        if self.peek() is not None:
+            raise ValueError(f"Unexpected '{self.peek()}' in query")
+        return result
+
+    def expr(self):
+        result = self.term()
+        while self.peek() == 'or':
+            self.take()
+            result = result | self.term()
+        return result
+
+    def term(self):
+        result = self.factor()
+        while self.peek() == 'and':
+            self.take()
+            result = result & self.factor()
+        return result
+
+    def factor(self):
+        if self.peek() == 'not':
+            self.take()
+            return ~self.factor()
+        if self.peek() == '(':
+            self.take()
+            result = self.expr()
+            self.take(')')
+            return result
+        return self.clause()
+
+    def body(self):
+        for name in self.body_names:
+            words = name.lower().split()
+            if self.tokens[self.pos:self.pos + len(words)] == words:
+                self.pos += len(words)
+                return name
+        raise ValueError(f"Expected a body at '{self.peek() or 'end of query'}'")
+
+    def house_number(self):
+        match = ORDINAL_RE.match(self.take())
+        if not match or not 1 <= int(match.group(1)) <= 12:
+            raise ValueError(f"Expected a house number 1-12 at '{self.tokens[self.pos - 1]}'")
+        return int(match.group(1))
+
+    def clause(self):
+        body = self.body()
+        token = self.take()
+        if token == 'in':
+            if self.peek() in self.sign_names:
+                return self.store.sign(body, self.take())
+            if self.peek() == 'house':
+                self.take()
+                return self.store.house(body, self.house_number())
+            house = self.house_number()
+            if self.peek() == 'house':
+                self.take()
+            return self.store.house(body, house)
+        if token in ('retrograde', 'rx'):
+            return self.store.retrograde(body)
+        if token in ASPECT_WORDS:
+            return self.store.aspect(body, token, self.body())
+        raise ValueError(f"Expected 'in', 'retrograde' or an aspect after {body}, got '{token}'")
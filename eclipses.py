@@ -0,0 +1,175 @@
+"""
+Cached eclipse catalog.
+Every solar and lunar eclipse over a range of years is found once with
+sol_eclipse_when_glob / lun_eclipse_when and stored in DATA_DIR as an .npz
+of arrays sorted by Julian day, plus an ordering by ecliptic longitude
+(the Sun's for a solar eclipse, the Moon's for a lunar one). A chart's
+prenatal eclipses are then a binary search on the days, and eclipses
+falling on its natal points a binary-search window on the longitudes,
+like the fixed star contacts.
+"""
+
+import os
+
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+from ephemeris import year_to_jd
+from fixed_stars import chart_points
+
+CATALOG_VERSION = 1
+START_YEAR = 1800
+END_YEAR = 2200
+
+KINDS = ('Solar', 'Lunar')
+SOLAR, LUNAR = 0, 1
+# Checked in this order: a hybrid eclipse is flagged ECL_ANNULAR_TOTAL only
+TYPES = [(swe.ECL_ANNULAR_TOTAL, 'Hybrid'), (swe.ECL_TOTAL, 'Total'), (swe.ECL_ANNULAR, 'Annular'),
+         (swe.ECL_PARTIAL, 'Partial'), (swe.ECL_PENUMBRAL, 'Penumbral')]
+TYPE_NAMES = [name for _, name in TYPES]
+
+# Eclipses come in seasons about six months apart; after one is found the
+# next search starts this many days later
+SEARCH_GAP = 20.0
+
+
+def eclipse_type(retflag):
+    for flag, name in TYPES:
+        if retflag & flag:
+            return TYPE_NAMES.index(name)
+    raise ValueError(f"Unknown eclipse type flags {retflag}")
+
+
+def search_eclipses(jd_start, jd_end, flags=swe.FLG_SWIEPH):
+    # (jd, kind, type, longitude) arrays of every eclipse in [jd_start, jd_end), sorted by jd
+    jds, kinds, types, lons = [], [], [], []
+    for kind, when, body in ((SOLAR, swe.sol_eclipse_when_glob, swe.SUN), (LUNAR, swe.lun_eclipse_when, swe.MOON)):
+        jd = jd_start
+        while True:
+            retflag, tret = when(jd, flags)
+            if tret[0] >= jd_end:
+                break
+            pos, ret = swe.calc_ut(tret[0], body, flags)
+            jds.append(tret[0])
+            kinds.append(kind)
+            types.append(eclipse_type(retflag))
+            lons.append(pos[0])
+            jd = tret[0] + SEARCH_GAP
+    order = np.argsort(jds, kind='stable')
+    return (np.array(jds)[order], np.array(kinds, dtype=np.int8)[order], np.array(types, dtype=np.int8)[order],
+            np.array(lons)[order])
+
+
+def build_catalog(start_year, end_year, path):
+    jd, kind, types, lon = search_eclipses(year_to_jd(start_year), year_to_jd(end_year))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(
+        path,
+        version=CATALOG_VERSION,
+        years=np.array([start_year, end_year], dtype=np.int64),
+        jd=jd, kind=kind, type=types, lon=lon,
+        by_lon=np.argsort(lon, kind='stable').astype(np.int32),
+    )
+
+
+class EclipseCatalog:
+    def __init__(self, jd, kind, types, lon, by_lon, start_jd, end_jd):
+        self.jd = jd
+        self.kind = kind
+        self.types = types
+        self.lon = lon
+        self.by_lon = by_lon
+        self.start_jd = start_jd
+        self.end_jd = end_jd
+        # Row numbers and days of each kind, for prenatal searches
+        self.kind_rows = [np.nonzero(kind == k)[0] for k in range(len(KINDS))]
+        self.kind_jds = [jd[rows] for rows in self.kind_rows]
+
+    def __len__(self):
+        return len(self.jd)
+
+    @classmethod
+    def load(cls, start_year=START_YEAR, end_year=END_YEAR, path=None):
+        path = path or os.path.join(chart_engine.DATA_DIR, 'eclipses.npz')
+        for _ in range(2):
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    if int(data['version']) == CATALOG_VERSION and list(data['years']) == [start_year, end_year]:
+                        return cls(data['jd'], data['kind'], data['type'], data['lon'], data['by_lon'],
+                                   year_to_jd(start_year), year_to_jd(end_year))
+            build_catalog(start_year, end_year, path)
+        raise ValueError(f"Could not build eclipse catalog at {path}")
+
+    def covers(self, jd):
+        return self.start_jd <= jd < self.end_jd
+
+    def eclipse(self, row):
+        return {
+            'jd': float(self.jd[row]),
+            'kind': KINDS[self.kind[row]],
+            'type': TYPE_NAMES[self.types[row]],
+            'longitude': float(self.lon[row]),
+        }
+
+    def prenatal_rows(self, jds, kind):
+        # Row of the last eclipse of a kind before each jd; -1 when the
+        # catalog cannot tell (jd outside it, or no earlier eclipse in it)
+        jds = np.asarray(jds, dtype=float)
+        rows, kind_jds = self.kind_rows[kind], self.kind_jds[kind]
+        pos = np.searchsorted(kind_jds, jds, side='left') - 1
+        known = (pos >= 0) & (jds >= self.start_jd) & (jds < self.end_jd)
+        return np.where(known, rows[np.maximum(pos, 0)], -1)
+
+    def prenatal(self, jd):
+        # {'Solar': eclipse or None, 'Lunar': eclipse or None}
+        found = {}
+        for k, name in enumerate(KINDS):
+            row = int(self.prenatal_rows([jd], k)[0])
+            found[name] = self.eclipse(row) if row >= 0 else None
+        return found
+
+    def contacts(self, points, orb=1.0, jd_start=-np.inf, jd_end=np.inf):
+        # points: {name: longitude}. Returns (eclipse, point, orb) for eclipses
+        # in [jd_start, jd_end) within orb of a point, in date order.
+        sorted_lons = self.lon[self.by_lon]
+        # Pad one orb's worth of eclipses on each side so windows can wrap 0° Aries
+        wrapped = np.concatenate([sorted_lons - 360, sorted_lons, sorted_lons + 360])
+        wrapped_idx = np.concatenate([self.by_lon, self.by_lon, self.by_lon])
+
+        names = list(points)
+        targets = np.array([points[n] for n in names], dtype=float) % 360
+        lo = np.searchsorted(wrapped, targets - orb, side='left')
+        hi = np.searchsorted(wrapped, targets + orb, side='right')
+
+        found = []
+        for point, target, a, b in zip(names, targets, lo, hi):
+            for k in range(a, b):
+                row = wrapped_idx[k]
+                if jd_start <= self.jd[row] < jd_end:
+                    found.append((self.eclipse(row), point, float(wrapped[k] - target)))
+        found.sort(key=lambda x: x[0]['jd'])
+        return found
+
+
+# Built on first use (a couple of seconds per few centuries) in the calling
+# thread: swisseph state cannot be shared with a background thread
+_default_catalog = None
+
+
+def get_catalog():
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = EclipseCatalog.load()
+    return _default_catalog
+
+
+def prenatal_eclipses(chart, catalog=None):
+    catalog = catalog or get_catalog()
+    return catalog.prenatal(chart['jd'])
+
+
+def find_eclipse_contacts(chart, orb=1.0, years=100, catalog=None):
+    # Eclipses from birth to `years` later that fall on a natal point or angle
+    catalog = catalog or get_catalog()
+    return catalog.contacts(chart_points(chart), orb, chart['jd'], chart['jd'] + years * 365.25)
@@ -0,0 +1,210 @@
+"""
+Ephemeris file manager.
+Finds the ephe/ directory regardless of the working directory, indexes which
+.se1 file covers which dates, pre-reads the files a date range needs and keeps
+track of calculations that silently fell back to the Moshier ephemeris.
+"""
+
+import collections
+import os
+import re
+import threading
+import time
+
+import swisseph as swe
+
+# Planet, moon and main-asteroid files each span 600 years starting at the
+# century in the name; 'm' marks years before 0 (seplm06 = -600 .. 0)
+BLOCK_FILE_RE = re.compile(r'^se(pl|mo|as)(_|m)(\d{2,3})\.se1$')
+# Numbered asteroid files (se00433.se1, s123456.se1) and planetary moons (sepm9504.se1)
+ASTEROID_FILE_RE = re.compile(r'^se?(\d{5,6})s?\.se1$')
+PLANET_MOON_FILE_RE = re.compile(r'^sepm(\d{4})\.se1$')
+
+BLOCK_KINDS = {'pl': 'planet', 'mo': 'moon', 'as': 'asteroid'}
+BLOCK_YEARS = 600
+
+# Which body to calculate to make Swiss Ephemeris open each kind of file
+WARMUP_BODIES = {'planet': swe.SUN, 'moon': swe.MOON, 'asteroid': swe.CHIRON}
+# Recent Moshier fallbacks kept for inspection; older ones are only counted
+MAX_FALLBACK_SAMPLES = 100
+
+EphemerisFile = collections.namedtuple('EphemerisFile', 'kind body path size start_jd end_jd')
+
+
+def resolve_ephe_path(path=None):
+    # Explicit argument, then the environment, then ephe/ next to this file,
+    # and only then the working directory
+    candidates = [
+        path,
+        os.environ.get('ASTROCHART_EPHE_PATH'),
+        os.environ.get('SE_EPHE_PATH'),
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ephe'),
+        os.path.abspath('ephe'),
+    ]
+    for candidate in candidates:
+        if candidate and os.path.isdir(candidate):
+            return os.path.abspath(candidate)
+    raise ValueError("Could not find the Swiss Ephemeris 'ephe' directory; set ASTROCHART_EPHE_PATH.")
+
+
+def year_to_jd(year):
+    calendar = swe.GREG_CAL if year >= 1583 else swe.JUL_CAL
+    return swe.julday(year, 1, 1, 0.0, calendar)
+
+
+def parse_ephemeris_file(path):
+    name = os.path.basename(path)
+    size = os.path.getsize(path)
+    match = BLOCK_FILE_RE.match(name)
+    if match:
+        kind_code, sign, century = match.groups()
+        start_year = int(century) * 100 * (-1 if sign == 'm' else 1)
+        return EphemerisFile(BLOCK_KINDS[kind_code], None, path, size,
+                             year_to_jd(start_year), year_to_jd(start_year + BLOCK_YEARS))
+    match = PLANET_MOON_FILE_RE.match(name)
+    if match:
+        # Coverage is only known once Swiss Ephemeris has opened the file
+        return EphemerisFile('planet_moon', int(match.group(1)), path, size, None, None)
+    match = ASTEROID_FILE_RE.match(name)
+    if match:
+        return EphemerisFile('numbered_asteroid', int(match.group(1)) + swe.AST_OFFSET, path, size, None, None)
+    return None
+
+
+class EphemerisManager:
+    def __init__(self, path=None):
+        self.path = resolve_ephe_path(path)
+        self.io_stats = {}  # path -> {'bytes', 'seconds', 'reads'}
+        # Calculations done with Moshier instead of the files, and the most
+        # recent (jd, body name) of them
+        self.fallback_count = 0
+        self.fallbacks = collections.deque(maxlen=MAX_FALLBACK_SAMPLES)
+        self._files = None
+        self._lock = threading.Lock()
+        self._prefetch_thread = None
+
+    def activate(self):
+        swe.set_ephe_path(self.path)
+
+    @property
+    def files(self):
+        # Built on first use; a directory listing is cheap but not free
+        if self._files is None:
+            files = []
+            for dirpath, dirnames, filenames in os.walk(self.path):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    entry = parse_ephemeris_file(os.path.join(dirpath, name))
+                    if entry:
+                        files.append(entry)
+            self._files = files
+        return self._files
+
+    def refresh(self):
+        self._files = None
+
+    def coverage(self, kind='planet'):
+        # Contiguous JD range covered by one kind of block file, or None
+        spans = sorted((f.start_jd, f.end_jd) for f in self.files if f.kind == kind and f.start_jd is not None)
+        if not spans:
+            return None
+        start, end = spans[0]
+        for s, e in spans[1:]:
+            if s > end + 1:
+                break
+            end = max(end, e)
+        return start, end
+
+    def covers(self, jd, kinds=('planet', 'moon')):
+        return all(self.files_for_range(jd, jd, kinds=(kind,)) for kind in kinds)
+
+    def files_for_range(self, jd_start, jd_end, kinds=('planet', 'moon', 'asteroid')):
+        return [f for f in self.files
+                if f.kind in kinds and f.start_jd is not None
+                and f.start_jd <= jd_end and f.end_jd >= jd_start]
+
+    def prefetch(self, jd_start, jd_end=None, kinds=('planet', 'moon', 'asteroid'), background=False):
+        # Read the files into the OS page cache so the first calc_ut that
+        # opens them does not wait on the disk. Safe to run in a thread: it
+        # never touches Swiss Ephemeris state.
+        files = self.files_for_range(jd_start, jd_start if jd_end is None else jd_end, kinds)
+        if not background:
+            self._read_files(files)
+            return files
+        self._prefetch_thread = threading.Thread(target=self._read_files, args=(files,), daemon=True)
+        self._prefetch_thread.start()
+        return files
+
+    def wait(self, timeout=None):
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join(timeout)
+
+    def warmup(self, jd_start, jd_end=None, kinds=('planet', 'moon', 'asteroid')):
+        # Prefetch, then make Swiss Ephemeris open each file once. Must run on
+        # the thread that does the calculations.
+        jd_end = jd_start if jd_end is None else jd_end
+        files = self.prefetch(jd_start, jd_end, kinds)
+        for f in files:
+            jd = min(max(jd_start, f.start_jd + 1), f.end_jd - 1)
+            pos, ret = swe.calc_ut(jd, WARMUP_BODIES[f.kind], swe.FLG_SWIEPH)
+            self.check_result(jd, f.kind, ret, swe.FLG_SWIEPH)
+        return files
+
+    def check_result(self, jd, body, retflag, flags):
+        # calc_ut quietly switches to Moshier when a file is missing; the
+        # returned flags are the only sign of it
+        if flags & swe.FLG_SWIEPH and retflag & swe.FLG_MOSEPH:
+            with self._lock:
+                if not self.fallback_count:
+                    print(f"Warning: no ephemeris file for JD {jd:.1f} in {self.path}; using Moshier instead")
+                self.fallback_count += 1
+                self.fallbacks.append((jd, body))
+            return False
+        return True
+
+    def open_files(self):
+        # Files Swiss Ephemeris currently has open: planet, moon, main
+        # asteroid, other asteroid, planetary moon
+        opened = []
+        for fno in range(5):
+            path, start, end, denum = swe.get_current_file_data(fno)
+            if path:
+                opened.append((path, start, end))
+        return opened
+
+    def report(self):
+        lines = [f"Ephemeris path: {self.path}"]
+        for kind in ('planet', 'moon', 'asteroid'):
+            span = self.coverage(kind)
+            if span:
+                start = swe.revjul(span[0])[0]
+                end = swe.revjul(span[1])[0]
+                lines.append(f"{kind}: {start} to {end}")
+            else:
+                lines.append(f"{kind}: no files (Moshier only)")
+        for path, stats in sorted(self.io_stats.items()):
+            rate = stats['bytes'] / stats['seconds'] / 1e6 if stats['seconds'] else 0.0
+            lines.append(f"{os.path.relpath(path, self.path)}: {stats['bytes']} bytes in "
+                         f"{stats['reads']} reads, {stats['seconds'] * 1000:.1f} ms ({rate:.0f} MB/s)")
+        if self.fallback_count:
+            lines.append(f"Moshier fallbacks: {self.fallback_count}")
+        return lines
+
+    def _read_files(self, files, chunk_size=1 << 20):
+        for f in files:
+            start = time.perf_counter()
+            total = 0
+            reads = 0
+            with open(f.path, 'rb') as fh:
+                while True:
+                    chunk = fh.read(chunk_size)
+                    reads += 1
+                    if not chunk:
+                        break
+                    total += len(chunk)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self.io_stats.setdefault(f.path, {'bytes': 0, 'seconds': 0.0, 'reads': 0})
+                stats['bytes'] += total
+                stats['seconds'] += elapsed
+                stats['reads'] += reads
@@ -0,0 +1,335 @@
+"""
+Export of computed charts as tables.
+Three tables describe a set of charts: positions (one row per chart and
+body, with speed, retrograde flag, sign and house), charts (one row per
+chart, with location, angles and the 12 cusps) and aspects (one row per
+aspect). They are written as Parquet or Arrow IPC files, which can be
+memory-mapped and read without copying, as CSV, or as JSON Lines with one
+nested record per chart.
+Batches are computed and written chunk by chunk, so memory stays bounded
+however many charts are exported.
+"""
+
+import csv
+import json
+import math
+import os
+
+import numpy as np
+
+import chart_engine
+from batch import BatchExecutor, BatchResult
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FORMATS = ('parquet', 'arrow', 'csv', 'jsonl')
+TABLES = ('positions', 'charts', 'aspects')
+
+CUSP_FIELDS = [f"cusp_{i}" for i in range(1, 13)]
+POSITION_FIELDS = ['chart', 'jd', 'body', 'longitude', 'speed', 'retrograde', 'sign', 'house']
+CHART_FIELDS = ['chart', 'jd', 'lat', 'lon', 'ascendant', 'midheaven'] + CUSP_FIELDS
+ASPECT_FIELDS = ['chart', 'jd', 'body1', 'body2', 'aspect', 'separation', 'orb']
+ASPECT_NAMES = list(chart_engine.MAJOR_ASPECTS)
+
+
+def batch_houses(longitudes, cusps):
+    # House numbers for an (n, bodies) longitude array against (n, 12) cusps;
+    # the vectorized form of chart_engine.houses_of, one row per chart
+    first = cusps[:, :1]
+    offsets = (cusps - first) % 360
+    rel = (longitudes - first) % 360
+    return (offsets[:, None, :] <= rel[:, :, None]).sum(axis=2)
+
+
+def batch_aspects(longitudes, bodies):
+    # All aspects of every chart in the batch, tested one body pair at a time
+    # across all rows. Returns (chart rows, body1, body2, aspect, separation)
+    # index arrays, ordered by chart and then by pair.
+    rows, first, second, codes, seps = [], [], [], [], []
+    for i in range(len(bodies)):
+        for j in range(i + 1, len(bodies)):
+            rules = chart_engine.pair_aspects(bodies[i], bodies[j])
+            if not rules:
+                continue
+            diff = np.abs(longitudes[:, i] - longitudes[:, j]) % 360
+            diff = np.minimum(diff, 360 - diff)
+            found = np.full(len(diff), -1, dtype=np.int8)
+            for name, angle, orb in reversed(rules):
+                # Later aspects first so the earliest match wins
+                found[np.abs(diff - angle) <= orb] = ASPECT_NAMES.index(name)
+            hit = np.nonzero(found >= 0)[0]
+            rows.append(hit)
+            first.append(np.full(len(hit), i, dtype=np.int16))
+            second.append(np.full(len(hit), j, dtype=np.int16))
+            codes.append(found[hit])
+            seps.append(diff[hit])
+    if not rows:
+        return (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int16), np.empty(0, dtype=np.int16),
+                np.empty(0, dtype=np.int8), np.empty(0))
+    rows = np.concatenate(rows)
+    order = np.argsort(rows, kind='stable')
+    return (rows[order], np.concatenate(first)[order], np.concatenate(second)[order],
+            np.concatenate(codes)[order], np.concatenate(seps)[order])
+
+
+def batch_tables(result, first_id=0):
+    # Column arrays of the three tables for a BatchResult. String columns are
+    # kept as (codes, labels) pairs so they can become dictionary arrays.
+    n, n_bodies = result.longitudes.shape
+    ids = np.arange(first_id, first_id + n, dtype=np.int64)
+    lons = result.longitudes
+    missing = np.isnan(lons)
+
+    signs = np.where(missing, -1, np.nan_to_num(lons) % 360 // 30).astype(np.int8)
+    houses = np.where(missing, -1, batch_houses(np.nan_to_num(lons), result.cusps)).astype(np.int8)
+    positions = {
+        'chart': np.repeat(ids, n_bodies),
+        'jd': np.repeat(result.jds, n_bodies),
+        'body': (np.tile(np.arange(n_bodies, dtype=np.int16), n), result.bodies),
+        'longitude': lons.ravel(),
+        'speed': result.speeds.ravel(),
+        'retrograde': (result.speeds < 0).ravel(),
+        'sign': (signs.ravel(), chart_engine.SIGNS),
+        'house': houses.ravel(),
+    }
+
+    charts = {
+        'chart': ids,
+        'jd': result.jds,
+        'lat': result.lats,
+        'lon': result.lons,
+        'ascendant': result.ascendants,
+        'midheaven': result.midheavens,
+    }
+    for k, field in enumerate(CUSP_FIELDS):
+        charts[field] = result.cusps[:, k]
+
+    rows, body1, body2, codes, seps = batch_aspects(lons, result.bodies)
+    angles = np.array([chart_engine.MAJOR_ASPECTS[name][0] for name in ASPECT_NAMES], dtype=float)
+    aspects = {
+        'chart': ids[rows],
+        'jd': result.jds[rows],
+        'body1': (body1, result.bodies),
+        'body2': (body2, result.bodies),
+        'aspect': (codes, ASPECT_NAMES),
+        'separation': seps,
+        'orb': np.abs(seps - angles[codes]),
+    }
+    return {'positions': positions, 'charts': charts, 'aspects': aspects}
+
+
+def charts_to_batch(charts):
+    # Stack compute_chart dicts (all with the same bodies) into a BatchResult
+    bodies = list(charts[0]['longitudes'])
+    n_bodies = len(bodies)
+    values = np.full((len(charts), 3 * n_bodies + 14), np.nan)
+    for row, chart in enumerate(charts):
+        for b, name in enumerate(bodies):
+            if chart['longitudes'][name] is not None:
+                values[row, b] = chart['longitudes'][name]
+                values[row, n_bodies + b] = chart['speeds'][name]
+        values[row, 2 * n_bodies:2 * n_bodies + 12] = chart['house_cusps'][:12]
+        values[row, 2 * n_bodies + 12] = chart['ascendant']
+        values[row, 2 * n_bodies + 13] = chart['midheaven']
+        values[row, 2 * n_bodies + 14:] = [name in chart.get('fallbacks', ()) for name in bodies]
+    return BatchResult(dict.fromkeys(bodies), np.array([c['jd'] for c in charts], dtype=float),
+                       [c['lat'] for c in charts], [c['lon'] for c in charts], values)
+
+
+def plain_column(column):
+    # Decode a (codes, labels) column to a list of strings, None for -1
+    if isinstance(column, tuple):
+        codes, labels = column
+        return [labels[c] if c >= 0 else None for c in codes.tolist()]
+    return column.tolist()
+
+
+class ArrowTableWriter:
+    # Parquet (one row group per chunk) or Arrow IPC file (one record batch per chunk)
+    def __init__(self, path, fmt):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet and Arrow export (pip install pyarrow)")
+        self.path = path
+        self.fmt = fmt
+        self._writer = None
+        self._sink = None
+
+    def arrow_column(self, column):
+        if isinstance(column, tuple):
+            codes, labels = column
+            codes = np.asarray(codes)
+            indices = pa.array(codes, mask=codes < 0) if (codes < 0).any() else pa.array(codes)
+            return pa.DictionaryArray.from_arrays(indices, pa.array(list(labels), type=pa.string()))
+        if column.dtype.kind == 'f':
+            return pa.array(column, mask=np.isnan(column))
+        if column.dtype.kind == 'i' and (column < 0).any():
+            return pa.array(column, mask=column < 0)
+        return pa.array(column)
+
+    def write(self, columns):
+        batch = pa.RecordBatch.from_arrays([self.arrow_column(c) for c in columns.values()], names=list(columns))
+        if self._writer is None:
+            if self.fmt == 'parquet':
+                self._writer = pq.ParquetWriter(self.path, batch.schema)
+            else:
+                self._sink = pa.OSFile(self.path, 'wb')
+                self._writer = pa.ipc.new_file(self._sink, batch.schema)
+        if self.fmt == 'parquet':
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+
+class CsvTableWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._header = False
+
+    def write(self, columns):
+        if not self._header:
+            self._writer.writerow(list(columns))
+            self._header = True
+        values = []
+        for column in columns.values():
+            if isinstance(column, tuple):
+                values.append(plain_column(column))
+            elif column.dtype.kind == 'f':
+                values.append(['' if math.isnan(v) else repr(v) for v in column.tolist()])
+            elif column.dtype.kind == 'i' and (column < 0).any():
+                values.append(['' if v < 0 else v for v in column.tolist()])
+            else:
+                values.append(column.tolist())
+        self._writer.writerows(zip(*values))
+
+    def close(self):
+        self._file.close()
+
+
+class JsonLinesWriter:
+    # One JSON object per chart with its positions, cusps and aspects nested
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, tables):
+        charts = tables['charts']
+        positions = {name: plain_column(col) for name, col in tables['positions'].items()}
+        aspects = {name: plain_column(col) for name, col in tables['aspects'].items()}
+        n_bodies = len(positions['chart']) // max(len(charts['chart']), 1)
+        a = 0
+        for row, chart_id in enumerate(charts['chart'].tolist()):
+            record = {name: charts[name][row].item() for name in CHART_FIELDS if name not in CUSP_FIELDS}
+            record['cusps'] = [charts[name][row].item() for name in CUSP_FIELDS]
+            bodies = {}
+            for k in range(row * n_bodies, (row + 1) * n_bodies):
+                lon = positions['longitude'][k]
+                bodies[positions['body'][k]] = None if math.isnan(lon) else {
+                    'longitude': lon,
+                    'speed': positions['speed'][k],
+                    'retrograde': positions['retrograde'][k],
+                    'sign': positions['sign'][k],
+                    'house': positions['house'][k],
+                }
+            record['positions'] = bodies
+            record['aspects'] = []
+            while a < len(aspects['chart']) and aspects['chart'][a] == chart_id:
+                record['aspects'].append({name: aspects[name][a] for name in ASPECT_FIELDS[2:]})
+                a += 1
+            self._file.write(json.dumps(record) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class ChartExporter:
+    # Streams tables to out_dir/<table>.<format> for each requested format
+    def __init__(self, out_dir, formats=('parquet',)):
+        unknown = set(formats) - set(FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown export format(s): {', '.join(sorted(unknown))}")
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.formats = tuple(formats)
+        self.charts_written = 0
+        self._writers = []
+        for fmt in self.formats:
+            if fmt == 'jsonl':
+                self._writers.append((None, JsonLinesWriter(os.path.join(out_dir, 'charts.jsonl'))))
+                continue
+            for table in TABLES:
+                path = os.path.join(out_dir, f"{table}.{fmt}")
+                writer = CsvTableWriter(path) if fmt == 'csv' else ArrowTableWriter(path, fmt)
+                self._writers.append((table, writer))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_batch(self, result):
+        tables = batch_tables(result, self.charts_written)
+        for table, writer in self._writers:
+            writer.write(tables if table is None else tables[table])
+        self.charts_written += len(result)
+
+    def write_charts(self, charts):
+        if charts:
+            self.write_batch(charts_to_batch(charts))
+
+    def close(self):
+        for _, writer in self._writers:
+            writer.close()
+        self._writers = []
+
+
+def available_formats():
+    return FORMATS if pa is not None else ('csv', 'jsonl')
+
+
+def export_charts(charts, out_dir, formats=('parquet',)):
+    # compute_chart dicts, e.g. the chart shown in the GUI
+    with ChartExporter(out_dir, formats) as exporter:
+        exporter.write_charts(list(charts))
+    return exporter.charts_written
+
+
+def export_batch(jds, lats, lons, out_dir, formats=('parquet',), chunk_size=100000, executor=None, **kwargs):
+    # Compute and write charts chunk_size at a time; lats/lons may be scalars
+    jds = np.asarray(jds, dtype=np.float64)
+    n = len(jds)
+    lats = np.broadcast_to(np.asarray(lats, dtype=np.float64), (n,))
+    lons = np.broadcast_to(np.asarray(lons, dtype=np.float64), (n,))
+    own_executor = executor is None
+    executor = executor or BatchExecutor(**kwargs)
+    try:
+        with ChartExporter(out_dir, formats) as exporter:
+            for start in range(0, n, chunk_size):
+                stop = min(start + chunk_size, n)
+                exporter.write_batch(executor.compute(jds[start:stop], lats[start:stop], lons[start:stop]))
+    finally:
+        if own_executor:
+            executor.close()
+    return exporter.charts_written
+
+
+def read_table(out_dir, table, fmt='arrow'):
+    # Memory-mapped, zero-copy read of an exported Arrow or Parquet table
+    if pa is None:
+        raise ImportError("pyarrow is required to read Parquet and Arrow exports (pip install pyarrow)")
+    path = os.path.join(out_dir, f"{table}.{fmt}")
+    if fmt == 'parquet':
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
@@ -0,0 +1,183 @@
+"""
+Fixed-star contacts for natal charts.
+ephe/sefstars.txt is parsed once into a compact .npz index holding each
+star's J2000 ecliptic position and its yearly drift from proper motion.
+For a chart all star longitudes are brought to the chart date in one
+vectorized step (drift, ecliptic precession, nutation and aberration),
+sorted, and each natal point finds its stars with a binary-search window.
+"""
+
+import os
+
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+
+CATALOG_FILE = 'sefstars.txt'
+INDEX_VERSION = 1
+J2000 = 2451545.0
+OBLIQUITY_J2000 = np.radians(23.4392911)
+ABERRATION = 20.49552 / 3600.0
+
+
+def equatorial_to_ecliptic(ra, dec):
+    # Degrees in, degrees out; J2000 mean equator and ecliptic
+    ra = np.radians(ra)
+    dec = np.radians(dec)
+    sin_lat = np.sin(dec) * np.cos(OBLIQUITY_J2000) - np.cos(dec) * np.sin(OBLIQUITY_J2000) * np.sin(ra)
+    lon = np.arctan2(np.sin(ra) * np.cos(OBLIQUITY_J2000) + np.tan(dec) * np.sin(OBLIQUITY_J2000), np.cos(ra))
+    return np.degrees(lon) % 360, np.degrees(np.arcsin(sin_lat))
+
+
+def parse_catalog(path):
+    names, codes, ra, dec, pm_ra, pm_dec, mags = [], [], [], [], [], [], []
+    seen = set()
+    with open(path, encoding='latin-1') as f:
+        for line in f:
+            if line.startswith('#') or not line.strip():
+                continue
+            fields = [x.strip() for x in line.split(',')]
+            if len(fields) < 14:
+                continue
+            name, code, equinox = fields[0], fields[1], fields[2]
+            # The same star is listed under several spellings; the first wins.
+            # The one B1950 entry is the solar apex, not a star.
+            if code in seen or equinox == '1950':
+                continue
+            seen.add(code)
+            h, m, s = float(fields[3]), float(fields[4]), float(fields[5])
+            sign = -1.0 if fields[6].startswith('-') else 1.0
+            d, dm, ds = abs(float(fields[6])), float(fields[7]), float(fields[8])
+            names.append(name or code)
+            codes.append(code)
+            ra.append((h + m / 60 + s / 3600) * 15)
+            dec.append(sign * (d + dm / 60 + ds / 3600))
+            pm_ra.append(float(fields[9]))
+            pm_dec.append(float(fields[10]))
+            mags.append(float(fields[13]))
+    return names, codes, np.array(ra), np.array(dec), np.array(pm_ra), np.array(pm_dec), np.array(mags)
+
+
+def build_index(catalog_path, index_path):
+    names, codes, ra, dec, pm_ra, pm_dec, mags = parse_catalog(catalog_path)
+    lon0, lat0 = equatorial_to_ecliptic(ra, dec)
+
+    # Proper motion (mas/yr; RA already scaled by cos dec) turned into an
+    # ecliptic longitude drift by moving each star a century forward
+    cos_dec = np.maximum(np.cos(np.radians(dec)), 1e-9)
+    ra_100 = ra + pm_ra * 100 / 3.6e6 / cos_dec
+    dec_100 = dec + pm_dec * 100 / 3.6e6
+    lon_100, _ = equatorial_to_ecliptic(ra_100, dec_100)
+    drift = ((lon_100 - lon0 + 180) % 360 - 180) / 100
+
+    st = os.stat(catalog_path)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    np.savez_compressed(
+        index_path,
+        version=INDEX_VERSION,
+        source=np.array([st.st_size, st.st_mtime_ns], dtype=np.int64),
+        names=np.array(names),
+        codes=np.array(codes),
+        lon=lon0, lat=lat0, drift=drift,
+        mag=mags.astype(np.float32),
+    )
+
+
+class StarCatalog:
+    def __init__(self, names, codes, lon, lat, drift, mag):
+        self.names = names
+        self.codes = codes
+        self.lon = lon
+        self.lat = lat
+        self.drift = drift
+        self.mag = mag
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def load(cls, catalog_path=None, index_path=None):
+        catalog_path = catalog_path or os.path.join(chart_engine.EPHE_PATH, CATALOG_FILE)
+        index_path = index_path or os.path.join(chart_engine.DATA_DIR, 'sefstars.npz')
+        st = os.stat(catalog_path)
+        for _ in range(2):
+            if os.path.exists(index_path):
+                with np.load(index_path) as data:
+                    if int(data['version']) == INDEX_VERSION and list(data['source']) == [st.st_size, st.st_mtime_ns]:
+                        return cls(data['names'], data['codes'], data['lon'], data['lat'], data['drift'], data['mag'])
+            build_index(catalog_path, index_path)
+        raise ValueError(f"Could not build fixed star index at {index_path}")
+
+    def select(self, max_magnitude):
+        keep = self.mag <= max_magnitude
+        return StarCatalog(self.names[keep], self.codes[keep], self.lon[keep], self.lat[keep], self.drift[keep], self.mag[keep])
+
+    def longitudes_at(self, jd):
+        # Apparent ecliptic longitudes of date for every star in one step
+        t = (jd - J2000) / 36525.0
+        lon0 = np.radians(self.lon + self.drift * t * 100)
+        lat0 = np.radians(self.lat)
+
+        # Rigorous precession of ecliptic coordinates from J2000 (Meeus 21.5/21.6)
+        eta = np.radians((47.0029 * t - 0.03302 * t * t + 0.00006 * t ** 3) / 3600)
+        big_pi = np.radians(174.876384 + (-869.8089 * t + 0.03536 * t * t) / 3600)
+        p = np.radians((5029.0966 * t + 1.11113 * t * t - 0.000006 * t ** 3) / 3600)
+        a = np.cos(eta) * np.cos(lat0) * np.sin(big_pi - lon0) - np.sin(eta) * np.sin(lat0)
+        b = np.cos(lat0) * np.cos(big_pi - lon0)
+        c = np.cos(eta) * np.sin(lat0) + np.sin(eta) * np.cos(lat0) * np.sin(big_pi - lon0)
+        lon = np.degrees(p + big_pi - np.arctan2(a, b))
+        lat = np.arcsin(np.clip(c, -1, 1))
+
+        nutation = swe.calc_ut(jd, swe.ECL_NUT)[0][2]
+        sun = swe.calc_ut(jd, swe.SUN, swe.FLG_SWIEPH)[0][0]
+        aberration = -ABERRATION * np.cos(np.radians(sun - lon)) / np.maximum(np.cos(lat), 1e-6)
+        return (lon + nutation + aberration) % 360
+
+    def contacts(self, points, jd, orb=1.0):
+        # points: {name: longitude}. Returns (star, point, orb) sorted by orb.
+        star_lons = self.longitudes_at(jd)
+        order = np.argsort(star_lons)
+        sorted_lons = star_lons[order]
+        # Pad one orb's worth of stars on each side so windows can wrap 0° Aries
+        wrapped = np.concatenate([sorted_lons - 360, sorted_lons, sorted_lons + 360])
+        wrapped_idx = np.concatenate([order, order, order])
+
+        names = list(points)
+        targets = np.array([points[n] for n in names], dtype=float) % 360
+        lo = np.searchsorted(wrapped, targets - orb, side='left')
+        hi = np.searchsorted(wrapped, targets + orb, side='right')
+
+        found = []
+        for point, target, a, b in zip(names, targets, lo, hi):
+            for k in range(a, b):
+                star = wrapped_idx[k]
+                found.append((str(self.names[star]), point, float(wrapped[k] - target)))
+        found.sort(key=lambda x: abs(x[2]))
+        return found
+
+
+_default_catalog = None
+
+
+def get_catalog():
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = StarCatalog.load()
+    return _default_catalog
+
+
+def chart_points(chart):
+    points = {name: lon for name, lon in chart['longitudes'].items() if lon is not None}
+    points['ASC'] = chart['ascendant']
+    points['MC'] = chart['midheaven']
+    points['DSC'] = (chart['ascendant'] + 180) % 360
+    points['IC'] = (chart['midheaven'] + 180) % 360
+    return points
+
+
+def find_star_contacts(chart, orb=1.0, max_magnitude=None, catalog=None):
+    catalog = catalog or get_catalog()
+    if max_magnitude is not None:
+        catalog = catalog.select(max_magnitude)
+    return catalog.contacts(chart_points(chart), chart['jd'], orb)
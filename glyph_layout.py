@@ -0,0 +1,157 @@
+"""
+Collision-free placement of body glyphs around the chart wheel.
+Glyphs are sorted by longitude once. Their real extents come from the font
+outlines and are turned into arcs at each ring radius. Every ring is then
+laid out with a single sweep that merges overlapping glyphs into blocks and
+centres each block on its bodies' true positions. The sweep starts at the
+widest gap so it handles the wrap at 0° Aries. When one ring cannot hold all
+glyphs they are dealt round-robin onto more rings, and as a last resort the
+font is scaled down.
+"""
+
+import functools
+import math
+
+import numpy as np
+from matplotlib.font_manager import FontProperties
+from matplotlib.textpath import TextPath
+
+GLYPH_FONT = FontProperties(family='DejaVu Sans', weight='bold')
+
+# A ring may be filled to this fraction of its circumference
+RING_FILL = 0.95
+FONT_SCALES = (1.0, 0.85, 0.7, 0.55, 0.4)
+
+
+@functools.lru_cache(maxsize=1024)
+def glyph_extent(glyph, fontsize):
+    # (width, height) in points of the glyph's ink, as drawn by draw_chart
+    extents = TextPath((0, 0), glyph, size=fontsize, prop=GLYPH_FONT).get_extents()
+    return max(extents.width, fontsize * 0.3), max(extents.height, fontsize * 0.3)
+
+
+def spread_ring(angles, half_widths):
+    # angles sorted ascending in [0, 360), half_widths in degrees.
+    # Returns the placed centres in the same order.
+    n = len(angles)
+    if n < 2:
+        return np.array(angles, dtype=float)
+
+    # Open the circle at the widest gap between neighbouring glyphs
+    gaps = np.roll(angles - half_widths, -1) - (angles + half_widths)
+    gaps[-1] += 360
+    cut = (int(np.argmax(gaps)) + 1) % n
+    idx = list(range(cut, n)) + list(range(cut))
+    a = list(angles[cut:]) + list(angles[:cut] + 360)
+    w = [half_widths[i] for i in idx]
+
+    # Blocks are [lo, hi, width, total]; a block of glyphs laid edge to edge
+    # starts at total / count, which minimises the squared displacement
+    blocks = []
+
+    def merge_back():
+        while len(blocks) > 1:
+            prev, last = blocks[-2], blocks[-1]
+            if prev[3] / (prev[1] - prev[0]) + prev[2] <= last[3] / (last[1] - last[0]):
+                break
+            count = last[1] - last[0]
+            blocks[-2] = [prev[0], last[1], prev[2] + last[2], prev[3] + last[3] - count * prev[2]]
+            blocks.pop()
+
+    for j in range(n):
+        blocks.append([j, j + 1, 2 * w[j], a[j] - w[j]])
+        merge_back()
+
+    # The last block may now run past 360° into the first one: carry the
+    # first block round to the end and keep merging. Bounded, since glyphs
+    # that overflow the whole ring can never be separated.
+    for _ in range(n):
+        if len(blocks) < 2:
+            break
+        first, last = blocks[0], blocks[-1]
+        if last[3] / (last[1] - last[0]) + last[2] <= first[3] / (first[1] - first[0]) + 360:
+            break
+        blocks.pop(0)
+        lo = len(a)
+        for k in range(first[0], first[1]):
+            a.append(a[k] + 360)
+            w.append(w[k])
+            idx.append(idx[k])
+        count = first[1] - first[0]
+        blocks.append([lo, lo + count, first[2], first[3] + 360 * count])
+        merge_back()
+
+    placed = np.empty(n)
+    for lo, hi, width, total in blocks:
+        pos = total / (hi - lo)
+        for k in range(lo, hi):
+            placed[idx[k]] = (pos + w[k]) % 360
+            pos += 2 * w[k]
+    return placed
+
+
+def ring_radii(count, base_radius, min_radius, step):
+    return [base_radius - i * step for i in range(count) if base_radius - i * step >= min_radius]
+
+
+@functools.lru_cache(maxsize=64)
+def layout_glyphs(items, unit_px, dpi=100, offset=0.0, base_radius=0.75, min_radius=0.45, pad_px=2.0):
+    # items: tuple of (name, longitude, glyph, fontsize); unit_px: pixels per
+    # radial unit of the wheel; offset: screen angle of 0° Aries in degrees.
+    # Returns {name: (longitude, radius, font scale)}.
+    # The result is cached, so the same chart at the same size is laid out once;
+    # callers must not modify it.
+    if not items:
+        return {}
+    names = [item[0] for item in items]
+    lons = np.array([item[1] for item in items], dtype=float) % 360
+    extents = np.array([glyph_extent(item[2], item[3]) for item in items]) * dpi / 72.0
+    order = np.argsort(lons, kind='stable')
+
+    # Glyphs stay upright, so the arc a glyph takes up is its box measured
+    # along the tangent: the width at the top and bottom of the wheel, the
+    # height at the sides
+    screen = np.radians(lons + offset)
+    footprint = extents[:, 0] * np.abs(np.sin(screen)) + extents[:, 1] * np.abs(np.cos(screen))
+
+    for scale in FONT_SCALES:
+        widths = footprint * scale + pad_px
+        step = (extents.max() * scale + pad_px) / unit_px
+        radii = ring_radii(len(items), base_radius, min_radius, step)
+        fitted = None
+        for k in range(1, len(radii) + 1):
+            rings = np.empty(len(items), dtype=int)
+            rings[order] = np.arange(len(items)) % k
+            loads = [np.degrees(widths[rings == r].sum() / (radii[r] * unit_px)) for r in range(k)]
+            if max(loads) <= RING_FILL * 360:
+                fitted = rings
+                break
+        if fitted is not None:
+            break
+    else:
+        # Even the smallest font does not fit; use every ring anyway
+        fitted = rings
+
+    positions = {}
+    for r in range(int(fitted.max()) + 1):
+        members = order[fitted[order] == r]
+        radius = float(radii[r])
+        half_widths = np.degrees(widths[members] / 2 / (radius * unit_px))
+        placed = spread_ring(lons[members], half_widths)
+        for m, lon in zip(members, placed):
+            positions[names[m]] = (float(lon), radius, scale)
+    return positions
+
+
+def axes_unit_px(ax):
+    # Pixels per radial unit of a polar axes, from its current size and ylim
+    return min(ax.bbox.width, ax.bbox.height) / 2 / ax.get_ylim()[1]
+
+
+def chart_layout(longitudes, glyphs, fontsizes, ax):
+    items = tuple((name, lon, glyphs[name], fontsizes[name])
+                  for name, lon in longitudes.items() if lon is not None and name in glyphs)
+    # Round the size so a re-render at the same window size hits the cache
+    unit_px = max(1, int(math.floor(axes_unit_px(ax))))
+    offset = round(math.degrees(ax.get_theta_offset()), 3)
+    return layout_glyphs(items, unit_px, ax.figure.dpi, offset)
@@ -0,0 +1,428 @@
+"""
+Chart report text.
+The interpretation tables and the plain-text report shown in the text
+panel, which is also the last page of a saved report. Nothing here needs
+Tk, so the GUI and the bulk report writer produce the same text.
+"""
+
+import datetime
+
+from chart_engine import SIGNS, houses_of, signs_of
+
+# Only the bright, traditionally used stars are listed in the report
+STAR_ORB = 1.0
+STAR_MAX_MAGNITUDE = 2.5
+
+# Eclipses on natal points are listed for this many years after birth
+ECLIPSE_ORB = 1.0
+ECLIPSE_CONTACT_YEARS = 30
+
+# Interpretations for planets in signs, houses, and aspects
+PLANET_IN_SIGN = {
+    'Sun': {
+        'Aries': 'Bold and pioneering personality.',
+        'Taurus': 'Grounded and values stability.',
+        'Gemini': 'Curious and communicative.',
+        'Cancer': 'Nurturing and emotional.',
+        'Leo': 'Confident and dramatic.',
+        'Virgo': 'Analytical and detail-oriented.',
+        'Libra': 'Charming and seeks balance.',
+        'Scorpio': 'Intense and transformative.',
+        'Sagittarius': 'Adventurous and philosophical.',
+        'Capricorn': 'Ambitious and disciplined.',
+        'Aquarius': 'Innovative and independent.',
+        'Pisces': 'Compassionate and dreamy.'
+    },
+    'Moon': {
+        'Aries': 'Emotionally impulsive and energetic.',
+        'Taurus': 'Seeks emotional security and comfort.',
+        'Gemini': 'Emotionally versatile and curious.',
+        'Cancer': 'Deeply intuitive and nurturing.',
+        'Leo': 'Emotionally expressive and dramatic.',
+        'Virgo': 'Emotionally analytical and practical.',
+        'Libra': 'Seeks emotional harmony and partnership.',
+        'Scorpio': 'Intense and deeply emotional.',
+        'Sagittarius': 'Emotionally adventurous and optimistic.',
+        'Capricorn': 'Emotionally reserved and responsible.',
+        'Aquarius': 'Emotionally detached and unique.',
+        'Pisces': 'Highly empathetic and intuitive.'
+    },
+    'Mercury': {
+        'Aries': 'Quick thinking and direct communication.',
+        'Taurus': 'Practical and deliberate in thought.',
+        'Gemini': 'Highly communicative and adaptable.',
+        'Cancer': 'Intuitive and emotionally driven thinking.',
+        'Leo': 'Expressive and dramatic in communication.',
+        'Virgo': 'Analytical and precise in thought.',
+        'Libra': 'Diplomatic and balanced in communication.',
+        'Scorpio': 'Deep and investigative thinking.',
+        'Sagittarius': 'Broad-minded and philosophical in thought.',
+        'Capricorn': 'Structured and goal-oriented thinking.',
+        'Aquarius': 'Innovative and unconventional in communication.',
+        'Pisces': 'Imaginative and intuitive thinking.'
+    },
+    'Venus': {
+        'Aries': 'Passionate and impulsive in love.',
+        'Taurus': 'Sensual and values stability in relationships.',
+        'Gemini': 'Playful and intellectually driven in love.',
+        'Cancer': 'Nurturing and protective in relationships.',
+        'Leo': 'Dramatic and generous in love.',
+        'Virgo': 'Practical and service-oriented in relationships.',
+        'Libra': 'Romantic and seeks harmony in love.',
+        'Scorpio': 'Intense and deeply emotional in relationships.',
+        'Sagittarius': 'Adventurous and freedom-loving in love.',
+        'Capricorn': 'Serious and committed in relationships.',
+        'Aquarius': 'Unconventional and independent in love.',
+        'Pisces': 'Romantic and dreamy in relationships.'
+    },
+    'Mars': {
+        'Aries': 'Assertive and competitive.',
+        'Taurus': 'Steady and persistent in action.',
+        'Gemini': 'Versatile and mentally driven in action.',
+        'Cancer': 'Protective and emotionally driven in action.',
+        'Leo': 'Bold and dramatic in action.',
+        'Virgo': 'Precise and methodical in action.',
+        'Libra': 'Balanced but indecisive in action.',
+        'Scorpio': 'Intense and strategic in action.',
+        'Sagittarius': 'Adventurous and impulsive in action.',
+        'Capricorn': 'Disciplined and ambitious in action.',
+        'Aquarius': 'Innovative and rebellious in action.',
+        'Pisces': 'Intuitive and compassionate in action.'
+    },
+    'Jupiter': {
+        'Aries': 'Optimistic and pioneering in growth.',
+        'Taurus': 'Growth through stability and material abundance.',
+        'Gemini': 'Expansive through communication and learning.',
+        'Cancer': 'Growth through nurturing and family.',
+        'Leo': 'Generous and dramatic in expansion.',
+        'Virgo': 'Growth through precision and service.',
+        'Libra': 'Expansion through partnerships and harmony.',
+        'Scorpio': 'Deep and transformative growth.',
+        'Sagittarius': 'Philosophical and adventurous in expansion.',
+        'Capricorn': 'Growth through discipline and structure.',
+        'Aquarius': 'Innovative and humanitarian in expansion.',
+        'Pisces': 'Spiritual and compassionate growth.'
+    },
+    'Saturn': {
+        'Aries': 'Challenges with impulsivity, learning discipline.',
+        'Taurus': 'Focus on material security and patience.',
+        'Gemini': 'Challenges with communication, seeking clarity.',
+        'Cancer': 'Lessons in emotional security and family.',
+        'Leo': 'Challenges with ego, learning humility.',
+        'Virgo': 'Focus on precision and responsibility.',
+        'Libra': 'Lessons in relationships and balance.',
+        'Scorpio': 'Deep lessons in transformation and control.',
+        'Sagittarius': 'Challenges with beliefs, seeking wisdom.',
+        'Capricorn': 'Strong sense of responsibility and structure.',
+        'Aquarius': 'Lessons in innovation and community.',
+        'Pisces': 'Challenges with boundaries, seeking spirituality.'
+    },
+    'Uranus': {
+        'Aries': 'Innovative and impulsive change.',
+        'Taurus': 'Unconventional approach to stability.',
+        'Gemini': 'Restless and inventive in communication.',
+        'Cancer': 'Unpredictable emotional changes.',
+        'Leo': 'Dramatic and unique self-expression.',
+        'Virgo': 'Innovative in routines and health.',
+        'Libra': 'Unconventional in relationships.',
+        'Scorpio': 'Intense and transformative change.',
+        'Sagittarius': 'Adventurous and freedom-seeking change.',
+        'Capricorn': 'Innovative restructuring of traditions.',
+        'Aquarius': 'Highly original and humanitarian.',
+        'Pisces': 'Intuitive and spiritual innovation.'
+    },
+    'Neptune': {
+        'Aries': 'Idealistic and impulsive dreams.',
+        'Taurus': 'Dreamy approach to material beauty.',
+        'Gemini': 'Imaginative and scattered communication.',
+        'Cancer': 'Highly intuitive and nurturing dreams.',
+        'Leo': 'Dramatic and idealistic self-expression.',
+        'Virgo': 'Idealistic in service and health.',
+        'Libra': 'Dreamy and romantic in relationships.',
+        'Scorpio': 'Deep and mystical imagination.',
+        'Sagittarius': 'Spiritual and philosophical dreams.',
+        'Capricorn': 'Idealistic restructuring of reality.',
+        'Aquarius': 'Visionary and humanitarian dreams.',
+        'Pisces': 'Highly spiritual and intuitive.'
+    },
+    'Pluto': {
+        'Aries': 'Transformative and impulsive energy.',
+        'Taurus': 'Deep transformation in values and stability.',
+        'Gemini': 'Transformative communication and ideas.',
+        'Cancer': 'Deep emotional transformation.',
+        'Leo': 'Powerful and dramatic transformation.',
+        'Virgo': 'Transformative in health and service.',
+        'Libra': 'Deep transformation in relationships.',
+        'Scorpio': 'Intensely transformative and powerful.',
+        'Sagittarius': 'Transformation through beliefs and adventure.',
+        'Capricorn': 'Powerful restructuring of ambitions.',
+        'Aquarius': 'Transformative in innovation and community.',
+        'Pisces': 'Deep spiritual transformation.'
+    },
+    'True Node': {
+        'Aries': 'Destiny tied to independence and courage.',
+        'Taurus': 'Destiny tied to stability and values.',
+        'Gemini': 'Destiny through communication and learning.',
+        'Cancer': 'Destiny tied to family and nurturing.',
+        'Leo': 'Destiny through self-expression and leadership.',
+        'Virgo': 'Destiny through service and precision.',
+        'Libra': 'Destiny tied to relationships and balance.',
+        'Scorpio': 'Destiny through transformation and depth.',
+        'Sagittarius': 'Destiny tied to adventure and wisdom.',
+        'Capricorn': 'Destiny through ambition and structure.',
+        'Aquarius': 'Destiny tied to innovation and community.',
+        'Pisces': 'Destiny through spirituality and compassion.'
+    },
+    'Chiron': {
+        'Aries': 'Wound related to identity and courage.',
+        'Taurus': 'Wound related to self-worth and stability.',
+        'Gemini': 'Wound related to communication and learning.',
+        'Cancer': 'Wound tied to family and emotional security.',
+        'Leo': 'Wound related to self-expression and recognition.',
+        'Virgo': 'Wound tied to perfectionism and service.',
+        'Libra': 'Wound related to relationships and balance.',
+        'Scorpio': 'Wound tied to transformation and power.',
+        'Sagittarius': 'Wound related to beliefs and freedom.',
+        'Capricorn': 'Wound tied to authority and ambition.',
+        'Aquarius': 'Wound related to individuality and community.',
+        'Pisces': 'Wound tied to spirituality and boundaries.'
+    },
+}
+
+PLANET_IN_HOUSE = {
+    'Sun': {
+        1: 'Strong focus on self-identity and personal expression.',
+        2: 'Focus on personal values and financial security.',
+        3: 'Emphasis on communication and learning.',
+        4: 'Strong connection to home and family.',
+        5: 'Focus on creativity and self-expression.',
+        6: 'Emphasis on health and daily routines.',
+        7: 'Focus on partnerships and relationships.',
+        8: 'Interest in transformation and shared resources.',
+        9: 'Focus on philosophy, travel, and higher learning.',
+        10: 'Strong drive for career and public recognition.',
+        11: 'Focus on friendships and community.',
+        12: 'Emphasis on spirituality and the subconscious.'
+    },
+    'Moon': {
+        1: 'Emotionally expressive and self-focused.',
+        2: 'Emotional security tied to finances and possessions.',
+        3: 'Emotionally curious and communicative.',
+        4: 'Deep emotional connection to home and family.',
+        5: 'Emotionally tied to creativity and romance.',
+        6: 'Emotional focus on health and service.',
+        7: 'Emotional fulfillment through relationships.',
+        8: 'Deep emotional transformations and intensity.',
+        9: 'Emotional need for adventure and learning.',
+        10: 'Emotional investment in career and public life.',
+        11: 'Emotional connection to friends and groups.',
+        12: 'Highly intuitive and spiritually focused.'
+    },
+    'Mercury': {
+        1: 'Communicative and intellectual identity.',
+        2: 'Focus on financial communication and thinking.',
+        3: 'Strong emphasis on learning and communication.',
+        4: 'Intellectual connection to home and family.',
+        5: 'Creative and playful communication.',
+        6: 'Focus on health and analytical routines.',
+        7: 'Communication-centered relationships.',
+        8: 'Deep and investigative thinking.',
+        9: 'Focus on philosophy and intellectual expansion.',
+        10: 'Career driven by communication and ideas.',
+        11: 'Intellectual focus on friendships and groups.',
+        12: 'Intuitive and subconscious communication.'
+    },
+    'Venus': {
+        1: 'Charming and relationship-focused identity.',
+        2: 'Focus on financial beauty and values.',
+        3: 'Love for learning and communication.',
+        4: 'Harmonious and beautiful home life.',
+        5: 'Romantic and creative expression.',
+        6: 'Love expressed through service and health.',
+        7: 'Strong focus on partnerships and harmony.',
+        8: 'Deep and transformative relationships.',
+        9: 'Love for travel and philosophical beauty.',
+        10: 'Career tied to beauty and relationships.',
+        11: 'Harmonious friendships and social connections.',
+        12: 'Romantic and spiritual connections.'
+    },
+    'Mars': {
+        1: 'Assertive and action-oriented identity.',
+        2: 'Driven to achieve financial security.',
+        3: 'Energetic communication and learning.',
+        4: 'Protective and active home life.',
+        5: 'Passionate and creative expression.',
+        6: 'Driven in health and daily routines.',
+        7: 'Assertive in relationships.',
+        8: 'Intense and transformative energy.',
+        9: 'Adventurous and action-oriented learning.',
+        10: 'Ambitious and driven career.',
+        11: 'Energetic focus on friendships and groups.',
+        12: 'Subconscious drive and spiritual action.'
+    },
+    'Jupiter': {
+        1: 'Optimistic and expansive identity.',
+        2: 'Growth through financial abundance.',
+        3: 'Expansive communication and learning.',
+        4: 'Growth through family and home.',
+        5: 'Joyful and expansive creativity.',
+        6: 'Growth through health and service.',
+        7: 'Expansion through partnerships.',
+        8: 'Deep and transformative growth.',
+        9: 'Strong focus on philosophy and travel.',
+        10: 'Expansive and fortunate career.',
+        11: 'Growth through friendships and community.',
+        12: 'Spiritual and philosophical expansion.'
+    },
+    'Saturn': {
+        1: 'Lessons in self-identity and discipline.',
+        2: 'Focus on financial responsibility.',
+        3: 'Challenges in communication and learning.',
+        4: 'Lessons in family and home structure.',
+        5: 'Discipline in creativity and romance.',
+        6: 'Focus on health and routine responsibility.',
+        7: 'Challenges in relationships and commitment.',
+        8: 'Lessons in transformation and control.',
+        9: 'Discipline in philosophy and travel.',
+        10: 'Strong focus on career and responsibility.',
+        11: 'Lessons in friendships and community.',
+        12: 'Challenges in spirituality and boundaries.'
+    },
+    'Uranus': {
+        1: 'Unconventional and unique identity.',
+        2: 'Innovative approach to finances.',
+        3: 'Restless and inventive communication.',
+        4: 'Unpredictable home and family life.',
+        5: 'Unique and rebellious creativity.',
+        6: 'Innovative in health and routines.',
+        7: 'Unconventional relationships.',
+        8: 'Sudden and transformative changes.',
+        9: 'Unique approach to philosophy and travel.',
+        10: 'Innovative and rebellious career.',
+        11: 'Strong focus on unique friendships.',
+        12: 'Unconventional spirituality.'
+    },
+    'Neptune': {
+        'Aries': 'Idealistic and impulsive dreams.',
+        'Taurus': 'Dreamy approach to material beauty.',
+        'Gemini': 'Imaginative and scattered communication.',
+        'Cancer': 'Highly intuitive and nurturing dreams.',
+        'Leo': 'Dramatic and idealistic self-expression.',
+        'Virgo': 'Idealistic in service and health.',
+        'Libra': 'Dreamy and romantic in relationships.',
+        'Scorpio': 'Deep and mystical imagination.',
+        'Sagittarius': 'Spiritual and philosophical dreams.',
+        'Capricorn': 'Idealistic restructuring of reality.',
+        'Aquarius': 'Visionary and humanitarian dreams.',
+        'Pisces': 'Highly spiritual and intuitive.'
+    },
+    'Pluto': {
+        'Aries': 'Transformative and impulsive energy.',
+        'Taurus': 'Deep transformation in values and stability.',
+        'Gemini': 'Transformative communication and ideas.',
+        'Cancer': 'Deep emotional transformation.',
+        'Leo': 'Powerful and dramatic transformation.',
+        'Virgo': 'Transformative in health and service.',
+        'Libra': 'Deep transformation in relationships.',
+        'Scorpio': 'Intensely transformative and powerful.',
+        'Sagittarius': 'Transformation through beliefs and adventure.',
+        'Capricorn': 'Powerful restructuring of ambitions.',
+        'Aquarius': 'Transformative in innovation and community.',
+        'Pisces': 'Deep spiritual transformation.'
+    },
+    'True Node': {
+        'Aries': 'Destiny tied to independence and courage.',
+        'Taurus': 'Destiny tied to stability and values.',
+        'Gemini': 'Destiny through communication and learning.',
+        'Cancer': 'Destiny tied to family and nurturing.',
+        'Leo': 'Destiny through self-expression and leadership.',
+        'Virgo': 'Destiny through service and precision.',
+        'Libra': 'Destiny tied to relationships and balance.',
+        'Scorpio': 'Destiny through transformation and depth.',
+        'Sagittarius': 'Destiny tied to adventure and wisdom.',
+        'Capricorn': 'Destiny through ambition and structure.',
+        'Aquarius': 'Destiny tied to innovation and community.',
+        'Pisces': 'Destiny through spirituality and compassion.'
+    },
+    'Chiron': {
+        'Aries': 'Wound related to identity and courage.',
+        'Taurus': 'Wound related to self-worth and stability.',
+        'Gemini': 'Wound related to communication and learning.',
+        'Cancer': 'Wound tied to family and emotional security.',
+        'Leo': 'Wound related to self-expression and recognition.',
+        'Virgo': 'Wound tied to perfectionism and service.',
+        'Libra': 'Wound related to relationships and balance.',
+        'Scorpio': 'Wound tied to transformation and power.',
+        'Sagittarius': 'Wound related to beliefs and freedom.',
+        'Capricorn': 'Wound tied to authority and ambition.',
+        'Aquarius': 'Wound related to individuality and community.',
+        'Pisces': 'Wound tied to spirituality and boundaries.'
+    },
+}
+
+ASPECT_INTERPRETATIONS = {
+    'Conjunction': 'Intense blending of energies, amplifying both planets’ traits.',
+    'Sextile': 'Harmonious opportunity for growth and collaboration.',
+    'Square': 'Tension and challenges that drive growth through conflict.',
+    'Trine': 'Natural flow and ease, bringing talent and harmony.',
+    'Opposition': 'Polarity and tension, requiring balance and compromise.'
+}
+
+
+def jd_date(jd):
+    ut = datetime.datetime(2000, 1, 1, 12) + datetime.timedelta(days=jd - 2451545.0)
+    return ut.strftime("%Y-%m-%d")
+
+
+def report_text(longitudes, retrogrades, house_cusps, aspects, star_contacts=None, eclipses=None):
+    # eclipses: (prenatal eclipses, eclipse contacts) as found by the eclipses module
+    lines = []
+    # Sign and house of every available body at once
+    placed = [planet for planet, lon in longitudes.items() if lon is not None]
+    placed_lons = [longitudes[planet] for planet in placed]
+    placements = {planet: (SIGNS[sign], int(house))
+                  for planet, sign, house in zip(placed, signs_of(placed_lons), houses_of(placed_lons, house_cusps))}
+
+    lines.append("Planetary Longitudes (°):\n\n")
+    for planet, lon in longitudes.items():
+        if lon is None:
+            lines.append(f"{planet}: Not available\n")
+            continue
+        sign, house = placements[planet]
+        retrograde = " (R)" if retrogrades[planet] else ""
+        lines.append(f"{planet}{retrograde}: {lon:.2f}° - {sign}, House {house}\n")
+
+    if aspects:
+        lines.append("\nMajor Aspects:\n\n")
+        for p1, p2, aspect_name, diff in aspects:
+            lines.append(f"{p1} {aspect_name} {p2} (Diff: {diff:.2f}°)\n")
+
+    if star_contacts:
+        lines.append("\nFixed Star Contacts:\n\n")
+        for star, point, orb in star_contacts:
+            lines.append(f"{star} conjunct {point} (Orb: {abs(orb):.2f}°)\n")
+
+    if eclipses:
+        prenatal, contacts = eclipses
+        lines.append("\nPrenatal Eclipses:\n\n")
+        for kind, eclipse in prenatal.items():
+            if eclipse is None:
+                lines.append(f"{kind}: Not available\n")
+                continue
+            sign = SIGNS[signs_of(eclipse['longitude'])]
+            lines.append(f"{kind}: {eclipse['type']}, {jd_date(eclipse['jd'])} - {eclipse['longitude'] % 30:.2f}° {sign}\n")
+        if contacts:
+            lines.append("\nEclipses on Natal Points:\n\n")
+            for eclipse, point, orb in contacts:
+                lines.append(f"{jd_date(eclipse['jd'])} {eclipse['type']} {eclipse['kind']} eclipse conjunct {point} (Orb: {abs(orb):.2f}°)\n")
+
+    lines.append("\nInterpretations:\n\n")
+    for planet, lon in longitudes.items():
+        if lon is None:
+            continue
+        sign, house = placements[planet]
+        if planet in PLANET_IN_SIGN and sign in PLANET_IN_SIGN[planet]:
+            lines.append(f"{planet} in {sign}: {PLANET_IN_SIGN[planet][sign]}\n")
+        if planet in PLANET_IN_HOUSE and house in PLANET_IN_HOUSE[planet]:
+            lines.append(f"{planet} in {house}: {PLANET_IN_HOUSE[planet][house]}\n")
+    return "".join(lines)
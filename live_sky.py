@@ -0,0 +1,96 @@
+"""
+Live "sky now" charts for an unattended display.
+A full ephemeris and house calculation is done only every few minutes.
+Between refreshes every body, cusp and angle is moved on linearly from its
+last computed speed (houses_ex2 gives the cusp and angle speeds). Each
+quantity's acceleration, estimated from the last two refreshes, bounds
+the extrapolation error (|a| dt² / 2), and a refresh is forced early when
+that bound passes the allowed error.
+"""
+
+import datetime
+
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+
+REFRESH_MINUTES = 10
+MAX_ERROR = 0.01  # degrees
+# Assumed before two refreshes exist: roughly the Ascendant's worst case
+DEFAULT_ACCELERATION = 3000.0  # degrees per day squared
+
+
+def jd_now():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return swe.julday(now.year, now.month, now.day,
+                      now.hour + now.minute / 60.0 + (now.second + now.microsecond / 1e6) / 3600.0)
+
+
+class LiveSky:
+    def __init__(self, lat, lon, bodies=None, house_system=chart_engine.HOUSE_SYSTEM,
+                 flags=chart_engine.EPHE_FLAGS, refresh_minutes=REFRESH_MINUTES, max_error=MAX_ERROR):
+        self.lat = lat
+        self.lon = lon
+        self.bodies = chart_engine.PLANETS if bodies is None else bodies
+        self.house_system = house_system
+        self.flags = flags
+        self.refresh_days = refresh_minutes / 1440.0
+        self.max_error = max_error
+        self.refreshes = 0
+        self.base = None
+
+    def refresh(self, jd):
+        # Full calculation at jd; keeps the last state to estimate accelerations
+        chart = chart_engine.compute_chart(jd, self.lat, self.lon, self.house_system, self.flags, self.bodies)
+        cusps, ascmc, cusp_speeds, ascmc_speeds = swe.houses_ex2(jd, self.lat, self.lon, self.house_system)
+        names = [name for name, lon in chart['longitudes'].items() if lon is not None]
+        state = {
+            'jd': jd,
+            'chart': chart,
+            'names': names,
+            'values': np.array([chart['longitudes'][n] for n in names] + list(cusps[:12]) + list(ascmc[:2])),
+            'speeds': np.array([chart['speeds'][n] for n in names] + list(cusp_speeds[:12]) + list(ascmc_speeds[:2])),
+        }
+        previous = self.base
+        if previous is not None and previous['names'] == names and jd != previous['jd']:
+            accel = np.abs(state['speeds'] - previous['speeds']) / abs(jd - previous['jd'])
+            state['max_accel'] = float(accel.max())
+        else:
+            state['max_accel'] = DEFAULT_ACCELERATION
+        self.base = state
+        self.refreshes += 1
+        return chart
+
+    def error_bound(self, jd):
+        if self.base is None:
+            return float('inf')
+        dt = jd - self.base['jd']
+        return 0.5 * self.base['max_accel'] * dt * dt
+
+    def needs_refresh(self, jd):
+        return (self.base is None or abs(jd - self.base['jd']) >= self.refresh_days
+                or self.error_bound(jd) > self.max_error)
+
+    def chart_at(self, jd=None):
+        # The chart at jd (now by default), extrapolated unless a refresh is due
+        jd = jd_now() if jd is None else jd
+        if self.needs_refresh(jd):
+            return self.refresh(jd)
+
+        base = self.base
+        values = (base['values'] + base['speeds'] * (jd - base['jd'])) % 360
+        n = len(base['names'])
+        longitudes = dict(base['chart']['longitudes'])
+        longitudes.update(zip(base['names'], values[:n].tolist()))
+        chart = dict(base['chart'])
+        chart.update({
+            'jd': jd,
+            'longitudes': longitudes,
+            'house_cusps': tuple(values[n:n + 12].tolist()),
+            'ascendant': float(values[n + 12]),
+            'midheaven': float(values[n + 13]),
+            'aspects': chart_engine.chart_aspects(longitudes),
+            'extrapolated': True,
+        })
+        return chart
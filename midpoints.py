@@ -0,0 +1,100 @@
+"""
+Midpoint trees and midpoint contacts (Ebertin / Uranian style).
+All pairwise midpoints of a chart's bodies and angles are built as one
+array (the nearer midpoint of each pair; on the 360° dial its opposite
+end of the axis too). For each dial the midpoints are folded onto it
+(longitude mod 90 on the 90° dial) and sorted once. A point's contacts are
+then a binary-search window of +/- orb in that sorted array, so finding
+every contact for every point costs a sort plus a search per point
+instead of a loop over all pairs for each point.
+"""
+
+import numpy as np
+
+from relationships import circular_midpoint
+
+NATAL_ORB = 1.5
+TRANSIT_ORB = 1.0
+DIALS = (360, 90, 45)
+
+
+def midpoint_points(chart):
+    # The points midpoints are made of: every available body plus ASC and MC
+    points = {name: lon for name, lon in chart['longitudes'].items() if lon is not None}
+    points['ASC'] = chart['ascendant']
+    points['MC'] = chart['midheaven']
+    return points
+
+
+class Midpoints:
+    def __init__(self, points):
+        # points: {name: longitude}
+        self.names = list(points)
+        self.lons = np.array([points[n] for n in self.names], dtype=float) % 360
+        self.first, self.second = np.triu_indices(len(self.names), 1)
+        self.midpoints = circular_midpoint(self.lons[self.first], self.lons[self.second])
+        self._dials = {}
+
+    def __len__(self):
+        return len(self.midpoints)
+
+    def dial(self, dial):
+        # (sorted positions, pair index of each) on a dial, padded by one dial
+        # turn either side so windows can wrap past 0
+        if dial not in self._dials:
+            if 360 % dial or (dial != 360 and 180 % dial):
+                raise ValueError(f"Unsupported dial {dial}; the dial must divide 180 or be 360")
+            # The far end of the axis is a separate point only on the 360° dial
+            ends = [self.midpoints, (self.midpoints + 180) % 360] if dial == 360 else [self.midpoints]
+            positions = np.concatenate(ends) % dial
+            pairs = np.tile(np.arange(len(self.midpoints)), len(ends))
+            order = np.argsort(positions, kind='stable')
+            positions, pairs = positions[order], pairs[order]
+            self._dials[dial] = (np.concatenate([positions - dial, positions, positions + dial]),
+                                 np.concatenate([pairs, pairs, pairs]))
+        return self._dials[dial]
+
+    def contacts(self, points, orb=NATAL_ORB, dial=90, exclude_members=True):
+        # points: {name: longitude}. Returns (point, body1, body2, orb) with
+        # orb signed on the dial, closest first. With exclude_members a point
+        # does not count as contacting a midpoint it is part of.
+        positions, pairs = self.dial(dial)
+        names = list(points)
+        if not names or not len(self.midpoints):
+            return []
+        targets = np.array([points[n] for n in names], dtype=float) % dial
+        lo = np.searchsorted(positions, targets - orb, side='left')
+        hi = np.searchsorted(positions, targets + orb, side='right')
+
+        # Every (point, window entry) at once
+        counts = hi - lo
+        point_idx = np.repeat(np.arange(len(names)), counts)
+        entry = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        pair = pairs[entry]
+        offsets = positions[entry] - targets[point_idx]
+        if exclude_members:
+            own = np.array([self.names.index(n) if n in self.names else -1 for n in names])[point_idx]
+            keep = (own != self.first[pair]) & (own != self.second[pair])
+            point_idx, pair, offsets = point_idx[keep], pair[keep], offsets[keep]
+
+        order = np.argsort(np.abs(offsets), kind='stable')
+        return [(names[p], self.names[self.first[k]], self.names[self.second[k]], float(o))
+                for p, k, o in zip(point_idx[order], pair[order], offsets[order])]
+
+    def tree(self, orb=NATAL_ORB, dial=90):
+        # {point: [(body1, body2, orb), ...]} for the chart's own points
+        points = dict(zip(self.names, self.lons))
+        found = {name: [] for name in self.names}
+        for point, body1, body2, offset in self.contacts(points, orb, dial):
+            found[point].append((body1, body2, offset))
+        return found
+
+
+def midpoint_tree(chart, orb=NATAL_ORB, dial=90):
+    return Midpoints(midpoint_points(chart)).tree(orb, dial)
+
+
+def transit_midpoint_contacts(natal_chart, transit_chart, orb=TRANSIT_ORB, dial=90):
+    # Transiting bodies and angles on natal midpoints
+    return Midpoints(midpoint_points(natal_chart)).contacts(midpoint_points(transit_chart), orb, dial,
+                                                            exclude_members=False)
@@ -0,0 +1,149 @@
+"""
+Aspect pattern detection.
+For each aspect a pattern uses, the (bodies x bodies) aspect matrix of a
+chart is packed into one 64-bit-word bitset row per body: bit k of row i
+is set when bodies i and k are in that aspect. Patterns are then found
+edge by edge: the third corner of every grand trine on a trine edge (i, j)
+is a bit of trine[i] & trine[j], the apex of a T-square on an opposition
+is square[i] & square[j], and so on, so no triple or quadruple of bodies
+is ever enumerated. Every step works on a whole batch of charts at once.
+"""
+
+import functools
+
+import numpy as np
+
+import chart_engine
+from chart_store import pack_mask
+
+PATTERNS = ('Grand Trine', 'T-Square', 'Yod', 'Kite', 'Grand Cross')
+
+# Pairs are in aspect by the chart's own rules (chart_engine.pair_aspects).
+# Yods also need the quincunx, which charts do not list; it is added for
+# every pair those rules allow, as (angle, orb, orb with a minor body).
+PATTERN_ASPECTS = ('Sextile', 'Square', 'Trine', 'Quincunx', 'Opposition')
+QUINCUNX = (150, 3, 1)
+
+# Rows of a batch handled together, so the (rows, bodies, bodies) matrices stay small
+MAX_CHUNK_CELLS = 1 << 22
+
+
+@functools.lru_cache(maxsize=32)
+def pair_orbs(bodies):
+    # {aspect: (angle, (bodies, bodies) orbs)} for a tuple of body names, the
+    # orb NaN where a pair does not take the aspect
+    n = len(bodies)
+    angles = {name: chart_engine.MAJOR_ASPECTS[name][0] for name in PATTERN_ASPECTS if name != 'Quincunx'}
+    angles['Quincunx'] = QUINCUNX[0]
+    orbs = {name: np.full((n, n), np.nan) for name in PATTERN_ASPECTS}
+    for i in range(n):
+        for j in range(i + 1, n):
+            rules = chart_engine.pair_aspects(bodies[i], bodies[j])
+            for name, angle, orb in rules:
+                if name in orbs:
+                    orbs[name][i, j] = orbs[name][j, i] = orb
+            if rules:
+                major = bodies[i] in chart_engine.PLANETS and bodies[j] in chart_engine.PLANETS
+                orbs['Quincunx'][i, j] = orbs['Quincunx'][j, i] = QUINCUNX[1] if major else QUINCUNX[2]
+    return {name: (angles[name], orbs[name]) for name in PATTERN_ASPECTS}
+
+
+def aspect_matrices(longitudes, bodies):
+    # {aspect: (charts, bodies, bodies) bool} for an (charts, bodies) longitude
+    # array; missing (NaN) bodies aspect nothing
+    lons = np.asarray(longitudes, dtype=float)
+    diff = np.abs(lons[:, :, None] - lons[:, None, :]) % 360
+    diff = np.minimum(diff, 360 - diff)
+    matrices = {}
+    for name, (angle, orbs) in pair_orbs(tuple(bodies)).items():
+        with np.errstate(invalid='ignore'):
+            matrices[name] = np.abs(diff - angle) <= orbs
+    return matrices
+
+
+def set_bits(words, n):
+    # (entry, bit) index arrays of the set bits of an (entries, words) array
+    bits = np.unpackbits(np.ascontiguousarray(words).view(np.uint8), axis=-1, bitorder='little')[:, :n]
+    return np.nonzero(bits)
+
+
+def edges(matrix):
+    # (chart, i, j) of every aspect with i < j
+    return np.nonzero(np.triu(matrix, 1))
+
+
+def find_patterns(longitudes, bodies):
+    # {pattern: (chart rows, members)} for a batch, members an (found, 3 or 4)
+    # array of body indices. T-square and yod members start with the apex;
+    # a kite is its grand trine followed by the body opposite the first corner;
+    # grand cross members go round the cross.
+    longitudes = np.asarray(longitudes, dtype=float)
+    n = longitudes.shape[1]
+    matrices = aspect_matrices(longitudes, bodies)
+    sets = {name: pack_mask(matrix) for name, matrix in matrices.items()}
+    # above[j]: the bodies after j, so each pattern is found from one edge only
+    above = pack_mask(np.triu(np.ones((n, n), dtype=bool), 1))
+    trine, square, sextile = sets['Trine'], sets['Square'], sets['Sextile']
+    quincunx, opposition = sets['Quincunx'], sets['Opposition']
+    found = {}
+
+    def third_corner(edge_set, corner_a, corner_b, only_above=False):
+        # For every edge of edge_set, the bodies in aspect corner_a to one end
+        # and corner_b to the other
+        c, i, j = edges(matrices[edge_set])
+        common = corner_a[c, i] & corner_b[c, j]
+        if only_above:
+            common &= above[j]
+        e, k = set_bits(common, n)
+        return c[e], i[e], j[e], k
+
+    rows, i, j, k = third_corner('Trine', trine, trine, only_above=True)
+    found['Grand Trine'] = (rows, np.column_stack([i, j, k]))
+
+    # Kite: a body opposite one corner of a grand trine, sextile the other two
+    kite_rows, kite_members = [], []
+    for head, left, right in ((i, j, k), (j, i, k), (k, i, j)):
+        tails = opposition[rows, head] & sextile[rows, left] & sextile[rows, right]
+        e, d = set_bits(tails, n)
+        kite_rows.append(rows[e])
+        kite_members.append(np.column_stack([head[e], left[e], right[e], d]))
+    found['Kite'] = (np.concatenate(kite_rows), np.concatenate(kite_members))
+
+    for name, edge_set, corner in (('T-Square', 'Opposition', square), ('Yod', 'Sextile', quincunx)):
+        rows, i, j, apex = third_corner(edge_set, corner, corner)
+        found[name] = (rows, np.column_stack([apex, i, j]))
+
+    # Grand cross: oppositions (a, c) and (b, d) with a the lowest index
+    # and b < d, all four sides square
+    rows, a, c = edges(matrices['Opposition'])
+    both_square = square[rows, a] & square[rows, c]
+    e, b = set_bits(both_square & above[a], n)
+    tails = opposition[rows[e], b] & both_square[e] & above[b]
+    f, d = set_bits(tails, n)
+    e = e[f]
+    found['Grand Cross'] = (rows[e], np.column_stack([a[e], b[f], c[e], d]))
+    return {name: found[name] for name in PATTERNS}
+
+
+def batch_patterns(longitudes, bodies):
+    # find_patterns over a large batch, a chunk of rows at a time
+    longitudes = np.asarray(longitudes, dtype=float)
+    n_rows, n = longitudes.shape
+    chunk = max(1, MAX_CHUNK_CELLS // max(n * n, 1))
+    parts = {name: ([], []) for name in PATTERNS}
+    for start in range(0, n_rows, chunk):
+        for name, (rows, members) in find_patterns(longitudes[start:start + chunk], bodies).items():
+            parts[name][0].append(rows + start)
+            parts[name][1].append(members)
+    return {name: (np.concatenate(rows), np.concatenate(members)) for name, (rows, members) in parts.items()}
+
+
+def chart_patterns(chart):
+    # [(pattern, (body, ...)), ...] for one compute_chart dict
+    bodies = list(chart['longitudes'])
+    lons = np.array([[np.nan if v is None else v for v in chart['longitudes'].values()]])
+    found = []
+    for name, (rows, members) in find_patterns(lons, bodies).items():
+        for row in members:
+            found.append((name, tuple(bodies[b] for b in row)))
+    return found
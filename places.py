@@ -0,0 +1,250 @@
+"""
+Offline place search for the Location entry.
+GeoNames dumps placed in DATA_DIR/places are parsed once into a compact
+.npz index. City files (cities500.txt, cities15000.txt, ...) give names,
+coordinates and population; postal code files (US.txt, GB.txt, ... from
+export/zip) give postal codes. Every place is stored under a normalized
+key ("boston ma", "05478"), and the keys are sorted. A keystroke is then a
+binary search for the prefix range, ranked by population. When few names
+start with the text, places sharing its first letter are ranked by edit
+distance instead, computed for all of them at once with numpy. Nothing
+here ever touches the network.
+"""
+
+import glob
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+import chart_engine
+
+PLACES_DIR = os.path.join(chart_engine.DATA_DIR, 'places')
+INDEX_VERSION = 1
+MAX_FUZZY_CANDIDATES = 2000
+
+CITY_FILE_RE = re.compile(r'^cities\d+\.txt$')
+POSTAL_FILE_RE = re.compile(r'^[A-Z]{2}\.txt$')
+
+
+def normalize(text):
+    # Lower case, no accents or periods, commas as spaces, single spaces
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return ' '.join(text.replace('.', '').replace(',', ' ').split())
+
+
+def source_files(places_dir=None):
+    places_dir = places_dir or PLACES_DIR
+    names = sorted(os.path.basename(p) for p in glob.glob(os.path.join(places_dir, '*.txt')))
+    return [os.path.join(places_dir, n) for n in names if CITY_FILE_RE.match(n) or POSTAL_FILE_RE.match(n)]
+
+
+def source_signature(paths):
+    return ';'.join(f"{os.path.basename(p)}:{os.stat(p).st_size}:{os.stat(p).st_mtime_ns}" for p in paths)
+
+
+def parse_cities(path):
+    # geonameid, name, asciiname, alternatenames, lat, lon, class, code,
+    # country, cc2, admin1, admin2, admin3, admin4, population, ...
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 15:
+                continue
+            admin1 = fields[10] if fields[10].isalpha() else ''
+            yield fields[1], fields[8], admin1, float(fields[4]), float(fields[5]), int(fields[14] or 0)
+
+
+def parse_postal(path):
+    # country, postal code, place name, admin1 name, admin1 code, ..., lat, lon, accuracy
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) < 11 or not fields[9] or not fields[10]:
+                continue
+            yield fields[1], fields[2], fields[0], fields[4], float(fields[9]), float(fields[10])
+
+
+def place_label(name, admin1):
+    return f"{name}, {admin1}" if admin1 else name
+
+
+def build_index(paths, index_path):
+    keys, labels, countries, lats, lons, populations = [], [], [], [], [], []
+
+    def add(key, label, country, lat, lon, population):
+        keys.append(key)
+        labels.append(label)
+        countries.append(country)
+        lats.append(lat)
+        lons.append(lon)
+        populations.append(population)
+
+    city_population = {}
+    for path in paths:
+        if CITY_FILE_RE.match(os.path.basename(path)):
+            for name, country, admin1, lat, lon, population in parse_cities(path):
+                label = place_label(name, admin1)
+                city_population[(country, normalize(label))] = population
+                add(normalize(label), label, country, lat, lon, population)
+    # Postal codes rank with the population of their town when it is known
+    for path in paths:
+        if POSTAL_FILE_RE.match(os.path.basename(path)):
+            for code, name, country, admin1, lat, lon in parse_postal(path):
+                town = place_label(name, admin1)
+                add(normalize(code), f"{code} {town}", country, lat, lon,
+                    city_population.get((country, normalize(town)), 0))
+
+    order = np.argsort(np.array(keys), kind='stable')
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    np.savez_compressed(
+        index_path,
+        version=INDEX_VERSION,
+        source=np.array(source_signature(paths)),
+        keys=np.array(keys)[order],
+        labels=np.array(labels)[order],
+        countries=np.array(countries)[order],
+        lat=np.array(lats)[order],
+        lon=np.array(lons)[order],
+        population=np.array(populations, dtype=np.int64)[order],
+    )
+
+
+def prefix_edit_distance(query, keys, max_distance):
+    # Edit distance from query to the closest prefix of each key, for an
+    # array of keys at once (one numpy row per key, one DP column per char).
+    # Only the band of cells that can stay within max_distance is filled;
+    # anything further is reported as max_distance + 1.
+    m = len(query)
+    cap = max_distance + 1
+    width = min(keys.dtype.itemsize // 4, m + max_distance)
+    if not len(keys) or not width:
+        return np.full(len(keys), min(m, cap), dtype=np.int32)
+    chars = np.ascontiguousarray(keys).view(np.uint32).reshape(len(keys), -1)[:, :width]
+    prev = np.minimum(np.tile(np.arange(width + 1, dtype=np.int32), (len(keys), 1)), cap)
+    for i, c in enumerate(query, 1):
+        cur = np.full_like(prev, cap)
+        cur[:, 0] = min(i, cap)
+        for j in range(max(1, i - max_distance), min(width, i + max_distance) + 1):
+            cur[:, j] = np.minimum(np.minimum(prev[:, j], cur[:, j - 1]) + 1,
+                                   prev[:, j - 1] + (chars[:, j - 1] != ord(c)))
+        prev = np.minimum(cur, cap)
+    return prev.min(axis=1)
+
+
+class PlaceIndex:
+    def __init__(self, keys, labels, countries, lat, lon, population):
+        self.keys = keys
+        self.labels = labels
+        self.countries = countries
+        self.lat = lat
+        self.lon = lon
+        self.population = population
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def load(cls, places_dir=None, index_path=None):
+        # None when there are no GeoNames files to search
+        paths = source_files(places_dir)
+        if not paths:
+            return None
+        index_path = index_path or os.path.join(chart_engine.DATA_DIR, 'places.npz')
+        signature = source_signature(paths)
+        for _ in range(2):
+            if os.path.exists(index_path):
+                with np.load(index_path) as data:
+                    if int(data['version']) == INDEX_VERSION and str(data['source']) == signature:
+                        return cls(data['keys'], data['labels'], data['countries'], data['lat'], data['lon'],
+                                   data['population'])
+            build_index(paths, index_path)
+        raise ValueError(f"Could not build place index at {index_path}")
+
+    def prefix_range(self, key):
+        lo = int(np.searchsorted(self.keys, key, side='left'))
+        hi = int(np.searchsorted(self.keys, key + '\uffff', side='left'))
+        return lo, hi
+
+    def _top(self, rows, limit, country):
+        # rows: indices of candidates; the most populous first, the given
+        # country before others
+        if not len(rows):
+            return rows
+        rank = self.population[rows].astype(np.float64)
+        if country:
+            rank = rank + (self.countries[rows] == country) * 1e12
+        if len(rows) > limit:
+            keep = np.argpartition(-rank, limit - 1)[:limit]
+            rows, rank = rows[keep], rank[keep]
+        return rows[np.argsort(-rank, kind='stable')]
+
+    def suggest(self, text, country='', limit=10):
+        # [(label, country, lat, lon)] for the text typed so far
+        key = normalize(text)
+        if not key:
+            return []
+        country = country.strip().upper()
+        lo, hi = self.prefix_range(key)
+        rows = self._top(np.arange(lo, hi), limit, country)
+
+        # Few names start with the text: probably a typo, so rank places with
+        # the same first letter by how close they come
+        if len(rows) < limit and len(key) >= 3:
+            flo, fhi = self.prefix_range(key[0])
+            pool = self._top(np.arange(flo, fhi), MAX_FUZZY_CANDIDATES, country)
+            pool = pool[(pool < lo) | (pool >= hi)]
+            max_distance = max(1, len(key) // 4)
+            distance = prefix_edit_distance(key, self.keys[pool], max_distance)
+            close = distance <= max_distance
+            pool, distance = pool[close], distance[close]
+            pool = pool[np.lexsort((-self.population[pool], distance))][:limit - len(rows)]
+            rows = np.concatenate([rows, pool])
+
+        return [(str(self.labels[i]), str(self.countries[i]), float(self.lat[i]), float(self.lon[i]))
+                for i in rows]
+
+    def resolve(self, text, country=''):
+        # (lat, lon) of the most populous place whose key or suggestion label
+        # is exactly the normalized text, or None
+        key = normalize(text)
+        lo, hi = self.prefix_range(key)
+        exact = np.arange(lo, hi)[self.keys[lo:hi] == key]
+        if not len(exact) and ' ' in key:
+            # A postal code suggestion's label: the code, then its town
+            lo, hi = self.prefix_range(key.split()[0])
+            labels = np.array([normalize(str(label)) for label in self.labels[lo:hi]], dtype=object)
+            exact = np.arange(lo, hi)[labels == key]
+        if country:
+            in_country = exact[self.countries[exact] == country.strip().upper()]
+            exact = in_country if len(in_country) else exact
+        if not len(exact):
+            return None
+        best = exact[np.argmax(self.population[exact])]
+        return float(self.lat[best]), float(self.lon[best])
+
+
+_default_index = None
+_load_lock = threading.Lock()
+
+
+def get_index():
+    global _default_index
+    with _load_lock:
+        if _default_index is None:
+            _default_index = PlaceIndex.load()
+    return _default_index
+
+
+def loaded_index():
+    # The index if it has been loaded already; never waits for a load
+    return _default_index
+
+
+def load_in_background():
+    thread = threading.Thread(target=get_index, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,245 @@
+"""
+Precision tiers and their accuracy harness.
+Three ways to get positions, from slowest to fastest:
+  swiss         the Swiss Ephemeris .se1 files (the reference)
+  moshier       the built-in Moshier ephemeris, no planet or moon files
+                (Chiron and other asteroids still come from their files)
+  interpolated  a table sampled once from the files over a range of years
+                and evaluated for whole arrays of dates at once by cubic
+                Hermite interpolation, on the per-body grids of time_window
+Houses and angles are always calculated with swe.houses. The harness
+computes the same random charts with a tier and with the reference and
+reports the longitude errors and how often a sign, house or aspect comes
+out differently, so a workload can pick its tier knowing the cost.
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+from batch import BatchResult, compute_batch
+from ephemeris import year_to_jd
+from export import batch_aspects, batch_houses
+from returns import longitudes_and_speeds, wrap180
+from time_window import SAMPLE_STEPS, DEFAULT_STEP
+
+TIERS = ('swiss', 'moshier', 'interpolated')
+TIER_FLAGS = {
+    'swiss': swe.FLG_SWIEPH | swe.FLG_SPEED,
+    'moshier': swe.FLG_MOSEPH | swe.FLG_SPEED,
+}
+
+TABLE_VERSION = 1
+TABLE_START_YEAR = 1900
+TABLE_END_YEAR = 2100
+
+
+def build_table(bodies, start_year, end_year, path):
+    # Longitudes (unwrapped) and speeds of every body on its own uniform grid
+    start_jd, end_jd = year_to_jd(start_year), year_to_jd(end_year)
+    arrays = {}
+    steps = []
+    for b, (name, body) in enumerate(bodies.items()):
+        step = SAMPLE_STEPS.get(name, DEFAULT_STEP)
+        # One sample beyond each end so the last interval is a full one
+        jds = start_jd - step + step * np.arange(int(math.ceil((end_jd - start_jd) / step)) + 3)
+        lons, speeds = longitudes_and_speeds(jds, body, TIER_FLAGS['swiss'])
+        arrays[f'lon_{b}'] = np.unwrap(lons, period=360)
+        arrays[f'speed_{b}'] = speeds
+        steps.append(step)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(
+        path,
+        version=TABLE_VERSION,
+        years=np.array([start_year, end_year], dtype=np.int64),
+        bodies=np.array(list(bodies)),
+        steps=np.array(steps),
+        **arrays,
+    )
+
+
+class EphemerisTable:
+    def __init__(self, bodies, start_jd, end_jd, steps, lons, speeds):
+        # bodies: names; lons/speeds: one sample array per body, the first
+        # sample one step before start_jd
+        self.bodies = list(bodies)
+        self.start_jd = start_jd
+        self.end_jd = end_jd
+        self.steps = steps
+        self.lons = lons
+        self.speeds = speeds
+
+    @classmethod
+    def load(cls, bodies=None, start_year=TABLE_START_YEAR, end_year=TABLE_END_YEAR, path=None):
+        bodies = chart_engine.PLANETS if bodies is None else bodies
+        path = path or os.path.join(chart_engine.DATA_DIR, 'ephemeris_table.npz')
+        for _ in range(2):
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    if (int(data['version']) == TABLE_VERSION and list(data['years']) == [start_year, end_year]
+                            and list(data['bodies']) == list(bodies)):
+                        n = len(bodies)
+                        return cls(bodies, year_to_jd(start_year), year_to_jd(end_year), data['steps'],
+                                   [data[f'lon_{b}'] for b in range(n)], [data[f'speed_{b}'] for b in range(n)])
+            build_table(bodies, start_year, end_year, path)
+        raise ValueError(f"Could not build ephemeris table at {path}")
+
+    def covers(self, jds):
+        jds = np.asarray(jds, dtype=float)
+        return (jds >= self.start_jd) & (jds < self.end_jd)
+
+    def positions(self, b, jds):
+        # (longitudes, speeds) of body number b at an array of dates; NaN outside the table
+        jds = np.asarray(jds, dtype=float)
+        h = self.steps[b]
+        y, m = self.lons[b], self.speeds[b]
+        u = (jds - (self.start_jd - h)) / h
+        i = np.clip(np.floor(u).astype(np.int64), 0, len(y) - 2)
+        s = u - i
+        s2 = s * s
+        s3 = s2 * s
+        y0, y1 = y[i], y[i + 1]
+        m0, m1 = m[i] * h, m[i + 1] * h
+        lon = (2 * s3 - 3 * s2 + 1) * y0 + (s3 - 2 * s2 + s) * m0 + (3 * s2 - 2 * s3) * y1 + (s3 - s2) * m1
+        speed = ((6 * s2 - 6 * s) * (y0 - y1) + (3 * s2 - 4 * s + 1) * m0 + (3 * s2 - 2 * s) * m1) / h
+        outside = ~self.covers(jds)
+        lon[outside] = speed[outside] = np.nan
+        return lon % 360, speed
+
+    def compute(self, jds, lats, lons, house_system=chart_engine.HOUSE_SYSTEM):
+        # A BatchResult like BatchExecutor.compute's
+        jds = np.asarray(jds, dtype=np.float64)
+        n = len(jds)
+        lats = np.broadcast_to(np.asarray(lats, dtype=np.float64), (n,))
+        lons = np.broadcast_to(np.asarray(lons, dtype=np.float64), (n,))
+        n_bodies = len(self.bodies)
+        values = np.empty((n, 2 * n_bodies + 14))
+        for b in range(n_bodies):
+            values[:, b], values[:, n_bodies + b] = self.positions(b, jds)
+        for row in range(n):
+            cusps, ascmc = swe.houses(jds[row], lats[row], lons[row], house_system)
+            values[row, 2 * n_bodies:2 * n_bodies + 12] = cusps[:12]
+            values[row, 2 * n_bodies + 12] = ascmc[0]
+            values[row, 2 * n_bodies + 13] = ascmc[1]
+        return BatchResult(dict.fromkeys(self.bodies), jds, lats, lons, values)
+
+
+_default_table = None
+
+
+def get_table():
+    global _default_table
+    if _default_table is None:
+        _default_table = EphemerisTable.load()
+    return _default_table
+
+
+def compute_charts(jds, lats, lons, tier='swiss', processes=1, **kwargs):
+    # A BatchResult for the charts at the given precision tier
+    if tier == 'interpolated':
+        return get_table().compute(jds, lats, lons, kwargs.get('house_system', chart_engine.HOUSE_SYSTEM))
+    if tier not in TIER_FLAGS:
+        raise ValueError(f"Unknown precision tier {tier!r}; expected one of {', '.join(TIERS)}")
+    return compute_batch(jds, lats, lons, processes, flags=TIER_FLAGS[tier], **kwargs)
+
+
+def compute_chart(jd, lat, lon, tier='swiss', house_system=chart_engine.HOUSE_SYSTEM):
+    # One chart dict like chart_engine.compute_chart's, at the given tier
+    if tier == 'interpolated':
+        return get_table().compute([jd], lat, lon, house_system).chart(0)
+    if tier not in TIER_FLAGS:
+        raise ValueError(f"Unknown precision tier {tier!r}; expected one of {', '.join(TIERS)}")
+    return chart_engine.compute_chart(jd, lat, lon, house_system, TIER_FLAGS[tier])
+
+
+def random_charts(n, seed=0, start_year=TABLE_START_YEAR, end_year=TABLE_END_YEAR, max_latitude=60.0):
+    # Dates and places for the harness; Placidus needs latitudes off the polar circles
+    rng = np.random.default_rng(seed)
+    jds = rng.uniform(year_to_jd(start_year), year_to_jd(end_year), n)
+    return jds, rng.uniform(-max_latitude, max_latitude, n), rng.uniform(-180, 180, n)
+
+
+def aspect_keys(result):
+    rows, first, second, codes, _ = batch_aspects(np.nan_to_num(result.longitudes), result.bodies)
+    missing = np.isnan(result.longitudes)
+    ok = ~(missing[rows, first] | missing[rows, second])
+    return set(zip(rows[ok].tolist(), first[ok].tolist(), second[ok].tolist(), codes[ok].tolist()))
+
+
+def compare(result, reference):
+    # Errors of a BatchResult against the reference charts for the same inputs
+    errors = {}
+    for b, name in enumerate(reference.bodies):
+        diff = np.abs(wrap180(result.longitudes[:, b] - reference.longitudes[:, b]))
+        diff = diff[np.isfinite(diff)]
+        errors[name] = (float(diff.max()), float(np.sqrt(np.mean(diff ** 2)))) if len(diff) else (math.nan, math.nan)
+    for name, values, ref in (('ASC', result.ascendants, reference.ascendants),
+                              ('MC', result.midheavens, reference.midheavens)):
+        diff = np.abs(wrap180(values - ref))
+        errors[name] = (float(diff.max()), float(np.sqrt(np.mean(diff ** 2))))
+
+    valid = np.isfinite(result.longitudes) & np.isfinite(reference.longitudes)
+    signs = np.nan_to_num(result.longitudes) // 30
+    ref_signs = np.nan_to_num(reference.longitudes) // 30
+    houses = batch_houses(np.nan_to_num(result.longitudes), result.cusps)
+    ref_houses = batch_houses(np.nan_to_num(reference.longitudes), reference.cusps)
+    aspects, ref_aspects = aspect_keys(result), aspect_keys(reference)
+    return {
+        'errors': errors,
+        'sign_disagreement': float((signs != ref_signs)[valid].mean()),
+        'house_disagreement': float((houses != ref_houses)[valid].mean()),
+        'aspect_disagreement': len(aspects ^ ref_aspects) / max(len(aspects | ref_aspects), 1),
+        'missing': int((~np.isfinite(result.longitudes) & np.isfinite(reference.longitudes)).sum()),
+    }
+
+
+def accuracy_report(tiers=TIERS, n=2000, seed=0, start_year=TABLE_START_YEAR, end_year=TABLE_END_YEAR):
+    # {tier: comparison with the swiss tier plus 'seconds_per_chart'} over n random charts
+    jds, lats, lons = random_charts(n, seed, start_year, end_year)
+    get_table()  # Built (once) outside the timings
+    results = {}
+    timings = {}
+    for tier in dict.fromkeys(('swiss',) + tuple(tiers)):
+        start = time.perf_counter()
+        results[tier] = compute_charts(jds, lats, lons, tier)
+        timings[tier] = (time.perf_counter() - start) / n
+    report = {}
+    for tier in tiers:
+        report[tier] = compare(results[tier], results['swiss'])
+        report[tier]['seconds_per_chart'] = timings[tier]
+    return report
+
+
+def format_report(report):
+    lines = []
+    for tier, found in report.items():
+        lines.append(f"{tier}: {found['seconds_per_chart'] * 1e6:.0f} us per chart, "
+                     f"sign {found['sign_disagreement']:.4%}, house {found['house_disagreement']:.4%}, "
+                     f"aspect {found['aspect_disagreement']:.4%} disagreement")
+        if found['missing']:
+            lines.append(f"  {found['missing']} positions not available")
+        for name, (max_error, rms_error) in found['errors'].items():
+            lines.append(f"  {name:<10} max {max_error * 3600:9.3f}\"  rms {rms_error * 3600:9.3f}\"")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare precision tiers against the Swiss Ephemeris files.")
+    parser.add_argument('--tiers', nargs='+', choices=TIERS, default=list(TIERS))
+    parser.add_argument('-n', type=int, default=2000, help="random charts to compare")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--years', type=int, nargs=2, default=[TABLE_START_YEAR, TABLE_END_YEAR],
+                        metavar=('START', 'END'), help="range of the random dates")
+    args = parser.parse_args(argv)
+    print(format_report(accuracy_report(args.tiers, args.n, args.seed, *args.years)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
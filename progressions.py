@@ -0,0 +1,193 @@
+"""
+Secondary progressions and solar-arc directions over a life span.
+Secondary progressions take one day after birth for each year of life, so
+100 years of progressions only need 100 days of ephemeris. Those days are
+sampled once per body on a fine grid and every progressed position after
+that is a cubic Hermite interpolation, evaluated for whole arrays of ages
+at once. The solar arc is the progressed Sun's distance from the natal
+Sun; directing a natal point adds the arc to it.
+The ages at which a progressed or directed point perfects an aspect to a
+natal point are roots of its separation from the aspect. Every (point,
+natal point, aspect) is scanned together on a coarse age grid to bracket
+the sign changes, then each bracket is solved by Newton steps on the
+interpolated speeds, falling back to bisection near stations.
+"""
+
+import collections
+import math
+
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+from midpoints import midpoint_points
+from precision import EphemerisTable
+from rectification import YEAR_DAYS
+from returns import longitudes_and_speeds, wrap180, TOLERANCE, MAX_ITERATIONS
+
+DEFAULT_YEARS = 100
+# Ephemeris sample spacing in days (years of age); the progressed Moon
+# interpolates to within about 1e-5 degrees
+SAMPLE_STEP = 0.5
+# Age grid the roots are bracketed on, short enough that no point passes the
+# same aspect twice within one step (the progressed Moon moves about 3°)
+SCAN_STEP = 0.25
+KINDS = ('progressed', 'solar arc')
+# Separation in degrees below which an aspect counts as exact at birth
+BIRTH_TOLERANCE = 1 / 60
+
+Perfection = collections.namedtuple('Perfection', 'age jd kind point aspect target')
+
+
+class Progressions:
+    def __init__(self, natal_chart, years=DEFAULT_YEARS, bodies=None, flags=chart_engine.EPHE_FLAGS):
+        # Progressions for ages 0 to `years`. The chart's bodies found in
+        # `bodies` are progressed; every body plus ASC and MC can be directed.
+        bodies = chart_engine.PLANETS if bodies is None else bodies
+        self.natal_chart = natal_chart
+        self.natal_jd = natal_chart['jd']
+        self.years = years
+        self.natal = midpoint_points(natal_chart)
+        if 'Sun' not in self.natal:
+            raise ValueError("Solar arc directions need the natal Sun")
+
+        # One sample beyond each end so the last interval is a full one
+        h = SAMPLE_STEP
+        jds = self.natal_jd - h + h * np.arange(int(math.ceil(years / h)) + 3)
+        names, lons, speeds = [], [], []
+        for name, lon in natal_chart['longitudes'].items():
+            if lon is None or name not in bodies:
+                continue
+            try:
+                body_lons, body_speeds = longitudes_and_speeds(jds, bodies[name], flags)
+            except swe.Error:
+                # No ephemeris file for part of the span: leave the body out
+                continue
+            names.append(name)
+            lons.append(np.unwrap(body_lons, period=360))
+            speeds.append(body_speeds)
+        if 'Sun' not in names:
+            raise ValueError("Could not progress the Sun")
+        self.table = EphemerisTable(names, self.natal_jd, jds[-1], np.full(len(names), h), lons, speeds)
+        self.bodies = names
+
+    def progressed_jds(self, ages):
+        # Day for a year
+        return self.natal_jd + np.asarray(ages, dtype=float)
+
+    def event_jds(self, ages):
+        # The calendar dates at which the ages are reached
+        return self.natal_jd + np.asarray(ages, dtype=float) * YEAR_DAYS
+
+    def ages_at(self, jds):
+        return (np.asarray(jds, dtype=float) - self.natal_jd) / YEAR_DAYS
+
+    def progressed(self, name, ages):
+        # (longitudes, speeds in degrees per year of age); NaN outside 0 to years
+        return self.table.positions(self.bodies.index(name), self.progressed_jds(ages))
+
+    def solar_arc(self, ages):
+        # (arc, its speed) in degrees
+        sun, speed = self.progressed('Sun', ages)
+        return (sun - self.natal['Sun']) % 360, speed
+
+    def directed(self, name, ages):
+        arc, speed = self.solar_arc(ages)
+        return (self.natal[name] + arc) % 360, speed
+
+    def moving_points(self):
+        # (kind, name) of every point that moves with age
+        return [('progressed', name) for name in self.bodies] + [('solar arc', name) for name in self.natal]
+
+    def positions(self, ages):
+        # {(kind, name): longitudes} at an array of ages
+        arc, _ = self.solar_arc(ages)
+        found = {('progressed', name): self.progressed(name, ages)[0] for name in self.bodies}
+        found.update({('solar arc', name): (lon + arc) % 360 for name, lon in self.natal.items()})
+        return found
+
+    def _moving_at(self, points, rows, ages):
+        # (longitudes, speeds) of moving point rows[i] at ages[i]
+        lons = np.empty(len(rows))
+        speeds = np.empty(len(rows))
+        for row in np.unique(rows):
+            at = rows == row
+            kind, name = points[row]
+            method = self.progressed if kind == 'progressed' else self.directed
+            lons[at], speeds[at] = method(name, ages[at])
+        return lons, speeds
+
+    def perfections(self, aspects=chart_engine.MAJOR_ASPECTS, start_age=0.0, end_age=None, kinds=KINDS):
+        # Every exact aspect from a progressed or directed point to a natal
+        # point between the two ages, as Perfections sorted by age
+        end_age = self.years if end_age is None else min(end_age, self.years)
+        points = [p for p in self.moving_points() if p[0] in kinds]
+        targets = list(self.natal)
+        target_lons = np.array([self.natal[t] for t in targets])
+        # Both sides of each aspect, one offset per distinct separation
+        offsets = []
+        for name, (angle, _) in aspects.items():
+            offsets += [(name, angle)] + ([(name, -angle)] if 0 < angle < 180 else [])
+        offset_angles = np.array([angle for _, angle in offsets], dtype=float)
+
+        grid = np.append(np.arange(start_age, end_age, SCAN_STEP), end_age)
+        moving = self.positions(grid)
+        lons = np.array([moving[p] for p in points])
+        diff = wrap180(lons[:, None, None, :] - target_lons[None, :, None, None] - offset_angles[None, None, :, None])
+        # A sign change counts only when the point really passed the aspect,
+        # not when the separation wrapped through the opposite point
+        crossing = (np.sign(diff[..., :-1]) != np.sign(diff[..., 1:])) & (np.abs(diff[..., 1:] - diff[..., :-1]) < 180)
+        # Aspects already exact at birth (a point to its own natal place, to
+        # within the interpolation) are not perfections
+        if start_age == 0:
+            crossing[..., 0] &= np.abs(diff[..., 0]) > BIRTH_TOLERANCE
+        p, t, k, g = np.nonzero(crossing)
+        if not len(g):
+            return []
+        goals = target_lons[t] + offset_angles[k]
+        lower = grid[g].copy()
+        upper = grid[g + 1].copy()
+        rising = diff[p, t, k, g + 1] > diff[p, t, k, g]
+
+        # Lockstep Newton for every bracket, bisecting when a step escapes it
+        ages = (lower + upper) / 2
+        active = np.ones(len(ages), dtype=bool)
+        for _ in range(MAX_ITERATIONS):
+            idx = np.nonzero(active)[0]
+            if not len(idx):
+                break
+            lon, speed = self._moving_at(points, p[idx], ages[idx])
+            miss = wrap180(lon - goals[idx])
+            done = np.abs(miss) < TOLERANCE
+            below = (miss < 0) == rising[idx]
+            lower[idx] = np.where(below, ages[idx], lower[idx])
+            upper[idx] = np.where(below, upper[idx], ages[idx])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                new = ages[idx] - miss / speed
+            bad = ~np.isfinite(new) | (new <= lower[idx]) | (new >= upper[idx])
+            new = np.where(bad, (lower[idx] + upper[idx]) / 2, new)
+            ages[idx] = np.where(done, ages[idx], new)
+            active[idx[done]] = False
+
+        # A root on a grid age can be bracketed from both sides
+        order = np.lexsort((ages, k, t, p))
+        same = np.zeros(len(order), dtype=bool)
+        if len(order) > 1:
+            a, b = order[:-1], order[1:]
+            same[1:] = (p[a] == p[b]) & (t[a] == t[b]) & (k[a] == k[b]) & (ages[b] - ages[a] < 1e-6)
+        order = order[~same]
+        order = order[np.argsort(ages[order], kind='stable')]
+        jds = self.event_jds(ages[order])
+        return [Perfection(float(ages[i]), float(jd), points[p[i]][0], points[p[i]][1], offsets[k[i]][0],
+                           targets[t[i]]) for i, jd in zip(order, jds)]
+
+    def progressed_chart(self, age, house_system=chart_engine.HOUSE_SYSTEM, bodies=None):
+        # The full progressed chart at an age, with houses cast for the progressed day at the natal place
+        jd = float(self.progressed_jds(age))
+        return chart_engine.compute_chart(jd, self.natal_chart['lat'], self.natal_chart['lon'], house_system,
+                                          bodies=bodies)
+
+
+def progression_timeline(natal_chart, years=DEFAULT_YEARS, aspects=chart_engine.MAJOR_ASPECTS, bodies=None):
+    # Perfections of progressed and solar-arc points to the natal chart over a life span
+    return Progressions(natal_chart, years, bodies).perfections(aspects)
@@ -0,0 +1,259 @@
+"""
+Birth-time rectification.
+Given a time window, a place and a list of constraints (ASC in a sign or
+degree range, a planet on an angle or in a house, solar-arc directions that
+must be exact at known life events), every constraint is evaluated on a time
+grid over the whole window at once. Each constraint gives an error per
+sample, where 0 is exact and 1 is the edge of its tolerance. Runs of samples
+where all errors are <= 1 become candidate windows. Windows narrower than
+the grid step are looked for between rejected neighbour samples whose
+errors, going by how fast they change, could dip to 1 in between. Window
+edges are bisected and the best time inside each window is found by a
+golden-section search, both down to the requested resolution, and the
+candidates are ranked by their best total error.
+"""
+
+import collections
+import datetime
+
+import numpy as np
+import pytz
+import swisseph as swe
+
+import chart_engine
+from returns import longitudes_and_speeds, wrap180
+
+ANGLES = {'ASC': 0, 'MC': 1, 'DSC': 2, 'IC': 3}
+YEAR_DAYS = 365.242190
+
+# Error slopes are widened by this much before deciding a gap between two
+# rejected samples cannot hold an accepted time
+GAP_SLOPE_MARGIN = 1.5
+GOLDEN = (5 ** 0.5 - 1) / 2
+
+Candidate = collections.namedtuple('Candidate', 'jd start end score errors')
+
+
+def sample_chart(jds, lat, lon, body_names, house_system=chart_engine.HOUSE_SYSTEM, bodies=None):
+    # Angles, cusps and the requested body longitudes for every jd, as arrays
+    bodies = chart_engine.PLANETS if bodies is None else bodies
+    jds = np.asarray(jds, dtype=float)
+    cusps = np.empty((len(jds), 12))
+    ascmc = np.empty((len(jds), 2))
+    for i, jd in enumerate(jds):
+        c, a = swe.houses(jd, lat, lon, house_system)
+        cusps[i] = c[:12]
+        ascmc[i] = a[:2]
+    samples = {
+        'jd': jds,
+        'cusps': cusps,
+        'ASC': ascmc[:, 0],
+        'MC': ascmc[:, 1],
+        'DSC': (ascmc[:, 0] + 180) % 360,
+        'IC': (ascmc[:, 1] + 180) % 360,
+    }
+    for name in body_names:
+        samples[name] = longitudes_and_speeds(jds, bodies[name])[0]
+    return samples
+
+
+class AngleInRange:
+    # An angle ('ASC', 'MC', 'DSC', 'IC') or body between lo and hi degrees,
+    # measured counter-clockwise so ranges may cross 0° Aries
+    def __init__(self, point, lo, hi):
+        self.point = point
+        self.center = (lo + ((hi - lo) % 360) / 2) % 360
+        self.half_width = max(((hi - lo) % 360) / 2, 1e-9)
+        self.bodies = [] if point in ANGLES else [point]
+
+    def evaluate(self, samples):
+        return np.abs(wrap180(samples[self.point] - self.center)) / self.half_width
+
+
+class AngleInSign(AngleInRange):
+    def __init__(self, point, sign):
+        start = chart_engine.SIGNS.index(sign) * 30
+        super().__init__(point, start, start + 30)
+
+
+class OnAngle:
+    # A body within orb of an angle; angle='any' accepts the closest of the four
+    def __init__(self, body, angle='any', orb=3.0):
+        self.body = body
+        self.angles = list(ANGLES) if angle == 'any' else [angle]
+        self.orb = orb
+        self.bodies = [body]
+
+    def evaluate(self, samples):
+        lon = samples[self.body]
+        dist = np.min([np.abs(wrap180(lon - samples[a])) for a in self.angles], axis=0)
+        return dist / self.orb
+
+
+class InHouse:
+    # A body in the given house: 0 at mid-house, 1 on either cusp
+    def __init__(self, body, house):
+        self.body = body
+        self.house = house
+        self.bodies = [body]
+
+    def evaluate(self, samples):
+        cusps = samples['cusps']
+        start = cusps[:, self.house - 1]
+        size = (cusps[:, self.house % 12] - start) % 360
+        frac = (samples[self.body] - start) % 360 / size
+        # Outside the house: grows with the distance to the nearer cusp
+        outside = np.minimum(frac - 1, (360 - (samples[self.body] - start) % 360) / size)
+        return np.where(frac <= 1, np.abs(2 * frac - 1), 1 + outside)
+
+
+class SolarArcDirection:
+    # At event_jd, natal `point` directed by solar arc (one day per year)
+    # makes `aspect` to natal `target` within orb
+    def __init__(self, event_jd, point, target, aspect=0.0, orb=1.0):
+        self.event_jd = event_jd
+        self.point = point
+        self.target = target
+        self.aspect = aspect
+        self.orb = orb
+        self.bodies = sorted({'Sun'} | {p for p in (point, target) if p not in ANGLES})
+
+    def evaluate(self, samples):
+        jds = samples['jd']
+        progressed = longitudes_and_speeds(jds + (self.event_jd - jds) / YEAR_DAYS, swe.SUN)[0]
+        arc = (progressed - samples['Sun']) % 360
+        separation = wrap180(samples[self.point] + arc - samples[self.target])
+        # Both sides of the aspect count (e.g. +90 and -90)
+        dist = np.minimum(np.abs(separation - self.aspect), np.abs(separation + self.aspect))
+        return dist / self.orb
+
+
+def constraint_bodies(constraints):
+    return sorted({name for c in constraints for name in c.bodies})
+
+
+def evaluate(constraints, jds, lat, lon, house_system=chart_engine.HOUSE_SYSTEM, bodies=None):
+    # (n_constraints, n_samples) error matrix
+    samples = sample_chart(jds, lat, lon, constraint_bodies(constraints), house_system, bodies)
+    return np.array([c.evaluate(samples) for c in constraints]).reshape(len(constraints), len(samples['jd']))
+
+
+def bisect_edge(constraints, inside, outside, lat, lon, resolution, **kwargs):
+    # Move an edge between an accepted and a rejected time to within resolution
+    while abs(outside - inside) > resolution:
+        mid = (inside + outside) / 2
+        if (evaluate(constraints, [mid], lat, lon, **kwargs)[:, 0] <= 1).all():
+            inside = mid
+        else:
+            outside = mid
+    return inside
+
+
+def refine_best(constraints, lo, hi, guess, lat, lon, resolution, **kwargs):
+    # Golden-section search for the lowest total error in [lo, hi]; the
+    # guess is kept if the search ends somewhere worse
+    def total(jd):
+        return float(evaluate(constraints, [jd], lat, lon, **kwargs)[:, 0].sum())
+
+    a, b = lo, hi
+    c, d = b - GOLDEN * (b - a), a + GOLDEN * (b - a)
+    fc, fd = total(c), total(d)
+    while b - a > resolution:
+        if fc <= fd:
+            b, d, fd = d, c, fc
+            c = b - GOLDEN * (b - a)
+            fc = total(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + GOLDEN * (b - a)
+            fd = total(d)
+    best = (a + b) / 2
+    return best if total(best) <= total(guess) else guess
+
+
+def interval_slopes(errors):
+    # How much each error can change across each interval between samples:
+    # the largest change of that interval and the intervals either side, so
+    # a V-shaped error dipping between two samples is measured by its sides
+    change = np.abs(np.diff(errors, axis=1))
+    slope = change.copy()
+    slope[:, 1:] = np.maximum(slope[:, 1:], change[:, :-1])
+    slope[:, :-1] = np.maximum(slope[:, :-1], change[:, 1:])
+    return slope * GAP_SLOPE_MARGIN
+
+
+def probe_gaps(constraints, t0, t1, e0, e1, slope, lat, lon, resolution, **kwargs):
+    # Windows narrower than the grid step hiding between rejected neighbours.
+    # Each interval is halved while every error could still dip to 1 inside
+    # it; returns (accepted time, rejected time before, rejected time after).
+    found = []
+    while len(t0):
+        mid = (t0 + t1) / 2
+        em = evaluate(constraints, mid, lat, lon, **kwargs)
+        ok = (em <= 1).all(axis=0)
+        found += zip(mid[ok], t0[ok], t1[ok])
+        rest = ~ok
+        slope = np.hstack([slope[:, rest], slope[:, rest]]) / 2
+        t0, t1 = np.concatenate([t0[rest], mid[rest]]), np.concatenate([mid[rest], t1[rest]])
+        e0, e1 = np.hstack([e0[:, rest], em[:, rest]]), np.hstack([em[:, rest], e1[:, rest]])
+        keep = ((e0 + e1 - slope) / 2 <= 1).all(axis=0) & (t1 - t0 > resolution)
+        t0, t1, e0, e1, slope = t0[keep], t1[keep], e0[:, keep], e1[:, keep], slope[:, keep]
+    return found
+
+
+def rectify(jd_start, jd_end, lat, lon, constraints, step=60.0, resolution=1.0, max_candidates=10,
+            house_system=chart_engine.HOUSE_SYSTEM, bodies=None):
+    # step and resolution are in seconds. Returns Candidates, best first.
+    kwargs = {'house_system': house_system, 'bodies': bodies}
+    step_days = step / 86400.0
+    resolution_days = resolution / 86400.0
+    jds = np.arange(jd_start, jd_end + step_days / 2, step_days)
+    errors = evaluate(constraints, jds, lat, lon, **kwargs)
+    ok = (errors <= 1).all(axis=0)
+    total = errors.sum(axis=0)
+
+    # Windows as (accepted time, rejected time before, accepted time at the
+    # end, rejected time after), None where the window reaches the search's end
+    windows = []
+    # Runs of accepted samples
+    edges = np.diff(np.concatenate([[0], ok.astype(np.int8), [0]]))
+    for a, b in zip(np.nonzero(edges == 1)[0], np.nonzero(edges == -1)[0]):
+        best = a + int(np.argmin(total[a:b]))
+        windows.append((jds[best], jds[a], None if a == 0 else jds[a - 1],
+                        jds[b - 1], None if b == len(jds) else jds[b]))
+    # Rejected neighbours whose errors could dip to 1 between them
+    slope = interval_slopes(errors)
+    gaps = np.nonzero(~ok[:-1] & ~ok[1:] & ((errors[:, :-1] + errors[:, 1:] - slope) / 2 <= 1).all(axis=0))[0]
+    for seed, before, after in probe_gaps(constraints, jds[gaps], jds[gaps + 1], errors[:, gaps],
+                                          errors[:, gaps + 1], slope[:, gaps], lat, lon, resolution_days, **kwargs):
+        windows.append((seed, seed, before, seed, after))
+
+    candidates = []
+    for guess, first, before, last, after in windows:
+        start = first if before is None else bisect_edge(constraints, first, before, lat, lon, resolution_days, **kwargs)
+        end = last if after is None else bisect_edge(constraints, last, after, lat, lon, resolution_days, **kwargs)
+        # The best time to within resolution, not just the best grid sample
+        lo, hi = max(start, guess - step_days), min(end, guess + step_days)
+        jd = refine_best(constraints, lo, hi, guess, lat, lon, resolution_days, **kwargs) if hi > lo else guess
+        found = evaluate(constraints, [jd], lat, lon, **kwargs)[:, 0]
+        candidates.append(Candidate(float(jd), float(start), float(end), float(found.sum()),
+                                    tuple(float(e) for e in found)))
+
+    candidates.sort(key=lambda c: (c.score, c.start - c.end))
+    return candidates[:max_candidates]
+
+
+def day_window(date_str, timezone):
+    # UT Julian days of local midnight to midnight for a date (YYYY-MM-DD)
+    _, jd_start = chart_engine.local_to_julian_day(date_str, "00:00", timezone)
+    day = datetime.datetime.strptime(date_str, "%Y-%m-%d") + datetime.timedelta(days=1)
+    _, jd_end = chart_engine.local_to_julian_day(day.strftime("%Y-%m-%d"), "00:00", timezone)
+    return jd_start, jd_end
+
+
+def candidate_time(candidate, timezone):
+    # Local datetime of a candidate, rounded to the second
+    year, month, day, hours = swe.revjul(candidate.jd)
+    seconds = round(hours * 3600)
+    utc = datetime.datetime(year, month, day, tzinfo=pytz.UTC) + datetime.timedelta(seconds=seconds)
+    return utc.astimezone(timezone)
@@ -0,0 +1,122 @@
+"""
+Composite and Davison relationship charts.
+A composite chart puts every body at the nearer midpoint of its two natal
+longitudes. Its cusps are derived rather than averaged: the composite MC
+is converted to an ARMC and houses are cast from it at the midpoint
+latitude (the reference place method), so the cusps stay a real house
+division. A Davison chart is an ordinary chart cast for the midpoint in
+time and space of the two births.
+For a group of N people all N(N-1)/2 pairs are done at once: composites
+are one circular-midpoint operation over (pairs, bodies) arrays, and the
+Davison midpoints are handed to a BatchExecutor as a single batch.
+"""
+
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+from batch import BatchExecutor, BatchResult
+from export import charts_to_batch
+from returns import wrap180
+
+
+def circular_midpoint(a, b):
+    # Nearer midpoint of two longitudes (arrays broadcast); NaN stays NaN
+    a = np.asarray(a, dtype=float)
+    return (a + wrap180(np.asarray(b, dtype=float) - a) / 2) % 360
+
+
+def midpoint_place(lat1, lon1, lat2, lon2):
+    # Davison's space midpoint: mean latitude, nearer midpoint of longitude
+    lat = (np.asarray(lat1, dtype=float) + np.asarray(lat2, dtype=float)) / 2
+    lon = (circular_midpoint(lon1, lon2) + 180) % 360 - 180
+    return lat, lon
+
+
+def mc_to_armc(mc, eps):
+    # Right ascension of the MC, which is the ARMC by definition
+    mc = np.radians(mc)
+    return np.degrees(np.arctan2(np.sin(mc) * np.cos(np.radians(eps)), np.cos(mc))) % 360
+
+
+def true_obliquity(jd):
+    pos, ret = swe.calc_ut(jd, swe.ECL_NUT)
+    return pos[0]
+
+
+def pair_indices(n):
+    # (first, second) person indices of every pair, in row order of the results
+    return np.triu_indices(n, 1)
+
+
+def derived_cusps(midheavens, lats, jds, house_system=chart_engine.HOUSE_SYSTEM):
+    # (n, 12) cusps, ascendants and midheavens cast from each composite MC
+    n = len(midheavens)
+    cusps = np.empty((n, 12))
+    ascendants = np.empty(n)
+    mcs = np.empty(n)
+    for row in range(n):
+        eps = true_obliquity(jds[row])
+        armc = float(mc_to_armc(midheavens[row], eps))
+        house_cusps, ascmc = swe.houses_armc(armc, float(lats[row]), eps, house_system)
+        cusps[row] = house_cusps[:12]
+        ascendants[row] = ascmc[0]
+        mcs[row] = ascmc[1]
+    return cusps, ascendants, mcs
+
+
+def composite_batch(result, first, second, house_system=chart_engine.HOUSE_SYSTEM):
+    # Composites of rows first[k] and second[k] of a BatchResult, as a BatchResult
+    n_bodies = len(result.bodies)
+    jds = (result.jds[first] + result.jds[second]) / 2
+    lats, lons = midpoint_place(result.lats[first], result.lons[first], result.lats[second], result.lons[second])
+    values = np.empty((len(first), 2 * n_bodies + 14))
+    values[:, :n_bodies] = circular_midpoint(result.longitudes[first], result.longitudes[second])
+    values[:, n_bodies:2 * n_bodies] = (result.speeds[first] + result.speeds[second]) / 2
+    midheavens = circular_midpoint(result.midheavens[first], result.midheavens[second])
+    cusps, ascendants, midheavens = derived_cusps(midheavens, lats, jds, house_system)
+    values[:, 2 * n_bodies:2 * n_bodies + 12] = cusps
+    values[:, 2 * n_bodies + 12] = ascendants
+    values[:, 2 * n_bodies + 13] = midheavens
+    return BatchResult(dict.fromkeys(result.bodies), jds, lats, lons, values)
+
+
+def group_composites(result, house_system=chart_engine.HOUSE_SYSTEM):
+    # Composites for every pair of charts in a BatchResult: ((first, second), BatchResult)
+    first, second = pair_indices(len(result))
+    return (first, second), composite_batch(result, first, second, house_system)
+
+
+def group_davisons(result, executor=None, **kwargs):
+    # Davison charts for every pair of charts in a BatchResult, computed as one
+    # batch: ((first, second), BatchResult)
+    first, second = pair_indices(len(result))
+    jds = (result.jds[first] + result.jds[second]) / 2
+    lats, lons = midpoint_place(result.lats[first], result.lons[first], result.lats[second], result.lons[second])
+    own_executor = executor is None
+    executor = executor or BatchExecutor(**kwargs)
+    try:
+        davisons = executor.compute(jds, lats, lons)
+    finally:
+        if own_executor:
+            executor.close()
+    return (first, second), davisons
+
+
+def composite_chart(chart1, chart2, house_system=chart_engine.HOUSE_SYSTEM):
+    # Composite of two compute_chart dicts, in the same dict shape; bodies
+    # missing from either chart are left out
+    bodies = [name for name, lon in chart1['longitudes'].items()
+              if lon is not None and chart2['longitudes'].get(name) is not None]
+    pair = [{**chart, 'longitudes': {name: chart['longitudes'][name] for name in bodies},
+             'speeds': {name: chart['speeds'][name] for name in bodies}} for chart in (chart1, chart2)]
+    chart = composite_batch(charts_to_batch(pair), np.array([0]), np.array([1]), house_system).chart(0)
+    chart['aspects'] = chart_engine.chart_aspects(chart['longitudes'])
+    return chart
+
+
+def davison_chart(chart1, chart2, house_system=chart_engine.HOUSE_SYSTEM, flags=chart_engine.EPHE_FLAGS,
+                  bodies=None):
+    jd = (chart1['jd'] + chart2['jd']) / 2
+    lat, lon = midpoint_place(chart1['lat'], chart1['lon'], chart2['lat'], chart2['lon'])
+    return chart_engine.compute_chart(jd, float(lat), float(lon), house_system, flags, bodies)
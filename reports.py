@@ -0,0 +1,271 @@
+"""
+Bulk chart reports from a file of birth records.
+Records are read from a CSV file with name, date (YYYY-MM-DD), time
+(HH:MM), place and country columns; optional lat, lon and timezone columns
+skip the place lookup, which otherwise uses the offline place index only.
+Each record becomes the report Save Chart writes: a PDF with the cover,
+chart and text pages, or the chart alone as a PNG. Reports go one file per
+record or all into one PDF.
+Every worker process builds the three page figures once and only changes
+their text and chart artists from one report to the next. Records are
+handed out in a bounded window and each page is written as soon as it is
+drawn, so memory stays the same however many records there are. A
+combined PDF has a single writer: the workers compute the charts and text
+ahead of it and the main process draws the pages.
+"""
+
+import argparse
+import collections
+import csv
+import datetime
+import multiprocessing
+import os
+import re
+import sys
+import textwrap
+
+import pytz
+import swisseph as swe
+from timezonefinder import TimezoneFinder
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+
+import chart_engine
+import eclipses
+import fixed_stars
+import places
+from asteroids import glyph_for
+from chart_renderer import ChartRenderer
+from interpretations import report_text, STAR_ORB, STAR_MAX_MAGNITUDE, ECLIPSE_ORB, ECLIPSE_CONTACT_YEARS
+
+MODES = ('pdf', 'png', 'combined')
+PNG_DPI = 300
+# Records in flight per worker; enough to keep every worker busy
+WINDOW_PER_PROCESS = 4
+# The text page is wrapped here, at about the width of the page in 10 pt
+# DejaVu Sans; matplotlib's own wrap=True measures the text word by word
+# and took seconds for a full report
+TEXT_PAGE_COLUMNS = 95
+
+
+class ReportPages:
+    # The cover, chart and text pages of a report. Pass the figure a chart
+    # is already drawn on (the GUI's) to use it as the chart page as is.
+    def __init__(self, chart_fig=None):
+        self.cover_fig = Figure(figsize=(8.5, 11))
+        cover_ax = self.cover_fig.add_subplot(111)
+        cover_ax.axis('off')  # No axes
+        self.title = cover_ax.text(0.5, 0.7, '', fontsize=24, ha='center', va='center', family='DejaVu Sans',
+                                   weight='bold')
+        cover_ax.text(0.5, 0.6, "Astrological Natal Chart", fontsize=16, ha='center', va='center',
+                      family='DejaVu Sans')
+        self.generated = cover_ax.text(0.5, 0.4, '', fontsize=12, ha='center', va='center', family='DejaVu Sans',
+                                       color='gray')
+
+        if chart_fig is None:
+            self.chart_fig = Figure(figsize=(6, 6), dpi=100)
+            self.renderer = ChartRenderer(self.chart_fig)
+        else:
+            self.chart_fig = chart_fig
+            self.renderer = None
+
+        self.text_fig = Figure(figsize=(8.5, 11))
+        text_ax = self.text_fig.add_subplot(111)
+        text_ax.axis('off')
+        self.body = text_ax.text(0.05, 0.95, '', fontsize=10, ha='left', va='top', family='DejaVu Sans')
+
+    def fill(self, title, text, chart=None, generated=None):
+        generated = generated or datetime.datetime.now().strftime("%B %d, %Y")
+        self.title.set_text(title)
+        self.generated.set_text(f"Generated on {generated}")
+        self.body.set_text('\n'.join(textwrap.fill(line, TEXT_PAGE_COLUMNS) for line in text.split('\n')))
+        if chart is not None and self.renderer is not None:
+            self.renderer.render(chart['longitudes'], chart['house_cusps'], chart['ascendant'], chart['midheaven'],
+                                 chart['aspects'], {name: glyph_for(name) for name in chart['longitudes']})
+
+    def save_pdf(self, pdf):
+        # Append the three pages to an open PdfPages
+        pdf.savefig(self.cover_fig, bbox_inches='tight')
+        self.chart_fig.savefig(pdf, format='pdf', bbox_inches='tight')
+        pdf.savefig(self.text_fig, bbox_inches='tight')
+
+    def save_png(self, path, dpi=PNG_DPI):
+        # PNG mode: Only chart
+        self.chart_fig.savefig(path, dpi=dpi, bbox_inches='tight')
+
+
+def read_records(path):
+    # Rows as dicts with stripped values, read lazily
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            yield {k.strip().lower(): (v or '').strip() for k, v in row.items() if k}
+
+
+def record_title(record):
+    # Person's name, falling back to the location
+    return record.get('name') or record.get('place') or "Astrological Chart"
+
+
+def record_file_stem(number, record):
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', record_title(record)).strip('_')[:60]
+    return f"{number:05d}_{slug or 'chart'}"
+
+
+# Per-worker state set up once by _init_worker
+_worker = {}
+
+
+def _init_worker(mode, out_dir, dpi):
+    _worker['mode'] = mode
+    _worker['out_dir'] = out_dir
+    _worker['dpi'] = dpi
+    _worker['pages'] = ReportPages() if mode != 'combined' else None
+    _worker['timezones'] = None
+
+
+def record_location(record):
+    if record.get('lat') and record.get('lon'):
+        return float(record['lat']), float(record['lon'])
+    index = places.get_index()
+    coords = index.resolve(record.get('place', ''), record.get('country', '')) if index is not None else None
+    if coords is None:
+        raise ValueError(f"Location not in the offline place index: {record.get('place', '')}")
+    return coords
+
+
+def record_timezone(record, lat, lon):
+    if record.get('timezone'):
+        return pytz.timezone(record['timezone'])
+    if _worker.get('timezones') is None:
+        _worker['timezones'] = TimezoneFinder()
+    tz_name = _worker['timezones'].timezone_at(lat=lat, lng=lon)
+    if not tz_name:
+        raise ValueError("Could not determine the timezone for the coordinates.")
+    return pytz.timezone(tz_name)
+
+
+def record_chart(record):
+    lat, lon = record_location(record)
+    _, jd = chart_engine.local_to_julian_day(record.get('date', ''), record.get('time', ''),
+                                             record_timezone(record, lat, lon))
+    return chart_engine.compute_chart(jd, lat, lon)
+
+
+def chart_text(chart):
+    # The text panel's report for a chart, star and eclipse contacts included
+    star_contacts = fixed_stars.find_star_contacts(chart, STAR_ORB, STAR_MAX_MAGNITUDE)
+    found = (eclipses.prenatal_eclipses(chart), eclipses.find_eclipse_contacts(chart, ECLIPSE_ORB, ECLIPSE_CONTACT_YEARS))
+    return report_text(chart['longitudes'], chart['retrogrades'], chart['house_cusps'], chart['aspects'],
+                       star_contacts, found)
+
+
+def _run_record(task):
+    # Returns (number, output path or report data, error message or None)
+    number, record, generated = task
+    try:
+        chart = record_chart(record)
+        text = chart_text(chart)
+        if _worker['mode'] == 'combined':
+            return number, (record_title(record), text, chart), None
+        pages = _worker['pages']
+        pages.fill(record_title(record), text, chart, generated)
+        path = os.path.join(_worker['out_dir'], record_file_stem(number, record) + '.' + _worker['mode'])
+        if _worker['mode'] == 'pdf':
+            with PdfPages(path) as pdf:
+                pages.save_pdf(pdf)
+        else:
+            pages.save_png(path, _worker['dpi'])
+        return number, path, None
+    except (ValueError, OSError, KeyError, swe.Error) as e:
+        return number, None, str(e)
+
+
+def bounded_imap(pool, func, items, window):
+    # pool.imap without reading ahead of the results: at most `window` items
+    # are in flight, and results come back in order
+    pending = collections.deque()
+    for item in items:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def generate_reports(records_path, out_path, mode='pdf', processes=None, dpi=PNG_DPI, progress=None):
+    # Writes every report; returns (reports written, [(record number, error)])
+    if mode not in MODES:
+        raise ValueError(f"Unknown report mode {mode!r}; expected one of {', '.join(MODES)}")
+    processes = processes or os.cpu_count() or 1
+    out_dir = os.path.dirname(os.path.abspath(out_path)) if mode == 'combined' else out_path
+    os.makedirs(out_dir, exist_ok=True)
+
+    # Built here first so the workers only ever load these files
+    fixed_stars.get_catalog()
+    eclipses.get_catalog()
+    places.get_index()
+
+    generated = datetime.datetime.now().strftime("%B %d, %Y")
+    tasks = ((number, record, generated) for number, record in enumerate(read_records(records_path), 1))
+    written, failed = 0, []
+    pool = None
+    try:
+        if processes == 1:
+            _init_worker(mode, out_dir, dpi)
+            results = map(_run_record, tasks)
+        else:
+            pool = multiprocessing.Pool(processes, initializer=_init_worker, initargs=(mode, out_dir, dpi))
+            results = bounded_imap(pool, _run_record, tasks, processes * WINDOW_PER_PROCESS)
+
+        if mode == 'combined':
+            pages = ReportPages()
+            with PdfPages(out_path) as pdf:
+                for number, report, error in results:
+                    if error is None:
+                        title, text, chart = report
+                        pages.fill(title, text, chart, generated)
+                        pages.save_pdf(pdf)
+                        written += 1
+                    else:
+                        failed.append((number, error))
+                    if progress:
+                        progress(number, error)
+        else:
+            for number, path, error in results:
+                if error is None:
+                    written += 1
+                else:
+                    failed.append((number, error))
+                if progress:
+                    progress(number, error)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return written, failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write chart reports for every record in a CSV file.")
+    parser.add_argument('records', help="CSV file with name, date, time, place, country (and optional lat, lon, "
+                                        "timezone) columns")
+    parser.add_argument('output', help="output folder, or the PDF file for --mode combined")
+    parser.add_argument('--mode', choices=MODES, default='pdf',
+                        help="one PDF per record, one PNG chart per record, or one combined PDF")
+    parser.add_argument('--processes', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--dpi', type=int, default=PNG_DPI, help="PNG resolution")
+    args = parser.parse_args(argv)
+
+    def progress(number, error):
+        if error:
+            print(f"Record {number}: {error}", file=sys.stderr)
+        elif number % 100 == 0:
+            print(f"{number} records done")
+
+    written, failed = generate_reports(args.records, args.output, args.mode, args.processes, args.dpi, progress)
+    print(f"{written} reports written, {len(failed)} failed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
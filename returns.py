@@ -0,0 +1,137 @@
+"""
+Planetary return finder.
+Solves for the exact UT instants at which a transiting body comes back to
+its natal longitude and builds the return charts. The Sun and Moon never
+station, so their returns are seeded from the mean motion and polished with
+Newton steps using the FLG_SPEED longitude speed. Bodies that turn
+retrograde are scanned on a coarse grid to bracket every crossing first;
+Newton then refines each bracket, falling back to bisection near stations.
+"""
+
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+
+# Mean tropical motion in degrees per day, for bodies that are always direct
+MEAN_MOTION = {
+    swe.SUN: 360.0 / 365.242190,
+    swe.MOON: 360.0 / 27.321582,
+}
+
+# Scan step in days for bodies that can station, short enough that a body
+# never crosses the target twice within one step
+SCAN_STEP = {
+    swe.MERCURY: 1.0,
+    swe.VENUS: 2.0,
+    swe.MARS: 3.0,
+    swe.TRUE_NODE: 1.0,
+}
+DEFAULT_SCAN_STEP = 5.0
+
+TOLERANCE = 1e-7  # degrees
+MAX_ITERATIONS = 12
+
+
+def wrap180(angle):
+    return (np.asarray(angle) + 180.0) % 360.0 - 180.0
+
+
+def longitudes_and_speeds(jds, body, flags=chart_engine.EPHE_FLAGS):
+    lons = np.empty(len(jds))
+    speeds = np.empty(len(jds))
+    for i, jd in enumerate(jds):
+        pos, ret = swe.calc_ut(jd, body, flags | swe.FLG_SPEED)
+        lons[i] = pos[0]
+        speeds[i] = pos[3]
+    return lons, speeds
+
+
+def refine(body, target_lon, jds, lower=None, upper=None, rising=None, flags=chart_engine.EPHE_FLAGS):
+    # Lockstep Newton iteration for every candidate; when brackets are given,
+    # a step that leaves its bracket is replaced by bisection
+    jds = np.array(jds, dtype=float)
+    active = np.ones(len(jds), dtype=bool)
+    for _ in range(MAX_ITERATIONS):
+        idx = np.nonzero(active)[0]
+        if not len(idx):
+            break
+        lons, speeds = longitudes_and_speeds(jds[idx], body, flags)
+        diff = wrap180(lons - target_lon)
+        done = np.abs(diff) < TOLERANCE
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = diff / speeds
+        new = jds[idx] - step
+        if lower is not None:
+            # Shrink the bracket around the root, then bisect when Newton escapes it.
+            # Direction comes from the bracket ends, not the local speed, which
+            # can have either sign near a station.
+            below = (diff < 0) == rising[idx]
+            lower[idx] = np.where(below, jds[idx], lower[idx])
+            upper[idx] = np.where(below, upper[idx], jds[idx])
+            bad = ~np.isfinite(new) | (new <= lower[idx]) | (new >= upper[idx])
+            new = np.where(bad, (lower[idx] + upper[idx]) / 2, new)
+        jds[idx] = np.where(done, jds[idx], new)
+        active[idx[done]] = False
+    return jds
+
+
+def find_returns(body, target_lon, jd_start, jd_end, flags=chart_engine.EPHE_FLAGS):
+    # Every UT Julian day in [jd_start, jd_end) at which `body` is at target_lon
+    if body in MEAN_MOTION:
+        motion = MEAN_MOTION[body]
+        lon0, _ = longitudes_and_speeds([jd_start], body, flags)
+        first = jd_start + (target_lon - lon0[0]) % 360.0 / motion
+        period = 360.0 / motion
+        guesses = np.arange(first, jd_end + period, period)
+        jds = refine(body, target_lon, guesses, flags=flags)
+    else:
+        step = SCAN_STEP.get(body, DEFAULT_SCAN_STEP)
+        grid = np.arange(jd_start, jd_end + step, step)
+        lons, _ = longitudes_and_speeds(grid, body, flags)
+        diff = wrap180(lons - target_lon)
+        # A sign change counts only when the body really passed the target,
+        # not when the difference wrapped through the opposite point
+        crossing = (np.sign(diff[:-1]) != np.sign(diff[1:])) & (np.abs(diff[1:] - diff[:-1]) < 180)
+        idx = np.nonzero(crossing)[0]
+        lower = grid[idx].copy()
+        upper = grid[idx + 1].copy()
+        rising = diff[idx + 1] > diff[idx]
+        jds = refine(body, target_lon, (lower + upper) / 2, lower, upper, rising, flags)
+
+    jds = np.sort(jds[(jds >= jd_start) & (jds < jd_end)])
+    # Neighbouring guesses can converge on the same root
+    if len(jds) > 1:
+        jds = jds[np.concatenate([[True], np.diff(jds) > 1e-4])]
+    return jds
+
+
+def body_id(body):
+    if isinstance(body, str):
+        return chart_engine.PLANETS[body]
+    return body
+
+
+def return_charts(natal_chart, body='Sun', jd_start=None, jd_end=None, lat=None, lon=None,
+                  house_system=chart_engine.HOUSE_SYSTEM, flags=chart_engine.EPHE_FLAGS, bodies=None):
+    # Return charts cast at the natal place unless relocated coordinates are given
+    name = body if isinstance(body, str) else next(k for k, v in chart_engine.PLANETS.items() if v == body)
+    target = natal_chart['longitudes'][name]
+    jd_start = natal_chart['jd'] if jd_start is None else jd_start
+    jd_end = jd_start + 365.25 if jd_end is None else jd_end
+    lat = natal_chart['lat'] if lat is None else lat
+    lon = natal_chart['lon'] if lon is None else lon
+    jds = find_returns(body_id(body), target, jd_start, jd_end, flags)
+    return [chart_engine.compute_chart(jd, lat, lon, house_system, flags, bodies) for jd in jds]
+
+
+def solar_returns(natal_chart, years=1, start_jd=None, lat=None, lon=None, **kwargs):
+    start = natal_chart['jd'] + 1 if start_jd is None else start_jd
+    return return_charts(natal_chart, 'Sun', start, start + years * 365.2422, lat, lon, **kwargs)
+
+
+def lunar_returns(natal_chart, count=13, start_jd=None, lat=None, lon=None, **kwargs):
+    start = natal_chart['jd'] + 1 if start_jd is None else start_jd
+    # A little more than count months, then trimmed
+    charts = return_charts(natal_chart, 'Moon', start, start + (count + 1) * 27.321582, lat, lon, **kwargs)
+    return charts[:count]
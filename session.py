@@ -0,0 +1,78 @@
+"""
+Session snapshot for an instant relaunch.
+On close the app writes one small pickle: the form inputs, the charts in
+the workspace (inputs, computed chart, star contacts), the text panel and,
+optionally, a PNG of the chart as it was drawn. The next launch shows the
+inputs, text and PNG without geocoding or ephemeris work; the app then
+draws the live figure from the stored chart once its window is up, which
+is the one matplotlib render of the restore. The snapshot records the
+ephemeris fingerprint and the calculation settings it was made with; when
+either has changed since, the snapshot is still shown but its charts are
+marked stale, and only then does the app recompute the current chart
+before drawing it.
+"""
+
+import os
+import pickle
+import tempfile
+import time
+
+import chart_engine
+from chart_cache import ephemeris_fingerprint
+
+SNAPSHOT_FILE = 'session.pickle'
+# Bump when the snapshot or chart dict layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path():
+    return os.path.join(chart_engine.DATA_DIR, SNAPSHOT_FILE)
+
+
+def current_config():
+    # Settings that change computed charts without changing their inputs
+    return {'house_system': chart_engine.HOUSE_SYSTEM, 'flags': chart_engine.EPHE_FLAGS}
+
+
+def save_snapshot(inputs, entries, text='', image=None, ephe_version=None, path=None):
+    # inputs: the form as current_inputs() reads it; entries: workspace
+    # entries, the current chart first; image: PNG bytes
+    path = path or snapshot_path()
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'config': current_config(),
+        'ephe_version': ephe_version or ephemeris_fingerprint(chart_engine.EPHE_PATH),
+        'saved': time.time(),
+        'inputs': inputs,
+        'entries': [{'inputs': e['inputs'], 'chart': e['chart'], 'star_contacts': e.get('star_contacts')}
+                    for e in entries],
+        'text': text,
+        'image': image,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def load_snapshot(ephe_version=None, path=None):
+    # The last snapshot with 'stale' set when the ephemeris files or settings
+    # changed since it was saved; None when there is no usable snapshot
+    path = path or snapshot_path()
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION or not snapshot['entries']:
+        return None
+    ephe_version = ephe_version or ephemeris_fingerprint(chart_engine.EPHE_PATH)
+    snapshot['stale'] = snapshot['ephe_version'] != ephe_version or snapshot['config'] != current_config()
+    return snapshot
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Caches and indexes go to a scratch data folder unless one is set
+os.environ.setdefault('ASTROCHART_DATA_DIR', tempfile.mkdtemp(prefix='astrochart-test-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "slow: long-running checks; deselect with -m 'not slow'")
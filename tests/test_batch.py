@@ -0,0 +1,31 @@
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+from batch import compute_batch
+from export import charts_to_batch
+
+
+def test_batch_charts_match_compute_chart():
+    jds = np.array([2415020.5, 2451545.0, 2488069.5])
+    result = compute_batch(jds, 51.5, 0.0, processes=1)
+    for i, jd in enumerate(jds):
+        chart = result.chart(i)
+        expected = chart_engine.compute_chart(jd, 51.5, 0.0)
+        assert chart['fallbacks'] == expected['fallbacks']
+        for name, lon in expected['longitudes'].items():
+            assert abs(chart['longitudes'][name] - lon) < 1e-9
+
+
+def test_batch_records_moshier_fallbacks(monkeypatch):
+    # Pretend every calculation of the Moon had no file
+    calc_ut = swe.calc_ut
+
+    def moon_without_file(jd, body, flags):
+        pos, ret = calc_ut(jd, body, flags)
+        return pos, (ret & ~swe.FLG_SWIEPH) | swe.FLG_MOSEPH if body == swe.MOON else ret
+
+    monkeypatch.setattr(swe, 'calc_ut', moon_without_file)
+    result = compute_batch([2451545.0, 2451546.0], 51.5, 0.0, processes=1)
+    assert [result.chart(i)['fallbacks'] for i in range(2)] == [['Moon'], ['Moon']]
+    assert charts_to_batch([result.chart(0)]).chart(0)['fallbacks'] == ['Moon']
@@ -0,0 +1,24 @@
+import chart_cache
+import chart_engine
+from chart_cache import ChartCache
+
+
+def test_chart_from_replaced_files_is_not_kept(monkeypatch):
+    files = {'version': 'old'}
+    monkeypatch.setattr(chart_cache, 'ephemeris_fingerprint', lambda path: files['version'])
+    cache = ChartCache(maxsize=8, recheck_interval=0)
+    compute_chart = chart_engine.compute_chart
+
+    def compute_while_files_change(*args, **kwargs):
+        # Another thread sees the new files and invalidates the cache
+        files['version'] = 'new'
+        assert cache.ephe_version == 'new'
+        return compute_chart(*args, **kwargs)
+
+    monkeypatch.setattr(chart_engine, 'compute_chart', compute_while_files_change)
+    cache.get_chart(2451545.0, 51.5, 0.0)
+    assert not cache._entries
+
+    monkeypatch.setattr(chart_engine, 'compute_chart', compute_chart)
+    cache.get_chart(2451545.0, 51.5, 0.0)
+    assert [key[-1] for key in cache._entries] == ['new']
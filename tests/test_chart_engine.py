@@ -0,0 +1,16 @@
+import numpy as np
+
+import chart_engine
+from chart_engine import SIGNS, get_sign_and_house, houses_of, signs_of
+
+
+def test_vectorized_placements_match_get_sign_and_house():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        chart = chart_engine.compute_chart(rng.uniform(2415020, 2488070), rng.uniform(-65, 65), rng.uniform(-180, 180))
+        cusps = chart['house_cusps']
+        # Bodies, random points and the cusps themselves
+        lons = [lon for lon in chart['longitudes'].values() if lon is not None] + list(rng.uniform(0, 360, 20))
+        lons += list(cusps)
+        for lon, sign, house in zip(lons, signs_of(lons), houses_of(lons, cusps)):
+            assert get_sign_and_house(lon, cusps) == (SIGNS[sign], house)
@@ -0,0 +1,46 @@
+import pytest
+
+from chart_library import ChartLibrary, RECENT_SQL, SEARCH_SQL
+
+CHART = {'lat': 51.5, 'lon': 0.0, 'jd': 2451545.0}
+
+
+def entry(name, date, place):
+    return {'inputs': {'name': name, 'date': date, 'time': '12:00', 'place': place, 'country': 'GB',
+                       'body_set': 'None'}, 'chart': CHART, 'star_contacts': []}
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = ChartLibrary(str(tmp_path / 'library.sqlite3'))
+    yield library
+    library.close()
+
+
+def test_search_prefixes(library):
+    ids = {}
+    for name, date, place in (('Ada', '1815-12-10', 'London'), ('alan', '1912-06-23', 'Maida Vale'),
+                              ('Marie', '1867-11-07', 'Warsaw'), ('100%_real', '2000-01-01', 'Leeds')):
+        ids[name] = library.save(entry(name, date, place))
+
+    def found(text):
+        return {chart_id for chart_id, _ in library.search(text)}
+
+    assert found('a') == {ids['Ada'], ids['alan']}
+    assert found('MAI') == {ids['alan']}
+    assert found('lon') == {ids['Ada']}
+    assert found('19') == {ids['alan']}
+    assert found('100%_') == {ids['100%_real']}
+    assert found('100_') == set()
+    assert found('') == set(ids.values())
+    # Most recently saved first
+    assert [chart_id for chart_id, _ in library.search('')][0] == ids['100%_real']
+
+
+def test_search_uses_the_indexes(library):
+    plan = [row[-1] for row in library._conn.execute("EXPLAIN QUERY PLAN " + SEARCH_SQL, ('a', 'b') * 3 + (50,))]
+    for index in ('charts_name', 'charts_place', 'charts_date'):
+        assert any(f"SEARCH charts USING INDEX {index}" in detail for detail in plan), plan
+    assert not any(detail.startswith('SCAN charts') for detail in plan), plan
+    plan = [row[-1] for row in library._conn.execute("EXPLAIN QUERY PLAN " + RECENT_SQL, (50,))]
+    assert any('USING INDEX charts_saved' in detail for detail in plan), plan
@@ -0,0 +1,14 @@
+import swisseph as swe
+
+from ephemeris import EphemerisManager, MAX_FALLBACK_SAMPLES
+
+
+def test_fallback_log_stays_bounded():
+    manager = EphemerisManager()
+    for i in range(MAX_FALLBACK_SAMPLES * 5):
+        assert not manager.check_result(2451545.0 + i, 'Moon', swe.FLG_MOSEPH, swe.FLG_SWIEPH)
+    assert manager.check_result(2451545.0, 'Moon', swe.FLG_SWIEPH, swe.FLG_SWIEPH)
+    assert manager.fallback_count == MAX_FALLBACK_SAMPLES * 5
+    assert len(manager.fallbacks) == MAX_FALLBACK_SAMPLES
+    assert manager.fallbacks[-1] == (2451545.0 + MAX_FALLBACK_SAMPLES * 5 - 1, 'Moon')
+    assert f"Moshier fallbacks: {MAX_FALLBACK_SAMPLES * 5}" in manager.report()
@@ -0,0 +1,31 @@
+import numpy as np
+
+import chart_engine
+from patterns import chart_patterns
+
+# The aspects each pattern is made of, as (member, member, aspect)
+EDGES = {
+    'Grand Trine': lambda m: [(m[0], m[1], 'Trine'), (m[1], m[2], 'Trine'), (m[0], m[2], 'Trine')],
+    'T-Square': lambda m: [(m[1], m[2], 'Opposition'), (m[0], m[1], 'Square'), (m[0], m[2], 'Square')],
+    'Yod': lambda m: [(m[1], m[2], 'Sextile'), (m[0], m[1], 'Quincunx'), (m[0], m[2], 'Quincunx')],
+    'Kite': lambda m: [(m[0], m[1], 'Trine'), (m[1], m[2], 'Trine'), (m[0], m[2], 'Trine'),
+                       (m[0], m[3], 'Opposition'), (m[3], m[1], 'Sextile'), (m[3], m[2], 'Sextile')],
+    'Grand Cross': lambda m: [(m[0], m[2], 'Opposition'), (m[1], m[3], 'Opposition'), (m[0], m[1], 'Square'),
+                              (m[1], m[2], 'Square'), (m[2], m[3], 'Square'), (m[3], m[0], 'Square')],
+}
+
+
+def test_patterns_use_the_chart_aspects():
+    rng = np.random.default_rng(0)
+    found = 0
+    for _ in range(150):
+        chart = chart_engine.compute_chart(rng.uniform(2415020, 2488070), rng.uniform(-60, 60), rng.uniform(-180, 180))
+        listed = {frozenset((a, b)): name for a, b, name, _ in chart['aspects']}
+        for name, members in chart_patterns(chart):
+            found += 1
+            for a, b, aspect in EDGES[name](members):
+                if aspect == 'Quincunx':
+                    assert 'Chiron' not in (a, b)
+                else:
+                    assert listed.get(frozenset((a, b))) == aspect, (name, members)
+    assert found
@@ -0,0 +1,31 @@
+import places
+
+CITIES = [
+    ('5240509', 'Saint Albans', 'Saint Albans', '', '44.81', '-73.08', 'P', 'PPL', 'US', '', 'VT', '', '', '', '6918'),
+    ('4930956', 'Boston', 'Boston', '', '42.36', '-71.06', 'P', 'PPLA', 'US', '', 'MA', '', '', '', '667137'),
+]
+POSTAL = [
+    ('US', '05478', 'Saint Albans', 'Vermont', 'VT', 'Franklin', '011', '', '', '44.8118', '-73.0846', '4'),
+    ('US', '02108', 'Boston', 'Massachusetts', 'MA', 'Suffolk', '025', '', '', '42.3576', '-71.0684', '4'),
+]
+
+
+def make_index(tmp_path):
+    places_dir = tmp_path / 'places'
+    places_dir.mkdir()
+    (places_dir / 'cities500.txt').write_text(''.join('\t'.join(row) + '\n' for row in CITIES), encoding='utf-8')
+    (places_dir / 'US.txt').write_text(''.join('\t'.join(row) + '\n' for row in POSTAL), encoding='utf-8')
+    return places.PlaceIndex.load(str(places_dir), str(tmp_path / 'places.npz'))
+
+
+def test_suggestions_resolve_offline(tmp_path):
+    index = make_index(tmp_path)
+    for text in ('05478', 'Boston, MA', '021'):
+        for label, country, lat, lon in index.suggest(text, 'US'):
+            assert index.resolve(label, country) == (lat, lon)
+
+
+def test_resolve_postal_code(tmp_path):
+    index = make_index(tmp_path)
+    assert index.resolve('05478', 'US') == (44.8118, -73.0846)
+    assert index.resolve('05478 Boston, MA', 'US') is None
@@ -0,0 +1,28 @@
+import swisseph as swe
+
+import rectification
+from returns import wrap180
+
+JD_START = 2451544.5
+LAT, LON = 51.5, -0.1
+
+
+def test_best_time_is_refined_past_the_grid():
+    candidates = rectification.rectify(JD_START, JD_START + 1, LAT, LON, [rectification.OnAngle('Sun', 'MC', 3.0)])
+    best = candidates[0]
+    _, ascmc = swe.houses(best.jd, LAT, LON, b'P')
+    sun = swe.calc_ut(best.jd, swe.SUN)[0][0]
+    # The MC moves about 15" a second
+    assert abs(wrap180(ascmc[1] - sun)) * 3600 < 15
+    assert best.start < best.jd < best.end
+
+
+def test_window_narrower_than_the_step_is_found():
+    # The ASC crosses 0.05 degrees in about 13 s, between two 60 s samples
+    constraint = rectification.AngleInRange('ASC', 100.0, 100.05)
+    candidates = rectification.rectify(JD_START, JD_START + 1, LAT, LON, [constraint], step=60.0)
+    assert candidates
+    for candidate in candidates:
+        asc = swe.houses(candidate.jd, LAT, LON, b'P')[1][0]
+        assert 100.0 <= asc <= 100.05
+        assert candidate.end - candidate.start < 60 / 86400
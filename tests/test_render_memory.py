@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import chart_engine
+from asteroids import glyph_for
+from chart_renderer import ChartRenderer, figure_artist_count, rss_kb
+
+RENDERS = 1000
+# RSS may grow this much while the bounded glyph caches fill
+MAX_GROWTH_KB = 16384
+
+
+@pytest.mark.slow
+def test_render_memory_stays_flat():
+    # Random charts rendered into one off-screen figure, sampled every
+    # hundred renders; the first sample is taken with caches warm
+    fig = Figure(figsize=(6, 6), dpi=100)
+    FigureCanvasAgg(fig)
+    renderer = ChartRenderer(fig)
+    rng = np.random.default_rng(0)
+    samples = []
+    for i in range(1, RENDERS + 1):
+        chart = chart_engine.compute_chart(rng.uniform(2415020.5, 2488069.5), rng.uniform(-60, 60),
+                                           rng.uniform(-180, 180))
+        glyphs = {name: glyph_for(name) for name in chart['longitudes']}
+        renderer.render(chart['longitudes'], chart['house_cusps'], chart['ascendant'], chart['midheaven'],
+                        chart['aspects'], glyphs)
+        fig.canvas.draw()
+        if i % 100 == 0:
+            samples.append((figure_artist_count(fig), rss_kb()))
+
+    artists = [count for count, _ in samples]
+    assert artists == [artists[0]] * len(artists)
+    first, last = samples[0][1], samples[-1][1]
+    if first is not None:
+        assert last - first <= MAX_GROWTH_KB
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+import reports
+
+RECORDS = """name,date,time,place,country,lat,lon,timezone
+Greenwich,1990-06-15,12:30,Greenwich,GB,51.48,0.0,Europe/London
+Longyearbyen,1990-06-15,12:30,Longyearbyen,NO,78.2,15.6,Arctic/Longyearbyen
+Bad date,1990-13-45,12:30,Greenwich,GB,51.48,0.0,Europe/London
+New York,1985-01-02,08:00,New York,US,40.71,-74.01,America/New_York
+"""
+
+
+@pytest.fixture
+def records_path(tmp_path):
+    path = tmp_path / 'records.csv'
+    path.write_text(RECORDS, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_bad_records_are_skipped(records_path, tmp_path, processes):
+    out_dir = tmp_path / 'out'
+    written, failed = reports.generate_reports(records_path, str(out_dir), mode='png', processes=processes, dpi=50)
+    assert written == 2
+    assert [number for number, _ in failed] == [2, 3]
+    assert sorted(os.listdir(out_dir)) == ['00001_Greenwich.png', '00004_New_York.png']
@@ -0,0 +1,87 @@
+"""
+Interpolated positions for scrubbing a chart through time.
+A window of +/- span days around a chart is sampled once. Each body gets
+its own uniform grid: a day for the Moon and the wobbling True Node, a
+few days for the inner planets and a week for everything slower. Any
+instant in the window is then a cubic Hermite interpolation of the sampled
+longitudes and FLG_SPEED speeds, within about 0.001 degrees for the
+planets. House cusps turn once a day, so they are not interpolated;
+swe.houses is called directly (about 10 us).
+"""
+
+import math
+
+import numpy as np
+import swisseph as swe
+
+import chart_engine
+from returns import longitudes_and_speeds
+
+# Sample spacing in days; bodies not listed use DEFAULT_STEP
+SAMPLE_STEPS = {'Moon': 1.0, 'True Node': 1.0, 'Mercury': 2.0, 'Sun': 4.0, 'Venus': 4.0, 'Mars': 4.0}
+DEFAULT_STEP = 7.0
+
+
+class TimeWindow:
+    def __init__(self, chart, span, bodies=None, house_system=chart_engine.HOUSE_SYSTEM,
+                 flags=chart_engine.EPHE_FLAGS):
+        # chart: the chart at the centre of the window; span in days either side
+        bodies = chart_engine.PLANETS if bodies is None else bodies
+        self.jd = chart['jd']
+        self.lat = chart['lat']
+        self.lon = chart['lon']
+        self.span = span
+        self.house_system = house_system
+        self.longitudes = {name: None for name in chart['longitudes']}
+        self.samples = {}
+
+        for name, lon in chart['longitudes'].items():
+            if lon is None or name not in bodies:
+                continue
+            step = min(SAMPLE_STEPS.get(name, DEFAULT_STEP), span / 2)
+            n = int(math.ceil(2 * span / step)) + 1
+            jds = np.linspace(self.jd - span, self.jd + span, n)
+            try:
+                lons, speeds = longitudes_and_speeds(jds, bodies[name], flags)
+            except swe.Error:
+                # No ephemeris file for part of the window: leave the body out
+                continue
+            self.samples[name] = (jds[0], jds[1] - jds[0], np.unwrap(lons, period=360).tolist(), speeds.tolist())
+
+    def covers(self, jd):
+        return abs(jd - self.jd) <= self.span
+
+    def position(self, name, jd):
+        # (longitude, speed) of a body at jd by cubic Hermite interpolation
+        t0, h, lons, speeds = self.samples[name]
+        u = (jd - t0) / h
+        i = min(max(int(u), 0), len(lons) - 2)
+        s = u - i
+        s2 = s * s
+        s3 = s2 * s
+        y0, y1 = lons[i], lons[i + 1]
+        m0, m1 = speeds[i] * h, speeds[i + 1] * h
+        lon = (2 * s3 - 3 * s2 + 1) * y0 + (s3 - 2 * s2 + s) * m0 + (3 * s2 - 2 * s3) * y1 + (s3 - s2) * m1
+        speed = ((6 * s2 - 6 * s) * (y0 - y1) + (3 * s2 - 4 * s + 1) * m0 + (3 * s2 - 2 * s) * m1) / h
+        return lon % 360, speed
+
+    def chart_at(self, jd):
+        # A chart dict like compute_chart's, for any jd in the window
+        longitudes = dict(self.longitudes)
+        speeds = dict(self.longitudes)
+        for name in self.samples:
+            longitudes[name], speeds[name] = self.position(name, jd)
+        house_cusps, ascmc = swe.houses(jd, self.lat, self.lon, self.house_system)
+        return {
+            'jd': jd,
+            'lat': self.lat,
+            'lon': self.lon,
+            'longitudes': longitudes,
+            'speeds': speeds,
+            'retrogrades': {name: speed is not None and speed < 0 for name, speed in speeds.items()},
+            'house_cusps': tuple(house_cusps),
+            'ascendant': ascmc[0],
+            'midheaven': ascmc[1],
+            'aspects': chart_engine.chart_aspects(longitudes),
+            'fallbacks': [],
+        }
@@ -0,0 +1,127 @@
+"""
+Vectorized local date/time to UT Julian day conversion for batch jobs.
+Date and time columns ('YYYY-MM-DD', 'HH:MM' or 'HH:MM:SS') are parsed
+straight from their bytes into datetime64 seconds. UTC offsets come from
+each zone's pytz transition table, which is turned into arrays once per
+zone and cached. For a single time the result matches local_to_julian_day
+(pytz localize with is_dst=False), and every ambiguous (fall-back),
+nonexistent (spring-forward) or unparseable row is reported.
+"""
+
+import collections
+import functools
+
+import numpy as np
+import pytz
+
+UNIX_EPOCH_JD = 2440587.5
+
+ConvertedTimes = collections.namedtuple('ConvertedTimes', 'jd ambiguous nonexistent invalid')
+
+
+def _digits(column, width):
+    # Fixed-width ASCII strings as an (n, width) array of digit values
+    raw = np.asarray(column, dtype=f'S{width}')
+    return raw.view(np.uint8).reshape(len(raw), width).astype(np.int16) - ord('0')
+
+
+def parse_dates(dates):
+    # 'YYYY-MM-DD' strings (or datetime64 values) to datetime64[D]; NaT where invalid
+    dates = np.asarray(dates)
+    if dates.dtype.kind == 'M':
+        return dates.astype('datetime64[D]')
+    d = _digits(dates, 10)
+    digit_cols = [0, 1, 2, 3, 5, 6, 8, 9]
+    valid = ((d[:, digit_cols] >= 0) & (d[:, digit_cols] <= 9)).all(axis=1)
+    valid &= (d[:, 4] == ord('-') - ord('0')) & (d[:, 7] == ord('-') - ord('0'))
+    year = d[:, 0] * 1000 + d[:, 1] * 100 + d[:, 2] * 10 + d[:, 3]
+    month = d[:, 5] * 10 + d[:, 6]
+    day = d[:, 8] * 10 + d[:, 9]
+    valid &= (month >= 1) & (month <= 12) & (day >= 1)
+
+    months = np.where(valid, (year.astype(np.int64) - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    result = months.astype('datetime64[D]') + np.where(valid, day - 1, 0)
+    # Day 31 of a 30-day month would roll over into the next month
+    valid &= result.astype('datetime64[M]') == months
+    result[~valid] = np.datetime64('NaT')
+    return result
+
+
+def parse_times(times):
+    # 'HH:MM' or 'HH:MM:SS' strings to seconds after midnight; -1 where invalid
+    t = _digits(times, 8)
+    colon = ord(':') - ord('0')
+    has_seconds = t[:, 5] == colon
+    valid = (t[:, 2] == colon) & (has_seconds | (t[:, 5] == -ord('0')))
+    hms = [0, 1, 3, 4]
+    valid &= ((t[:, hms] >= 0) & (t[:, hms] <= 9)).all(axis=1)
+    seconds_ok = (t[:, 6:8] >= 0) & (t[:, 6:8] <= 9)
+    valid &= ~has_seconds | seconds_ok.all(axis=1)
+    hours = t[:, 0] * 10 + t[:, 1]
+    minutes = t[:, 3] * 10 + t[:, 4]
+    seconds = np.where(has_seconds, t[:, 6] * 10 + t[:, 7], 0)
+    valid &= (hours < 24) & (minutes < 60) & (seconds < 60)
+    return np.where(valid, hours.astype(np.int64) * 3600 + minutes * 60 + seconds, -1)
+
+
+@functools.lru_cache(maxsize=None)
+def transition_table(zone_name):
+    # (UTC start seconds, UTC offset seconds, is-DST flag) arrays for a zone
+    tz = pytz.timezone(zone_name)
+    if not hasattr(tz, '_utc_transition_times'):
+        offset = tz.utcoffset(None) if tz is pytz.UTC else tz._utcoffset
+        return (np.array([np.iinfo(np.int64).min // 2], dtype=np.int64),
+                np.array([int(offset.total_seconds())], dtype=np.int64),
+                np.zeros(1, dtype=bool))
+    starts = np.array(tz._utc_transition_times, dtype='datetime64[s]').astype(np.int64)
+    offsets = np.array([int(info[0].total_seconds()) for info in tz._transition_info], dtype=np.int64)
+    dst = np.array([bool(info[1]) for info in tz._transition_info])
+    # pytz's first entry (year 1) stands for everything before it
+    starts[0] = np.iinfo(np.int64).min // 2
+    return starts, offsets, dst
+
+
+def local_to_utc_seconds(local, zone_name):
+    # Local wall-clock seconds since the Unix epoch to UTC seconds, with masks
+    starts, offsets, dst = transition_table(zone_name)
+    n = len(starts)
+    # Period k is the last one whose local start is not after the wall-clock
+    # time; the time can also still belong to period k-1 (a fall-back overlap)
+    k = np.clip(np.searchsorted(starts + offsets, local, side='right') - 1, 0, n - 1)
+    prev = np.maximum(k - 1, 0)
+    nxt = np.minimum(k + 1, n - 1)
+    in_k = (local - offsets[k] >= starts[k]) & ((k == n - 1) | (local - offsets[k] < starts[nxt]))
+    in_prev = (k > 0) & (local - offsets[prev] < starts[k]) & (local - offsets[prev] >= starts[prev])
+    ambiguous = in_k & in_prev
+    nonexistent = ~in_k & ~in_prev
+
+    # Like localize(is_dst=False): prefer the standard-time reading when there
+    # are two or none
+    use_prev = in_prev & ~in_k
+    both_or_none = ambiguous | nonexistent
+    use_prev |= both_or_none & ~dst[prev] & dst[k]
+    period = np.where(use_prev, prev, k)
+    return local - offsets[period], ambiguous, nonexistent
+
+
+def local_to_julian_days(dates, times, zones):
+    # zones: one zone name for every row, or an array of names per row
+    days = parse_dates(dates)
+    seconds = parse_times(times)
+    invalid = np.isnat(days) | (seconds < 0)
+    local = np.where(invalid, 0, days.astype('datetime64[s]').astype(np.int64) + seconds)
+
+    utc = np.empty(len(local), dtype=np.int64)
+    ambiguous = np.zeros(len(local), dtype=bool)
+    nonexistent = np.zeros(len(local), dtype=bool)
+    if isinstance(zones, str):
+        utc[:], ambiguous[:], nonexistent[:] = local_to_utc_seconds(local, zones)
+    else:
+        names, inverse = np.unique(np.asarray(zones, dtype=str), return_inverse=True)
+        for i, name in enumerate(names):
+            rows = inverse == i
+            utc[rows], ambiguous[rows], nonexistent[rows] = local_to_utc_seconds(local[rows], name)
+
+    jd = utc / 86400.0 + UNIX_EPOCH_JD
+    jd[invalid] = np.nan
+    return ConvertedTimes(jd, ambiguous & ~invalid, nonexistent & ~invalid, invalid)